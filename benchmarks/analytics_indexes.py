@@ -0,0 +1,101 @@
+"""
+Benchmark the analytics queries with and without the date/product indexes.
+
+Seeds a scratch database, then for every query prints the query plan and
+median timing with the composite indexes dropped ("before") and restored
+("after").
+
+    python benchmarks/analytics_indexes.py --sales 500000 --products 5000
+"""
+import argparse
+from datetime import date, timedelta
+
+from common import seed, setup_django, temporary_database, timed
+
+
+def analytics_queries(product_id):
+    from django.db.models import Count, F, Sum
+    from django.db.models.functions import TruncMonth
+    from inventory.models import DailySalesRollup, Purchase, Sale
+
+    today = date.today()
+    last_90 = today - timedelta(days=90)
+    last_7 = today - timedelta(days=7)
+
+    return {
+        'daily sales, last 90 days': Sale.objects
+            .filter(date__gte=last_90, date__lte=today)
+            .values('date').annotate(total=Sum('quantity_sold')).order_by('date'),
+        'one product, last 90 days': Sale.objects
+            .filter(product_id=product_id, date__gte=last_90)
+            .values('date').annotate(total=Sum('quantity_sold')).order_by('date'),
+        'top sellers, last 7 days': Sale.objects
+            .filter(date__gte=last_7)
+            .values('product_id').annotate(total=Sum('quantity_sold'), times=Count('id'))
+            .order_by('-total')[:5],
+        'monthly purchases': Purchase.objects
+            .annotate(month=TruncMonth('date')).values('month')
+            .annotate(total=Sum(F('quantity') * F('price_per_unit'))).order_by('month'),
+        'export, last 7 days': Sale.objects.with_revenue()
+            .filter(date__gte=last_7).order_by('date', 'id')
+            .values_list('product__name', 'quantity_sold', 'revenue', 'date'),
+        'rollup, one product history': DailySalesRollup.objects
+            .filter(product_id=product_id).values('date', 'quantity').order_by('date'),
+    }
+
+
+def measure(product_id, repeat):
+    results = {}
+    for name, queryset in analytics_queries(product_id).items():
+        plan = queryset.explain()
+        seconds, _ = timed(lambda: list(queryset.all()), repeat=repeat)
+        results[name] = (seconds, plan)
+    return results
+
+
+def set_indexes(connection, enabled):
+    from inventory.models import DailySalesRollup, Purchase, Sale
+
+    with connection.schema_editor() as editor:
+        for model in (Sale, Purchase, DailySalesRollup):
+            for index in model._meta.indexes:
+                if enabled:
+                    editor.add_index(model, index)
+                else:
+                    editor.remove_index(model, index)
+
+    if connection.vendor in ('sqlite', 'postgresql'):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--sales', type=int, default=200000)
+    parser.add_argument('--purchases', type=int, default=20000)
+    parser.add_argument('--days', type=int, default=730)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database() as connection:
+        print(f'Seeding {args.products} products, {args.sales} sales, {args.purchases} purchases...')
+        product_ids = seed(args.products, args.sales, args.purchases, args.days)
+        product_id = product_ids[len(product_ids) // 2]
+
+        set_indexes(connection, enabled=False)
+        before = measure(product_id, args.repeat)
+        set_indexes(connection, enabled=True)
+        after = measure(product_id, args.repeat)
+
+    for name, (before_s, before_plan) in before.items():
+        after_s, after_plan = after[name]
+        speedup = before_s / after_s if after_s else float('inf')
+        print(f'\n== {name}: {before_s * 1000:.1f} ms -> {after_s * 1000:.1f} ms ({speedup:.1f}x)')
+        print('   before: ' + before_plan.replace('\n', '\n           '))
+        print('   after:  ' + after_plan.replace('\n', '\n           '))
+
+
+if __name__ == '__main__':
+    main()
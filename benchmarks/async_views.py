@@ -0,0 +1,208 @@
+"""
+Benchmark the async analytics and chart data views against the sync ones.
+
+Each profile runs in its own process against a scratch database:
+
+    wsgi  the sync views through Django's WSGI handler, one thread per
+          concurrent client, as under a threaded WSGI server
+    asgi  the async variants (ASYNC_VIEWS=1) through the ASGI handler of
+          dashboard/asgi.py, one task per concurrent client on one event loop
+
+Requests are made in-process, without a server or network in between, so
+the numbers compare the handlers and views alone. The versioned cache is
+disabled so every request runs its queries; pass --cached to keep it.
+Reports p50 and p99 latency and requests per second per endpoint.
+
+    python benchmarks/async_views.py --concurrency 16 --requests 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from common import seed, setup_django, temporary_database
+
+PROFILES = {
+    'wsgi': {'ASYNC_VIEWS': '0'},
+    'asgi': {'ASYNC_VIEWS': '1'},
+}
+HOST = 'localhost'
+
+
+def endpoints():
+    since = (date.today() - timedelta(days=90)).isoformat()
+    return {
+        'analytics': ('/sales-analytics-ai/', ''),
+        'charts-day': ('/api/charts/sales/', urlencode({'since': since})),
+        'charts-month': ('/api/charts/sales/', urlencode({'granularity': 'month'})),
+    }
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def wsgi_get(application, path, query):
+    """One GET through the WSGI handler; returns the status line"""
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query, 'HTTP_HOST': HOST}
+    setup_testing_defaults(environ)
+    status = []
+    result = application(environ, lambda line, headers, exc_info=None: status.append(line))
+    try:
+        b''.join(result)
+    finally:
+        # Fires request_finished, which releases the thread's connection
+        result.close()
+    return status[0]
+
+
+async def asgi_get(application, path, query):
+    """One GET through the ASGI handler; returns the status code"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': query.encode(),
+        'root_path': '', 'headers': [(b'host', HOST.encode())],
+        'client': ('127.0.0.1', 0), 'server': (HOST, 80),
+    }
+    disconnected = asyncio.Event()
+    sent = []
+
+    async def receive():
+        if not sent:
+            sent.append(True)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The handler listens for a disconnect while it responds; none comes
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    status = []
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+def run_wsgi(application, path, query, args):
+    def request():
+        started = time.perf_counter()
+        status = wsgi_get(application, path, query)
+        if not status.startswith('200'):
+            raise RuntimeError(f'{path}?{query}: {status}')
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        started = time.perf_counter()
+        timings = list(pool.map(lambda _: request(), range(args.requests)))
+        return timings, time.perf_counter() - started
+
+
+def run_asgi(application, path, query, args):
+    async def client(count, timings):
+        for _ in range(count):
+            started = time.perf_counter()
+            status = await asgi_get(application, path, query)
+            if status != 200:
+                raise RuntimeError(f'{path}?{query}: {status}')
+            timings.append(time.perf_counter() - started)
+
+    async def main():
+        timings = []
+        counts = [args.requests // args.concurrency + (i < args.requests % args.concurrency) for i in range(args.concurrency)]
+        started = time.perf_counter()
+        await asyncio.gather(*(client(count, timings) for count in counts))
+        return timings, time.perf_counter() - started
+
+    return asyncio.run(main())
+
+
+def run_profile(name, args):
+    """Load one profile's scratch database; runs inside the profile's own process"""
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    scratch = tempfile.TemporaryDirectory()
+    if connection.vendor == 'sqlite':
+        # The test runner's in-memory database cannot be shared between threads
+        connection.settings_dict['TEST']['NAME'] = os.path.join(scratch.name, 'async_views.sqlite3')
+    overrides = {'DEBUG': False, 'ALLOWED_HOSTS': [HOST]}
+    if not args.cached:
+        overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+    results = {}
+    with temporary_database(), override_settings(**overrides):
+        seed(products=args.products, sales=args.sales, purchases=args.sales // 10)
+        connection.close()
+        if settings.ASYNC_VIEWS:
+            from django.core.handlers.asgi import ASGIHandler
+            application, run = ASGIHandler(), run_asgi
+        else:
+            from django.core.handlers.wsgi import WSGIHandler
+            application, run = WSGIHandler(), run_wsgi
+
+        for endpoint, (path, query) in endpoints().items():
+            run(application, path, query, argparse.Namespace(**{**vars(args), 'requests': args.concurrency}))  # warm up
+            timings, seconds = run(application, path, query, args)
+            results[endpoint] = {
+                'p50': statistics.median(timings),
+                'p99': percentile(timings, 0.99),
+                'requests_per_second': len(timings) / seconds,
+            }
+        connection.close()
+
+    scratch.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', default=','.join(PROFILES), help=f"comma separated: {', '.join(PROFILES)}")
+    parser.add_argument('--concurrency', type=int, default=16, help='clients sending requests at the same time')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--sales', type=int, default=100000)
+    parser.add_argument('--cached', action='store_true', help='keep the versioned cache enabled')
+    parser.add_argument('--run-profile', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_profile:
+        print(json.dumps(run_profile(args.run_profile, args)))
+        return
+
+    names = [name.strip() for name in args.profiles.split(',') if name.strip()]
+    unknown = set(names) - set(PROFILES)
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(sorted(unknown))}")
+
+    print(f'{args.concurrency} concurrent clients x {args.requests} requests, {args.sales} sales'
+          f"{', cached' if args.cached else ''}")
+    print(f"{'profile':<8}{'endpoint':<14}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name in names:
+        command = [sys.executable, __file__, '--run-profile', name] + [
+            f'--{option}={getattr(args, option)}' for option in ('concurrency', 'requests', 'products', 'sales')
+        ] + (['--cached'] if args.cached else [])
+        completed = subprocess.run(command, env={**os.environ, **PROFILES[name]}, capture_output=True, text=True)
+        if completed.returncode:
+            print(f'{name:<8}failed: {completed.stderr.strip().splitlines()[-1]}')
+            continue
+        for endpoint, result in json.loads(completed.stdout.strip().splitlines()[-1]).items():
+            print(f"{name:<8}{endpoint:<14}{result['p50'] * 1000:>10.1f}{result['p99'] * 1000:>10.1f}"
+                  f"{result['requests_per_second']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
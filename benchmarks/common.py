@@ -0,0 +1,108 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Each benchmark runs against a throwaway copy of the configured database
+(created the same way the test runner does), so it never touches real data.
+"""
+import contextlib
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    """Configure Django for a standalone script run from the repository root"""
+    sys.path.insert(0, str(BASE_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def temporary_database(keepdb=False):
+    """Create a migrated scratch database for the default connection and drop it afterwards"""
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+
+
+def seed(products=1000, sales=100000, purchases=10000, days=365, categories=20, seed_value=0, product_name=None):
+    """
+    Bulk insert a synthetic catalogue and transaction history.
+
+    product_name, if given, is called with (index, rng) to name each product.
+
+    Rows are inserted with bulk_create and the daily rollup is rebuilt once
+    at the end, so seeding does not go through the per-row signal handlers.
+    """
+    from inventory.models import Category, Product, Purchase, Sale
+    from inventory.rollups import rebuild_rollups
+
+    rng = random.Random(seed_value)
+
+    def money(low, high):
+        return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+    today = date.today()
+
+    Category.objects.bulk_create([Category(name=f'Category {i}') for i in range(categories)])
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    Product.objects.bulk_create(
+        [
+            Product(
+                name=product_name(i, rng) if product_name else f'Product {i}',
+                category_id=rng.choice(category_ids),
+                stock_quantity=rng.randint(0, 500),
+                price=money(5, 5000),
+                gst_rate=Decimal(rng.choice([0, 5, 12, 18, 28])),
+            )
+            for i in range(products)
+        ],
+        batch_size=2000,
+    )
+    prices = dict(Product.objects.values_list('id', 'price'))
+    gst_rates = dict(Product.objects.values_list('id', 'gst_rate'))
+    product_ids = list(prices)
+
+    # auto_now_add would stamp every row with today, so dates are set per batch afterwards
+    for model, total, make in (
+        (Sale, sales, lambda pid: Sale(
+            product_id=pid, quantity_sold=rng.randint(1, 10), unit_price=prices[pid], gst_rate=gst_rates[pid]
+        )),
+        (Purchase, purchases, lambda pid: Purchase(
+            product_id=pid, quantity=rng.randint(10, 100), price_per_unit=money(5, 4000)
+        )),
+    ):
+        batch_size = max(total // days, 1)
+        for offset in range(0, total, batch_size):
+            rows = [make(rng.choice(product_ids)) for _ in range(min(batch_size, total - offset))]
+            model.objects.bulk_create(rows, batch_size=2000)
+            day = today - timedelta(days=(offset // batch_size) % days)
+            model._base_manager.filter(pk__in=[row.pk for row in rows]).update(date=day)
+
+    rebuild_rollups()
+    return product_ids
+
+
+def timed(func, repeat=5):
+    """Run func repeatedly and return (median seconds, last result)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
@@ -0,0 +1,151 @@
+"""
+Benchmark concurrent sale writes under each database profile.
+
+Every profile runs in its own process with the DB_* environment variables
+that select it (see dashboard/database.py), against a scratch database.
+Writer threads record sales through sell_product, one "request" at a time
+(connections are released between sales as at the end of a request), while
+reader threads keep computing total revenue. Reports sales per second,
+sales that failed with a lock error and reads per second.
+
+    python benchmarks/db_concurrency.py --writers 8 --sales 200
+
+The PostgreSQL profiles need a local server; point DB_HOST, DB_PORT,
+DB_USER and DB_PASSWORD at it and ask for them explicitly:
+
+    DB_HOST=localhost DB_USER=postgres python benchmarks/db_concurrency.py \\
+        --profiles sqlite-wal,postgresql,postgresql-pool
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from common import seed, setup_django, temporary_database
+
+# (environment, OPTIONS override); the override reproduces settings that the environment cannot express
+PROFILES = {
+    # The settings before DB_* support: rollback journal, deferred transactions, sqlite3's 5s timeout
+    'sqlite-default': ({'DB_ENGINE': 'sqlite', 'DB_CONN_MAX_AGE': '0'}, {}),
+    'sqlite-wal': ({'DB_ENGINE': 'sqlite'}, None),
+    'postgresql': ({'DB_ENGINE': 'postgresql'}, None),
+    'postgresql-pool': ({'DB_ENGINE': 'postgresql', 'DB_POOL': '16'}, None),
+}
+DEFAULT_PROFILES = 'sqlite-default,sqlite-wal'
+
+
+def run_profile(name, args):
+    """Load one profile's scratch database; runs inside the profile's own process"""
+    _, options = PROFILES[name]
+    setup_django()
+    from django.db import OperationalError, close_old_connections, connection
+    from inventory.models import Product, Sale
+    from inventory.stock import sell_product
+
+    if options is not None:
+        connection.settings_dict['OPTIONS'] = options
+    scratch = tempfile.TemporaryDirectory()
+    if connection.vendor == 'sqlite':
+        # The test runner's in-memory database cannot be shared between threads
+        connection.settings_dict['TEST']['NAME'] = os.path.join(scratch.name, 'concurrency.sqlite3')
+
+    with temporary_database():
+        product_ids = seed(products=args.products, sales=0, purchases=0)
+        Product.objects.update(stock_quantity=10 ** 6)
+        connection.close()
+
+        failed = []
+        reads = []
+        writing = threading.Event()
+        writing.set()
+
+        def writer(index):
+            products = product_ids[index::args.writers] or product_ids
+            errors = 0
+            for i in range(args.sales):
+                try:
+                    # As record_sale does: load the product, then sell
+                    sell_product(Product.objects.get(pk=products[i % len(products)]), 1)
+                except OperationalError:
+                    errors += 1
+                close_old_connections()
+            failed.append(errors)
+            connection.close()
+
+        def reader():
+            count = 0
+            while writing.is_set():
+                Sale.objects.total_revenue()
+                count += 1
+                close_old_connections()
+            reads.append(count)
+            connection.close()
+
+        readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+        writers = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+        for thread in readers:
+            thread.start()
+        started = time.perf_counter()
+        for thread in writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        seconds = time.perf_counter() - started
+        writing.clear()
+        for thread in readers:
+            thread.join()
+
+        recorded = Sale.objects.count()
+        connection.close()
+
+    scratch.cleanup()
+    return {
+        'profile': name,
+        'sales_per_second': recorded / seconds,
+        'failed': sum(failed),
+        'reads_per_second': sum(reads) / seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profiles', default=DEFAULT_PROFILES, help=f"comma separated: {', '.join(PROFILES)}")
+    parser.add_argument('--writers', type=int, default=8)
+    parser.add_argument('--readers', type=int, default=2)
+    parser.add_argument('--sales', type=int, default=200, help='sales per writer')
+    parser.add_argument('--products', type=int, default=50)
+    parser.add_argument('--run-profile', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_profile:
+        print(json.dumps(run_profile(args.run_profile, args)))
+        return
+
+    names = [name.strip() for name in args.profiles.split(',') if name.strip()]
+    unknown = set(names) - set(PROFILES)
+    if unknown:
+        parser.error(f"unknown profiles: {', '.join(sorted(unknown))}")
+
+    print(f'{args.writers} writers x {args.sales} sales, {args.readers} readers')
+    print(f"{'profile':<18}{'sales/s':>10}{'failed':>8}{'reads/s':>10}")
+    for name in names:
+        environment, _ = PROFILES[name]
+        command = [sys.executable, __file__, '--run-profile', name] + [
+            f'--{option}={getattr(args, option)}' for option in ('writers', 'readers', 'sales', 'products')
+        ]
+        completed = subprocess.run(
+            command, env={**os.environ, **environment}, capture_output=True, text=True
+        )
+        if completed.returncode:
+            print(f'{name:<18}failed: {completed.stderr.strip().splitlines()[-1]}')
+            continue
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        print(f"{name:<18}{result['sales_per_second']:>10.0f}{result['failed']:>8}{result['reads_per_second']:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark the trigram product search against name__icontains.
+
+Seeds a scratch database with a catalogue of realistic product names and
+prints the median latency of each search path for a mix of substring,
+prefix and misspelled queries.
+
+    python benchmarks/product_search.py --products 100000
+"""
+import argparse
+
+from common import seed, setup_django, temporary_database, timed
+
+BRANDS = ['Amul', 'Nestle', 'Britannia', 'Parle', 'Haldiram', 'Tata', 'Dabur', 'Patanjali', 'Cadbury', 'ITC']
+ITEMS = [
+    'Chocolate', 'Biscuit', 'Butter', 'Cheese', 'Paneer', 'Namkeen', 'Green Tea', 'Coffee', 'Honey',
+    'Basmati Rice', 'Atta', 'Ghee', 'Toothpaste', 'Shampoo', 'Soap', 'Detergent', 'Ketchup', 'Noodles',
+]
+SIZES = ['50g', '100g', '200g', '500g', '1kg', '250ml', '500ml', '1L', 'Family Pack', 'Combo']
+
+QUERIES = {
+    'substring': 'chocolate',
+    'prefix': 'bri',
+    'rare substring': 'tea 250',
+    'typo': 'choclate',
+    'typo, two words': 'basmti rice',
+    'no match': 'zzyzx',
+}
+
+
+def product_name(index, rng):
+    return f'{rng.choice(BRANDS)} {rng.choice(ITEMS)} {rng.choice(SIZES)} #{index}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        from inventory.models import Product
+        from inventory.search import filter_products, search_products
+
+        print(f'Seeding {args.products} products...')
+        seed(args.products, sales=0, purchases=0, product_name=product_name)
+        products = Product.objects.select_related('category').order_by('name', 'pk')
+
+        paths = {
+            'icontains, first page': lambda q: list(products.filter(name__icontains=q)[:50]),
+            'icontains, count': lambda q: products.filter(name__icontains=q).count(),
+            'index, first page': lambda q: list(filter_products(products, q)[:50]),
+            'index, count': lambda q: filter_products(products, q).count(),
+            'ranked top 20': lambda q: search_products(q),
+        }
+
+        print(f"\n{'query':<18}" + ''.join(f'{name:>24}' for name in paths))
+        for label, query in QUERIES.items():
+            row = f'{label:<18}'
+            for search in paths.values():
+                seconds, _ = timed(lambda: search(query), repeat=args.repeat)
+                row += f'{seconds * 1000:>21.1f} ms'
+            print(row)
+        print('\nicontains cannot match the misspelled queries; the index returns their closest names.')
+
+
+if __name__ == '__main__':
+    main()
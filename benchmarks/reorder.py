@@ -0,0 +1,38 @@
+"""
+Benchmark the reorder engine on a large catalogue.
+
+Seeds a scratch database and times compute_reorder (the vectorized pass)
+and refresh_reorder (compute plus storing one suggestion per product).
+
+    python benchmarks/reorder.py --products 50000 --sales 1000000
+"""
+import argparse
+
+from common import seed, setup_django, temporary_database, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--products', type=int, default=50000)
+    parser.add_argument('--sales', type=int, default=500000)
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    with temporary_database():
+        from inventory.reorder import compute_reorder, refresh_reorder
+
+        print(f'Seeding {args.products} products and {args.sales} sales over {args.days} days...')
+        seed(args.products, args.sales, purchases=0, days=args.days)
+
+        compute_s, result = timed(compute_reorder, repeat=args.repeat)
+        refresh_s, run = timed(lambda: refresh_reorder(keep=1), repeat=args.repeat)
+
+    print(f'compute_reorder: {compute_s:.2f}s for {len(result["ids"])} products '
+          f'({int((result["reorder_quantity"] > 0).sum())} to reorder)')
+    print(f'refresh_reorder: {refresh_s:.2f}s including storing the suggestions')
+
+
+if __name__ == '__main__':
+    main()
@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'dashboard.settings')
+# Serve the async variants of the analytics and chart data views, see settings.ASYNC_VIEWS
+os.environ.setdefault('ASYNC_VIEWS', '1')
+# Each request's sync code runs in a thread of its own, so a persistent connection
+# is never reused and stays open; use DB_POOL with PostgreSQL instead
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -0,0 +1,35 @@
+"""
+Cache configuration from the environment.
+
+    CACHE_BACKEND   locmem (default, one cache per process) or file (shared by every process on the host)
+    CACHE_LOCATION  directory for the file backend (default var/cache)
+    CACHE_TIMEOUT   default entry lifetime in seconds (default 3600)
+"""
+import os
+from django.core.exceptions import ImproperlyConfigured
+
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+}
+
+
+def cache_config(base_dir, env=None):
+    """The CACHES['default'] entry described by env (default: os.environ)"""
+    env = os.environ if env is None else env
+    backend = env.get('CACHE_BACKEND') or 'locmem'
+    if backend not in BACKENDS:
+        raise ImproperlyConfigured(f"CACHE_BACKEND must be one of: {', '.join(BACKENDS)}, got {backend!r}")
+    try:
+        timeout = int(env.get('CACHE_TIMEOUT') or 3600)
+    except ValueError:
+        raise ImproperlyConfigured(f"CACHE_TIMEOUT must be a number, got {env['CACHE_TIMEOUT']!r}")
+
+    config = {'BACKEND': BACKENDS[backend], 'TIMEOUT': timeout}
+    if backend == 'file':
+        config['LOCATION'] = env.get('CACHE_LOCATION') or str(base_dir / 'var' / 'cache')
+        config['OPTIONS'] = {'MAX_ENTRIES': 10000}
+    else:
+        config['LOCATION'] = 'dashboard'
+    return config
@@ -0,0 +1,101 @@
+"""
+Database configuration from the environment.
+
+    DB_ENGINE              sqlite (default), postgresql or mysql
+    DB_NAME                database name, or the file path for SQLite
+    DB_USER, DB_PASSWORD, DB_HOST, DB_PORT
+    DB_CONN_MAX_AGE        seconds to keep a connection open between requests (default 60,
+                           0 under dashboard/asgi.py)
+    DB_CONN_HEALTH_CHECKS  check a persistent connection before reusing it (default on)
+    DB_POOL                PostgreSQL only: maximum size of a psycopg connection pool (default off)
+    DB_SQLITE_WAL          SQLite only: write-ahead log, so readers never block the writer (default on)
+    DB_BUSY_TIMEOUT        SQLite only: seconds a writer waits for the lock before failing (default 20)
+
+Persistent connections only pay off under WSGI, where a worker thread serves
+request after request. The ASGI handler runs every request's sync code in a
+new thread, so a persistent connection is never reused and stays open until
+the server stops; keep DB_CONN_MAX_AGE at 0 there and use DB_POOL with
+PostgreSQL to reuse connections.
+"""
+import os
+from django.core.exceptions import ImproperlyConfigured
+
+
+ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+    'mysql': 'django.db.backends.mysql',
+}
+
+
+def _flag(env, name, default):
+    value = env.get(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _number(env, name, default, kind=int):
+    value = env.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return kind(value)
+    except ValueError:
+        raise ImproperlyConfigured(f'{name} must be a number, got {value!r}')
+
+
+def sqlite_options(wal=True, busy_timeout=20):
+    """
+    OPTIONS for the SQLite backend.
+
+    Transactions take the write lock when they begin (IMMEDIATE), so a
+    writer that has to wait does so inside the busy timeout instead of
+    failing with "database is locked" when it upgrades a read lock. WAL
+    lets readers carry on while a sale is being written.
+    """
+    options = {'timeout': busy_timeout, 'transaction_mode': 'IMMEDIATE'}
+    if wal:
+        options['init_command'] = 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;'
+    return options
+
+
+def database_config(base_dir, env=None):
+    """The DATABASES['default'] entry described by env (default: os.environ)"""
+    env = os.environ if env is None else env
+    engine = env.get('DB_ENGINE') or 'sqlite'
+    if engine not in ENGINES:
+        raise ImproperlyConfigured(f"DB_ENGINE must be one of: {', '.join(ENGINES)}, got {engine!r}")
+
+    config = {
+        'ENGINE': ENGINES[engine],
+        'CONN_MAX_AGE': _number(env, 'DB_CONN_MAX_AGE', 60),
+        'CONN_HEALTH_CHECKS': _flag(env, 'DB_CONN_HEALTH_CHECKS', True),
+    }
+    if engine == 'sqlite':
+        config['NAME'] = env.get('DB_NAME') or base_dir / 'db.sqlite3'
+        config['OPTIONS'] = sqlite_options(
+            wal=_flag(env, 'DB_SQLITE_WAL', True),
+            busy_timeout=_number(env, 'DB_BUSY_TIMEOUT', 20, float),
+        )
+    else:
+        config.update({
+            'NAME': env.get('DB_NAME') or 'dashboard',
+            'USER': env.get('DB_USER', ''),
+            'PASSWORD': env.get('DB_PASSWORD', ''),
+            'HOST': env.get('DB_HOST', ''),
+            'PORT': env.get('DB_PORT', ''),
+            'OPTIONS': {},
+        })
+        if engine == 'mysql':
+            config['OPTIONS']['charset'] = 'utf8mb4'
+
+    pool_size = _number(env, 'DB_POOL', 0)
+    if pool_size:
+        if engine != 'postgresql':
+            raise ImproperlyConfigured('DB_POOL is only supported with DB_ENGINE=postgresql')
+        # The pool owns the connections; Django must not also keep them open
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {'min_size': min(2, pool_size), 'max_size': pool_size}
+
+    return config
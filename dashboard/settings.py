@@ -10,8 +10,12 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .caches import cache_config
+from .database import database_config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -89,14 +93,32 @@ WSGI_APPLICATION = 'dashboard.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Configured from DB_* environment variables, see dashboard/database.py.
+# Defaults to SQLite in WAL mode with persistent connections.
+
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(BASE_DIR),
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/ref/settings/#caches
+
+# Configured from CACHE_* environment variables, see dashboard/caches.py.
+# Cached pages and charts are invalidated by the data version in inventory/cache.py.
+
+CACHES = {
+    'default': cache_config(BASE_DIR),
+}
+
+
+# Async views
+
+# dashboard/asgi.py turns this on: the analytics page and the chart data API
+# then run their independent queries concurrently. WSGI keeps the sync views.
+
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '').strip().lower() in ('1', 'true', 'yes', 'on')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -135,6 +157,9 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Rendered invoice PDFs, cached by content hash (safe to delete)
+INVOICE_CACHE_DIR = BASE_DIR / 'var' / 'invoices'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
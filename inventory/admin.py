@@ -1,11 +1,16 @@
 from django.contrib import admin
-from .models import Category, Product, Sale, Purchase, StockThreshold
+from .models import Category, Product, Sale, Purchase, StockThreshold, DailySalesRollup, ForecastSnapshot, LowStockAlert, ReorderRun, StockLot
 
 admin.site.register(Category)
 admin.site.register(Product)
 admin.site.register(Sale)
 admin.site.register(Purchase)
 admin.site.register(StockThreshold)  
+admin.site.register(DailySalesRollup)
+admin.site.register(ForecastSnapshot)
+admin.site.register(LowStockAlert)
+admin.site.register(ReorderRun)
+admin.site.register(StockLot)
 
 admin.site.site_header = "Business Dashboard "
 admin.site.site_title = "Business Dashboard"
@@ -0,0 +1,93 @@
+"""
+Low Stock Alerts Module
+Opens and resolves LowStockAlert rows as stock moves, so readers never scan the catalogue
+"""
+from django.db.models import Exists, F, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+from .cache import bump_data_version, cached
+from .events import publish_on_commit
+from .models import DEFAULT_LOW_STOCK_THRESHOLD, LowStockAlert, Product
+
+
+def sync_low_stock_alerts(product_ids=None):
+    """
+    Bring the open alerts of product_ids (default: every product) in line with stock.
+
+    Stock, threshold and whether an alert is already open are read in one
+    query. Products that fell below their threshold get a new alert and
+    products back at or above it have theirs resolved. Returns the number
+    of alerts (opened, resolved).
+    """
+    products = Product.objects.with_threshold().annotate(
+        has_open_alert=Exists(LowStockAlert.objects.open().filter(product=OuterRef('pk')))
+    )
+    if product_ids is None:
+        products = products.filter(Q(stock_quantity__lt=F('threshold')) | Q(has_open_alert=True))
+    else:
+        products = products.filter(pk__in=product_ids)
+
+    opened = []
+    names = {}
+    resolved = []
+    for product_id, name, stock, threshold, has_open_alert in products.values_list(
+        'id', 'name', 'stock_quantity', 'threshold', 'has_open_alert'
+    ):
+        if stock < threshold and not has_open_alert:
+            opened.append(LowStockAlert(product_id=product_id, stock_quantity=stock, threshold=threshold))
+            names[product_id] = name
+        elif stock >= threshold and has_open_alert:
+            resolved.append(product_id)
+
+    if opened:
+        # A concurrent writer may have opened the same alert; the partial unique constraint keeps one
+        LowStockAlert.objects.bulk_create(opened, ignore_conflicts=True)
+    if resolved:
+        LowStockAlert.objects.open().filter(product_id__in=resolved).update(resolved_at=now())
+    if opened or resolved:
+        bump_data_version()
+        # Live dashboards add and remove these rows of their low stock list
+        publish_on_commit('low_stock', lambda: {
+            'opened': [
+                {
+                    'product_id': alert.product_id,
+                    'name': names[alert.product_id],
+                    'stock_quantity': alert.stock_quantity,
+                    'threshold': alert.threshold,
+                }
+                for alert in opened
+            ],
+            'resolved': resolved,
+        })
+    return len(opened), len(resolved)
+
+
+def open_alerts():
+    """Open alerts with current stock and threshold, lowest stock first"""
+    return (
+        LowStockAlert.objects.open()
+        .select_related('product')
+        .annotate(
+            current_stock=F('product__stock_quantity'),
+            current_threshold=Coalesce('product__stockthreshold__threshold', Value(DEFAULT_LOW_STOCK_THRESHOLD)),
+        )
+        .order_by('current_stock', 'product__name')
+    )
+
+
+def _alert_rows():
+    return [
+        {
+            'product_id': alert.product_id,
+            'name': alert.product.name,
+            'stock_quantity': alert.current_stock,
+            'threshold': alert.current_threshold,
+            'since': alert.created_at.isoformat(),
+        }
+        for alert in open_alerts()
+    ]
+
+
+def cached_low_stock_alerts():
+    """Open alerts as JSON-ready dicts, cached until the next stock or threshold change"""
+    return cached('low_stock_alerts', _alert_rows)
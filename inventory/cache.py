@@ -0,0 +1,96 @@
+"""
+Versioned Cache Module
+Caches derived data under a key that changes whenever sales or purchases are written
+"""
+import time
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+
+
+KEY_PREFIX = 'inventory'
+VERSION_KEY = f'{KEY_PREFIX}:data_version'
+STATS_KEYS = {'hits': f'{KEY_PREFIX}:stats:hits', 'misses': f'{KEY_PREFIX}:stats:misses'}
+DEFAULT_TIMEOUT = 60 * 60
+
+
+def data_version():
+    """Current data version, initialised on first use"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Start from the clock so an evicted counter never reuses an old version
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def _bump():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def bump_data_version():
+    """
+    Invalidate every versioned entry.
+
+    The version is bumped straight away so readers stop using old entries,
+    and again on commit so nothing computed mid-transaction outlives it.
+    """
+    _bump()
+    transaction.on_commit(_bump)
+
+
+def _count(stat):
+    key = STATS_KEYS[stat]
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+
+def _key(name):
+    return f'{KEY_PREFIX}:{name}:v{data_version()}'
+
+
+def cached(name, builder, timeout=DEFAULT_TIMEOUT):
+    """Return the cached value for name at the current data version, building it on a miss"""
+    key = _key(name)
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value
+
+    _count('misses')
+    value = builder()
+    cache.set(key, value, timeout)
+    return value
+
+
+async def acached(name, builder, timeout=DEFAULT_TIMEOUT):
+    """cached() for async views: builder is a coroutine function, awaited on a miss"""
+    key = await sync_to_async(_key)(name)
+    value = await cache.aget(key)
+    if value is not None:
+        await sync_to_async(_count)('hits')
+        return value
+
+    await sync_to_async(_count)('misses')
+    value = await builder()
+    await cache.aset(key, value, timeout)
+    return value
+
+
+def cache_stats():
+    """Hit/miss counters and hit rate of versioned lookups"""
+    values = cache.get_many(STATS_KEYS.values())
+    stats = {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+    total = stats['hits'] + stats['misses']
+    stats['hit_rate'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+def reset_cache_stats():
+    cache.delete_many(STATS_KEYS.values())
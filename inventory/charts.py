@@ -0,0 +1,76 @@
+"""
+Chart Data Module
+Sales and purchase series for the charts as JSON, fetched incrementally with since= and until=
+"""
+import hashlib
+import json
+import numpy as np
+from .cache import cached
+from .downsampling import lttb_indices
+from .timeseries import GRANULARITIES, period_labels, period_start, sales_series
+
+
+# Chart series and the sales_series field each one is read from
+CHART_FIELDS = {
+    'quantity': 'quantity',
+    'sales': 'revenue_without_gst',
+    'sales_with_gst': 'revenue',
+    'purchases': 'purchase_cost',
+}
+# Most points a response carries per series, whatever the length of the history
+MAX_CHART_POINTS = 1000
+MIN_CHART_POINTS = 3
+
+
+def chart_data(granularity='day', since=None, until=None, points=MAX_CHART_POINTS, by='quantity'):
+    """
+    Chart series from `since` to `until` (inclusive), one point per period.
+
+    since is moved back to the start of its period so the first point is
+    complete. Without since the series starts at the first sale. Longer
+    series are downsampled to `points` periods with LTTB on the `by` series,
+    and the other series are sampled at the same periods. The response's
+    ``next_since`` is the start of its last period: the only one that can
+    still grow, and the place for the next incremental fetch to start from.
+    """
+    if since is not None:
+        since = period_start(since, granularity)
+    series = sales_series(since, until, granularity, trim_leading=since is None)
+    downsampled = len(series['periods']) > points
+    if downsampled:
+        keep = lttb_indices(series[CHART_FIELDS[by]], points)
+        series = {key: values[keep] for key, values in series.items()}
+
+    starts = period_labels(series)
+    data = {
+        'granularity': granularity,
+        'since': starts[0] if starts else None,
+        'until': until.isoformat(),
+        'next_since': starts[-1] if starts else (since.isoformat() if since else None),
+        'downsampled': downsampled,
+        'labels': period_labels(series, granularity),
+        'starts': starts,
+    }
+    for name, field in CHART_FIELDS.items():
+        data[name] = series[field].astype(int).tolist() if name == 'quantity' else np.round(series[field], 2).tolist()
+    return data
+
+
+def cached_chart_data(granularity, since, until, points=MAX_CHART_POINTS, by='quantity'):
+    """(data, etag) for chart_data, cached until the next write; the ETag is a hash of the content"""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}, expected one of: {', '.join(GRANULARITIES)}")
+    if by not in CHART_FIELDS:
+        raise ValueError(f"Unknown series {by!r}, expected one of: {', '.join(CHART_FIELDS)}")
+    try:
+        points = max(MIN_CHART_POINTS, min(int(points), MAX_CHART_POINTS))
+    except (TypeError, ValueError):
+        raise ValueError('points must be a whole number.')
+
+    def build():
+        data = chart_data(granularity, since, until, points, by)
+        payload = json.dumps(data, sort_keys=True, separators=(',', ':'))
+        return {'data': data, 'etag': hashlib.sha256(payload.encode()).hexdigest()[:32]}
+
+    entry = cached(f'chart_data:{granularity}:{since}:{until}:{points}:{by}', build)
+    return entry['data'], entry['etag']
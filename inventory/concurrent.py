@@ -0,0 +1,24 @@
+"""
+Concurrent Queries Module
+Runs independent ORM reads from async views at the same time, each in a worker thread of its own
+"""
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def in_thread(function, *args):
+    """
+    Awaitable running function(*args) in a worker thread.
+
+    sync_to_async's default, thread-sensitive mode runs every call on one
+    shared thread, one after another; this hands each call to the event
+    loop's executor, so queries gathered together really overlap. Every
+    worker thread keeps its own database connection, released as at the
+    end of a request (closed once older than CONN_MAX_AGE).
+    """
+    def run():
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)()
@@ -0,0 +1,52 @@
+"""
+Downsampling Module
+Largest-Triangle-Three-Buckets (LTTB) selection of the points worth drawing in a long series
+"""
+import numpy as np
+
+
+def lttb_indices(values, threshold):
+    """
+    Indices of at most `threshold` points of values that keep its visual shape.
+
+    The first and last points are always kept. The points in between are
+    split into threshold - 2 equal buckets, and from each bucket the point
+    forming the largest triangle with the point kept before it and the
+    average of the next bucket is kept, so peaks and dips survive. Bucket
+    averages and triangle areas are computed with array operations; only the
+    walk from bucket to bucket is a Python loop, threshold steps long.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    count = len(values)
+    if threshold >= count:
+        return np.arange(count)
+    if threshold < 3:
+        raise ValueError('threshold must be at least 3')
+
+    # threshold - 2 buckets over the interior points 1 .. count - 2; each holds at least one point
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    totals = np.concatenate(([0.0], np.cumsum(values)))
+    sizes = np.diff(edges)
+    average_x = (edges[:-1] + edges[1:] - 1) / 2
+    average_y = (totals[edges[1:]] - totals[edges[:-1]]) / sizes
+    # The point after the last bucket is the last point itself
+    next_x = np.append(average_x[1:], count - 1)
+    next_y = np.append(average_y[1:], values[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = count - 1
+    positions = np.arange(count, dtype=np.float64)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        x = positions[start:stop]
+        y = values[start:stop]
+        # Twice the triangle area; the factor does not change the argmax
+        areas = np.abs(
+            (previous - next_x[bucket]) * (y - values[previous])
+            - (previous - x) * (next_y[bucket] - values[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
@@ -0,0 +1,138 @@
+"""
+Live Events Module
+In-process publish/subscribe behind the dashboard's server-sent event stream
+"""
+import asyncio
+import itertools
+import json
+import threading
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from .models import CENT
+from .stats import cached_dashboard_stats
+
+
+# Events a slow client may fall behind by before newer ones are dropped for it
+QUEUE_SIZE = 100
+
+# Seconds between keepalive comments on an idle stream
+KEEPALIVE_SECONDS = 15
+
+# How long a browser waits before reconnecting a closed stream
+RETRY_MILLISECONDS = 3000
+
+
+def format_event(event, data, event_id=None):
+    """One server-sent event with a JSON payload"""
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _offer(queue, message):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        pass
+
+
+class Broker:
+    """
+    Fans events out to every stream subscribed in this process.
+
+    publish() can be called from any thread, e.g. a sync view running in
+    the ASGI thread pool: each message is handed to the subscriber's own
+    event loop. A subscriber whose queue is full misses the message rather
+    than holding up the writer.
+    """
+
+    def __init__(self, queue_size=QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def subscribe(self):
+        """Queue of formatted events for the calling event loop"""
+        queue = asyncio.Queue(self.queue_size)
+        with self._lock:
+            self._subscribers[queue] = asyncio.get_running_loop()
+        return queue
+
+    def unsubscribe(self, queue):
+        with self._lock:
+            self._subscribers.pop(queue, None)
+
+    def publish(self, event, data):
+        """Send an event to every subscriber; returns how many there were"""
+        with self._lock:
+            message = format_event(event, data, next(self._ids))
+            subscribers = list(self._subscribers.items())
+        for queue, loop in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # The subscriber's loop has closed without unsubscribing
+                self.unsubscribe(queue)
+        return len(subscribers)
+
+
+broker = Broker()
+
+def publish_stats():
+    """Send the stat card totals, unless nobody listens"""
+    if broker.has_subscribers():
+        broker.publish('stats', cached_dashboard_stats())
+
+
+def sale_payload(sale):
+    return {
+        'id': sale.id,
+        'product_id': sale.product_id,
+        'product': sale.product.name,
+        'quantity': sale.quantity_sold,
+        'date': sale.date.isoformat(),
+        'total': sale.total_sale_value().quantize(CENT),
+    }
+
+
+def publish_on_commit(event, build):
+    """
+    Publish build()'s result once the current transaction commits.
+
+    Nothing is sent for a rolled back write, and build() only runs when a
+    stream is listening.
+    """
+    def send():
+        if broker.has_subscribers():
+            broker.publish(event, build())
+    transaction.on_commit(send)
+
+
+class _PendingStats:
+    """One stats event owed to the writes of a transaction"""
+    sent = False
+
+
+def publish_stats_on_commit():
+    """
+    Send the totals once the transaction commits, once however many rows it writes.
+
+    Every write queues a callback, but the callbacks of one transaction share
+    the connection's pending entry and only the first to run publishes. A
+    rolled back transaction leaves its entry unsent for the next one to use.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(connection, 'pending_stats_event', None)
+    if pending is None or pending.sent:
+        pending = connection.pending_stats_event = _PendingStats()
+
+    def send():
+        if not pending.sent:
+            pending.sent = True
+            publish_stats()
+    transaction.on_commit(send)
@@ -0,0 +1,88 @@
+"""
+Forecast Snapshot Module
+Precomputes forecasts off the request path and stores them as ForecastSnapshot rows
+"""
+import time
+from itertools import repeat
+from django.db import transaction
+from .models import ForecastSnapshot, Product, ProductForecast
+from .process_pool import pool_map
+from .sales_analytics import SalesAnalytics
+
+
+def shard_ranges(product_ids, shards):
+    """Split sorted product ids into at most `shards` inclusive (first_id, last_id) ranges"""
+    product_ids = list(product_ids)
+    if not product_ids:
+        return []
+    shards = max(1, min(shards, len(product_ids)))
+    size = -(-len(product_ids) // shards)
+    return [
+        (product_ids[start], product_ids[min(start + size, len(product_ids)) - 1])
+        for start in range(0, len(product_ids), size)
+    ]
+
+
+def forecast_shard(id_range, history_days, horizon):
+    """Fit every product in one id range; returns (product_id, slope, intercept, r2, predicted) tuples"""
+    analytics = SalesAnalytics()
+    analytics.prediction_days = horizon
+    fits = analytics.get_product_forecasts(history_days, id_range)
+    if fits is None:
+        return []
+    return list(zip(
+        fits['ids'].tolist(),
+        fits['slope'].tolist(),
+        fits['intercept'].tolist(),
+        fits['r2'].tolist(),
+        fits['predictions'].sum(axis=1).tolist(),
+    ))
+
+
+def refresh_forecasts(history_days=90, horizon=30, workers=1, shards=None, keep=10):
+    """
+    Compute a new ForecastSnapshot with per-product forecasts and prune old snapshots.
+
+    Products are split into id-range shards; with workers > 1 the shards are
+    fitted in a process pool. Only the newest `keep` snapshots are kept.
+    """
+    if keep < 1:
+        raise ValueError('keep must be at least 1, or the new snapshot would be deleted.')
+    started = time.perf_counter()
+
+    analytics = SalesAnalytics()
+    analytics.history_days = history_days
+    analytics.prediction_days = horizon
+    forecast = analytics.get_sales_forecast()
+
+    product_ids = Product.objects.order_by('id').values_list('id', flat=True)
+    ranges = shard_ranges(product_ids, shards or workers)
+    args = (ranges, repeat(history_days), repeat(horizon))
+    results = pool_map(forecast_shard, *args, workers=workers if len(ranges) > 1 else 1)
+
+    with transaction.atomic():
+        snapshot = ForecastSnapshot.objects.create(
+            history_days=history_days,
+            horizon=horizon,
+            forecast=forecast,
+            duration=time.perf_counter() - started,
+        )
+        ProductForecast.objects.bulk_create(
+            [
+                ProductForecast(
+                    snapshot=snapshot,
+                    product_id=product_id,
+                    slope=slope,
+                    intercept=intercept,
+                    r2=r2,
+                    predicted_quantity=predicted,
+                )
+                for shard in results
+                for product_id, slope, intercept, r2, predicted in shard
+            ],
+            batch_size=2000,
+        )
+        stale = ForecastSnapshot.objects.order_by('-created_at', '-id').values_list('id', flat=True)[keep:]
+        ForecastSnapshot.objects.filter(id__in=list(stale)).delete()
+
+    return snapshot
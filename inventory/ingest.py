@@ -0,0 +1,154 @@
+"""
+Bulk Ingestion Module
+Loads batches of sales and purchases (CSV or JSON lines) in a single transaction
+"""
+import csv
+import json
+from collections import defaultdict
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from .alerts import sync_low_stock_alerts
+from .events import publish_stats_on_commit
+from .lots import allocate_lots
+from .models import Product, Purchase, Sale, StockLot
+from .rollups import record_bulk
+from .stock import clean_price
+
+
+FORMATS = ('csv', 'jsonl')
+
+
+class IngestError(ValueError):
+    """Raised when a batch is rejected; ``errors`` lists every problem found"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(errors))
+
+
+def parse_rows(lines, fmt):
+    """
+    Yield (line_number, row) pairs from CSV or JSON-lines text.
+
+    Each row has ``type`` (sale or purchase), ``product_id``, ``quantity``
+    and, for purchases, ``price_per_unit``.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as exc:
+                row = {'_error': f'invalid JSON ({exc.msg})'}
+            if not isinstance(row, dict):
+                row = {'_error': 'expected a JSON object'}
+            yield line_number, row
+    else:
+        raise IngestError([f"Unknown format {fmt!r}, expected one of: {', '.join(FORMATS)}"])
+
+
+def _clean_row(line_number, row, errors):
+    if '_error' in row:
+        errors.append(f"Line {line_number}: {row['_error']}")
+        return None
+
+    kind = str(row.get('type') or 'sale').strip().lower()
+    if kind not in ('sale', 'purchase'):
+        errors.append(f"Line {line_number}: unknown type {kind!r}")
+        return None
+
+    try:
+        product_id = int(row.get('product_id'))
+        quantity = int(row.get('quantity'))
+    except (TypeError, ValueError):
+        errors.append(f"Line {line_number}: product_id and quantity must be integers")
+        return None
+    if quantity <= 0:
+        errors.append(f"Line {line_number}: quantity must be greater than zero")
+        return None
+
+    price_per_unit = None
+    if kind == 'purchase':
+        value = row.get('price_per_unit')
+        try:
+            price_per_unit = clean_price(str(value).strip() if value is not None else None)
+        except ValidationError as exc:
+            errors.append(f"Line {line_number}: price_per_unit: {' '.join(exc.messages)}")
+            return None
+        if price_per_unit < 0:
+            errors.append(f"Line {line_number}: price_per_unit must not be negative")
+            return None
+
+    return line_number, kind, product_id, quantity, price_per_unit
+
+
+def ingest_rows(rows, batch_size=1000):
+    """
+    Validate and store parsed rows, all or nothing.
+
+    Product IDs are checked with one query, Sale and Purchase rows are
+    inserted with ``bulk_create`` and stock is changed with one UPDATE per
+    product. Purchases are received as lots without an expiry date and
+    sales are allocated to lots FEFO, per product. Returns a dict with the number of sales and purchases stored.
+    """
+    errors = []
+    cleaned = [c for c in (_clean_row(n, row, errors) for n, row in rows) if c]
+
+    products = Product.objects.in_bulk({product_id for _, _, product_id, _, _ in cleaned})
+    for line_number, _, product_id, _, _ in cleaned:
+        if product_id not in products:
+            errors.append(f"Line {line_number}: product {product_id} does not exist")
+    if errors:
+        raise IngestError(errors)
+
+    sales = []
+    purchases = []
+    stock_deltas = defaultdict(int)
+    sold = defaultdict(int)
+    for _, kind, product_id, quantity, price_per_unit in cleaned:
+        product = products[product_id]
+        if kind == 'sale':
+            sale = Sale(product=product, quantity_sold=quantity)
+            sale.snapshot_price()  # bulk_create does not call save()
+            sales.append(sale)
+            stock_deltas[product_id] -= quantity
+            sold[product_id] += quantity
+        else:
+            purchases.append(Purchase(product=product, quantity=quantity, price_per_unit=price_per_unit))
+            stock_deltas[product_id] += quantity
+
+    with transaction.atomic():
+        for product_id, delta in stock_deltas.items():
+            updated = (
+                Product.objects
+                .filter(pk=product_id, stock_quantity__gte=max(-delta, 0))
+                .update(stock_quantity=F('stock_quantity') + delta)
+            )
+            if not updated:
+                errors.append(f"Insufficient stock for {products[product_id].name} (needs {-delta})")
+        if errors:
+            raise IngestError(errors)
+
+        Sale.objects.bulk_create(sales, batch_size=batch_size)
+        Purchase.objects.bulk_create(purchases, batch_size=batch_size)
+        StockLot.objects.bulk_create(
+            [
+                StockLot(product_id=p.product_id, purchase=p, quantity=p.quantity, remaining=p.quantity)
+                for p in purchases
+            ],
+            batch_size=batch_size,
+        )
+        for product_id, quantity in sold.items():
+            allocate_lots(product_id, quantity)
+        record_bulk(sales, purchases)
+        sync_low_stock_alerts(list(stock_deltas))
+        # bulk_create skips the signals that push new totals to live dashboards
+        publish_stats_on_commit()
+
+    return {'sales': len(sales), 'purchases': len(purchases)}
@@ -0,0 +1,246 @@
+"""
+Invoice Module
+GST invoices for sales, rendered with ReportLab and cached on disk by content hash
+"""
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+from collections import defaultdict
+from decimal import Decimal
+from pathlib import Path
+from django.conf import settings
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from .models import CENT
+
+
+# Bump when the layout changes so cached files are re-rendered
+INVOICE_LAYOUT_VERSION = 2
+
+COLUMNS = [
+    ('Item', 50, 'left'),
+    ('Qty', 260, 'right'),
+    ('Unit Price', 330, 'right'),
+    ('GST %', 385, 'right'),
+    ('GST', 455, 'right'),
+    ('Total', 545, 'right'),
+]
+
+
+def _money(value):
+    return value.quantize(CENT)
+
+
+def _percent(value):
+    # 18.00 -> 18, 2.50 -> 2.5
+    return f'{value.normalize():f}'
+
+
+def _line(name, quantity, unit_price, gst_rate, date=None):
+    taxable = unit_price * quantity
+    gst = taxable * gst_rate / 100
+    line = {
+        'item': name,
+        'quantity': quantity,
+        'unit_price': _money(unit_price),
+        'gst_rate': gst_rate,
+        'taxable': _money(taxable),
+        'gst': _money(gst),
+        'total': _money(taxable + gst),
+    }
+    if date is not None:
+        line['date'] = date.isoformat()
+    return line
+
+
+def _invoice(number, date, lines):
+    breakdown = defaultdict(lambda: [Decimal(0), Decimal(0)])
+    for line in lines:
+        breakdown[line['gst_rate']][0] += line['taxable']
+        breakdown[line['gst_rate']][1] += line['gst']
+    return {
+        'number': number,
+        'date': date.isoformat(),
+        'lines': lines,
+        # Intra-state supply: GST is split equally into CGST and SGST
+        'gst_breakdown': [
+            {'rate': rate, 'taxable': _money(taxable), 'cgst': _money(gst / 2), 'sgst': _money(gst / 2), 'gst': _money(gst)}
+            for rate, (taxable, gst) in sorted(breakdown.items())
+        ],
+        'subtotal': _money(sum((line['taxable'] for line in lines), Decimal(0))),
+        'gst_total': _money(sum((line['gst'] for line in lines), Decimal(0))),
+        'total': _money(sum((line['total'] for line in lines), Decimal(0))),
+    }
+
+
+def sale_invoice_number(sale_id):
+    return f'INV-{sale_id:06d}'
+
+
+def sale_invoice_data(sales):
+    """
+    Invoice contents for one or more sales (with products loaded), one line item per sale.
+
+    Prices and GST rates are the ones stored on each sale, so an invoice
+    never changes when the product is repriced later.
+    """
+    sales = sorted(sales, key=lambda sale: sale.id)
+    number = sale_invoice_number(sales[0].id)
+    if len(sales) > 1:
+        number = f'{number}-{len(sales)}'
+    lines = [
+        _line(sale.product.name, sale.quantity_sold, sale.unit_price, sale.gst_rate, sale.date)
+        for sale in sales
+    ]
+    return _invoice(number, max(sale.date for sale in sales), lines)
+
+
+def product_invoice_data(product, date):
+    """Pro forma invoice for one unit of a product"""
+    return _invoice(f'PRO-{product.id:06d}', date, [_line(product.name, 1, product.price, product.gst_rate)])
+
+
+def invoice_hash(data):
+    """Content hash of an invoice; identical contents and layout give the same file"""
+    payload = json.dumps([INVOICE_LAYOUT_VERSION, data], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def draw_invoice(pdf, data):
+    """Draw one invoice onto a canvas, starting a new page for it and for overflowing line items"""
+    width, height = A4
+
+    def text(x, y, value, align='left', font='Helvetica', size=9):
+        pdf.setFont(font, size)
+        draw = pdf.drawRightString if align == 'right' else pdf.drawString
+        draw(x, y, str(value))
+
+    def header():
+        text(50, height - 60, 'Business Dashboard', font='Helvetica-Bold', size=16)
+        text(50, height - 80, 'Tax Invoice', size=11)
+        text(545, height - 60, f"Invoice {data['number']}", align='right', font='Helvetica-Bold', size=11)
+        text(545, height - 80, f"Date: {data['date']}", align='right')
+        y = height - 120
+        for title, x, align in COLUMNS:
+            text(x, y, title, align, font='Helvetica-Bold')
+        pdf.line(50, y - 5, 545, y - 5)
+        return y - 20
+
+    y = header()
+    for line in data['lines']:
+        if y < 120:
+            pdf.showPage()
+            y = header()
+        values = [
+            line['item'][:40], line['quantity'], f"{line['unit_price']:.2f}",
+            _percent(line['gst_rate']), f"{line['gst']:.2f}", f"{line['total']:.2f}",
+        ]
+        for (_, x, align), value in zip(COLUMNS, values):
+            text(x, y, value, align)
+        y -= 15
+
+    rows = 3 + len(data['gst_breakdown'])
+    if y - rows * 15 < 60:
+        pdf.showPage()
+        y = height - 60
+    pdf.line(50, y + 5, 545, y + 5)
+    y -= 10
+    text(455, y, 'Taxable value', 'right')
+    text(545, y, f"{data['subtotal']:.2f}", 'right')
+    for rate in data['gst_breakdown']:
+        y -= 15
+        text(455, y, f"CGST {_percent(rate['rate'] / 2)}% + SGST {_percent(rate['rate'] / 2)}% on {rate['taxable']:.2f}", 'right')
+        text(545, y, f"{rate['cgst']:.2f} + {rate['sgst']:.2f}", 'right')
+    y -= 15
+    text(455, y, 'Total GST', 'right')
+    text(545, y, f"{data['gst_total']:.2f}", 'right')
+    y -= 20
+    text(455, y, 'Total (Rs.)', 'right', font='Helvetica-Bold', size=11)
+    text(545, y, f"{data['total']:.2f}", 'right', font='Helvetica-Bold', size=11)
+    text(50, 40, 'Thank you for your purchase!')
+    pdf.showPage()
+
+
+def write_invoices(datas, target):
+    """Render invoices one after another into a single PDF written to target (a path or binary file)"""
+    pdf = canvas.Canvas(target, pagesize=A4, invariant=1)
+    for data in datas:
+        draw_invoice(pdf, data)
+    pdf.save()
+
+
+def render_invoices(datas, path):
+    """Render invoices into one PDF at path, written to a temporary file first and moved into place"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    os.close(descriptor)
+    try:
+        write_invoices(datas, temporary)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+    return path
+
+
+def invoice_cache_dir():
+    return Path(settings.INVOICE_CACHE_DIR)
+
+
+def invoice_file(data):
+    """
+    Path and content hash of the cached PDF for an invoice, rendering it on a miss.
+
+    Files are named by content hash, so a changed price or quantity renders
+    a new file and an unchanged invoice is never drawn twice.
+    """
+    digest = invoice_hash(data)
+    path = invoice_cache_dir() / digest[:2] / f'{digest}.pdf'
+    if not path.exists():
+        render_invoices([data], path)
+    return path, digest
+
+
+class _ZipSink:
+    """Write-only file object collecting what ZipFile writes until the stream picks it up"""
+
+    def __init__(self):
+        self.chunks = []
+        self.offset = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.offset
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_zip(entries, chunk_size=64 * 1024):
+    """
+    Yield a ZIP archive of (name, path) entries piece by piece.
+
+    Only one chunk of one file is held in memory at a time; entries can be
+    a generator that renders each file just before it is needed.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, path in entries:
+            with open(path, 'rb') as source, archive.open(name, 'w') as target:
+                for chunk in iter(lambda: source.read(chunk_size), b''):
+                    target.write(chunk)
+                    yield sink.take()
+            yield sink.take()
+    yield sink.take()
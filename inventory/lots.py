@@ -0,0 +1,59 @@
+"""
+Stock Lots Module
+Tracks stock per lot with its own expiry date and sells it first-expiry-first-out (FEFO)
+"""
+from datetime import datetime, timedelta
+from django.db.models import F
+from .models import StockLot
+
+
+def _open_lots(product_id):
+    # Matches the partial indexes, which only hold lots with stock left
+    return StockLot.objects.filter(product_id=product_id, remaining__gt=0)
+
+
+def allocate_lots(product_id, quantity):
+    """
+    Take quantity units from a product's lots, earliest expiry first.
+
+    Lots without an expiry date are used after every dated lot, oldest
+    first. Each step reads the next lot with one lookup on lot_fefo_idx and
+    takes from it with a conditional UPDATE, so the cost is O(log n) per lot
+    touched and concurrent sales cannot take the same units twice. Returns
+    the [(lot_id, units)] taken; the total is less than quantity only when
+    the product has stock that predates lot tracking.
+    """
+    allocated = []
+    needed = quantity
+    for lots in (
+        _open_lots(product_id).filter(expiry_date__isnull=False).order_by('expiry_date', 'id'),
+        _open_lots(product_id).filter(expiry_date__isnull=True).order_by('id'),
+    ):
+        while needed:
+            lot = lots.values_list('id', 'remaining').first()
+            if lot is None:
+                break
+            lot_id, remaining = lot
+            take = min(needed, remaining)
+            # Zero rows means a concurrent sale got there first; look again
+            if StockLot.objects.filter(pk=lot_id, remaining__gte=take).update(remaining=F('remaining') - take):
+                allocated.append((lot_id, take))
+                needed -= take
+        if not needed:
+            break
+    return allocated
+
+
+def expiring_lots(days=30, today=None):
+    """
+    Lots with stock left that expire within `days` days, already expired ones included.
+
+    One range scan over lot_expiry_idx, soonest expiry first.
+    """
+    cutoff = (today or datetime.now().date()) + timedelta(days=days)
+    return (
+        StockLot.objects
+        .filter(remaining__gt=0, expiry_date__lte=cutoff)
+        .select_related('product')
+        .order_by('expiry_date', 'id')
+    )
@@ -0,0 +1,42 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.ingest import FORMATS, IngestError, ingest_rows, parse_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk import sales and purchases from a CSV or JSON-lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' to read from stdin")
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Input format, detected from the file extension when omitted',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+
+        started = time.perf_counter()
+        try:
+            if path == '-':
+                result = ingest_rows(parse_rows(sys.stdin, fmt), batch_size=options['batch_size'])
+            else:
+                with open(path, newline='', encoding='utf-8') as handle:
+                    result = ingest_rows(parse_rows(handle, fmt), batch_size=options['batch_size'])
+        except OSError as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+        except IngestError as exc:
+            raise CommandError('Import rejected, nothing was saved:\n' + '\n'.join(exc.errors))
+        elapsed = time.perf_counter() - started
+
+        rows = result['sales'] + result['purchases']
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['sales']} sales and {result['purchases']} purchases "
+            f"in {elapsed:.2f}s ({rate:.0f} rows/s)."
+        ))
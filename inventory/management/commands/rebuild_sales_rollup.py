@@ -0,0 +1,31 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild or backfill the DailySalesRollup table from Sale and Purchase rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First date to rebuild (YYYY-MM-DD), defaults to the first sale')
+        parser.add_argument('--end', help='Last date to rebuild (YYYY-MM-DD), defaults to the last sale')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per bulk insert')
+
+    def handle(self, *args, **options):
+        start = self._parse_date(options['start'])
+        end = self._parse_date(options['end'])
+        if start and end and start > end:
+            raise CommandError('--start must not be after --end')
+
+        rows = rebuild_rollups(start, end, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rows} daily rollup rows.'))
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise CommandError(f'Invalid date: {value!r}, expected YYYY-MM-DD')
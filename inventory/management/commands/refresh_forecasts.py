@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from inventory.forecast_snapshots import refresh_forecasts
+
+
+class Command(BaseCommand):
+    help = 'Precompute sales forecasts into a ForecastSnapshot, once or in a loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history-days', type=int, default=90, help='Days of history to fit on')
+        parser.add_argument('--horizon', type=int, default=30, help='Days to forecast')
+        parser.add_argument('--workers', type=int, default=1, help='Processes used to fit product shards')
+        parser.add_argument('--shards', type=int, help='Number of product shards (defaults to --workers)')
+        parser.add_argument('--keep', type=int, default=10, help='Snapshots to keep')
+        parser.add_argument('--loop', action='store_true', help='Keep running, refreshing every --interval seconds')
+        parser.add_argument('--interval', type=int, default=900, help='Seconds between refreshes with --loop')
+
+    def handle(self, *args, **options):
+        if options['history_days'] < 1 or options['horizon'] < 1 or options['workers'] < 1:
+            raise CommandError('--history-days, --horizon and --workers must be positive')
+        if options['keep'] < 1:
+            raise CommandError('--keep must be at least 1')
+
+        while True:
+            close_old_connections()
+            try:
+                snapshot = refresh_forecasts(
+                    history_days=options['history_days'],
+                    horizon=options['horizon'],
+                    workers=options['workers'],
+                    shards=options['shards'],
+                    keep=options['keep'],
+                )
+            except Exception as exc:
+                if not options['loop']:
+                    raise
+                self.stderr.write(f'Forecast refresh failed: {exc}')
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Saved {snapshot} with {snapshot.product_forecasts.count()} product forecasts '
+                    f'in {snapshot.duration:.2f}s.'
+                ))
+
+            if not options['loop']:
+                break
+            try:
+                time.sleep(options['interval'])
+            except KeyboardInterrupt:
+                break
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory.reorder import refresh_reorder
+
+
+class Command(BaseCommand):
+    help = 'Compute sales velocity, days of cover and reorder quantities for every product'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, default=30, help='Days of sales history for the velocity')
+        parser.add_argument('--lead-time', type=int, default=7, help='Days between ordering and receiving stock')
+        parser.add_argument('--cover-days', type=int, default=30, help='Days of sales each reorder should cover')
+        parser.add_argument('--keep', type=int, default=5, help='Runs to keep')
+
+    def handle(self, *args, **options):
+        if options['window'] < 1 or options['lead_time'] < 0 or options['cover_days'] < 1:
+            raise CommandError('--window and --cover-days must be positive and --lead-time not negative')
+        if options['keep'] < 1:
+            raise CommandError('--keep must be at least 1')
+
+        run = refresh_reorder(
+            window_days=options['window'],
+            lead_time_days=options['lead_time'],
+            cover_days=options['cover_days'],
+            keep=options['keep'],
+        )
+        to_reorder = run.suggestions.filter(reorder_quantity__gt=0).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Saved {run} for {run.suggestions.count()} products ({to_reorder} to reorder) '
+            f'in {run.duration:.2f}s.'
+        ))
@@ -0,0 +1,66 @@
+import shutil
+import zipfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from inventory.invoice_runs import render_sale_invoices
+from inventory.models import Sale
+
+
+class Command(BaseCommand):
+    help = 'Render one invoice PDF per sale into a directory or ZIP archive using a process pool'
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--output', help='Directory to write the PDFs to')
+        target.add_argument('--archive', help='ZIP file to write; PDFs are staged in <archive>.parts until done')
+        parser.add_argument('--start', help='First sale date (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last sale date (YYYY-MM-DD)')
+        parser.add_argument('--product', type=int, help='Only sales of this product id')
+        parser.add_argument('--workers', type=int, default=1, help='Rendering processes')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Sales loaded and rendered per task')
+        parser.add_argument('--force', action='store_true', help='Re-render invoices that already exist')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['chunk_size'] < 1:
+            raise CommandError('--workers and --chunk-size must be positive')
+
+        sales = Sale.objects.all()
+        for option, lookup in (('start', 'date__gte'), ('end', 'date__lte')):
+            if options[option]:
+                try:
+                    day = parse_date(options[option])
+                except ValueError:
+                    day = None  # Well-formed but not a real date, e.g. 2024-02-30
+                if day is None:
+                    raise CommandError(f'Invalid --{option} date, expected YYYY-MM-DD')
+                sales = sales.filter(**{lookup: day})
+        if options['product']:
+            sales = sales.filter(product_id=options['product'])
+
+        archive = Path(options['archive']) if options['archive'] else None
+        output_dir = archive.with_name(archive.name + '.parts') if archive else Path(options['output'])
+
+        stats = render_sale_invoices(
+            sales, output_dir, workers=options['workers'], chunk_size=options['chunk_size'], force=options['force']
+        )
+
+        for pid, (rendered, seconds) in sorted(stats['workers'].items()):
+            rate = rendered / seconds if seconds else 0
+            self.stdout.write(f'  worker {pid}: {rendered} invoices in {seconds:.2f}s ({rate:.1f} invoices/s)')
+        rate = stats['rendered'] / stats['seconds'] if stats['seconds'] else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {stats['rendered']} invoices ({stats['skipped']} already done) "
+            f"in {stats['seconds']:.2f}s ({rate:.1f} invoices/s)."
+        ))
+
+        if archive:
+            partial = archive.with_name(archive.name + '.tmp')
+            with zipfile.ZipFile(partial, 'w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+                for path in sorted(output_dir.glob('*.pdf')):
+                    zip_file.write(path, path.name)
+            partial.replace(archive)
+            shutil.rmtree(output_dir)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {archive}.'))
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+
+def backfill_rollups(apps, schema_editor):
+    Sale = apps.get_model('inventory', 'Sale')
+    Purchase = apps.get_model('inventory', 'Purchase')
+    DailySalesRollup = apps.get_model('inventory', 'DailySalesRollup')
+
+    buckets = {}
+    sale_totals = Sale.objects.values('date', 'product_id').annotate(
+        total_quantity=Sum('quantity_sold'),
+        total_count=Count('id'),
+        total_revenue=Sum(
+            (F('product__price') + F('product__price') * F('product__gst_rate') / 100) * F('quantity_sold'),
+            output_field=models.FloatField(),
+        ),
+        total_revenue_without_gst=Sum(F('quantity_sold') * F('product__price'), output_field=models.FloatField()),
+    ).order_by()
+    for row in sale_totals:
+        buckets[(row['date'], row['product_id'])] = DailySalesRollup(
+            date=row['date'],
+            product_id=row['product_id'],
+            quantity=row['total_quantity'],
+            sales_count=row['total_count'],
+            revenue=row['total_revenue'],
+            revenue_without_gst=row['total_revenue_without_gst'],
+        )
+
+    purchase_totals = Purchase.objects.values('date', 'product_id').annotate(
+        total_quantity=Sum('quantity'),
+        total_cost=Sum(F('quantity') * F('price_per_unit'), output_field=models.FloatField()),
+    ).order_by()
+    for row in purchase_totals:
+        rollup = buckets.setdefault(
+            (row['date'], row['product_id']),
+            DailySalesRollup(date=row['date'], product_id=row['product_id']),
+        )
+        rollup.purchased_quantity = row['total_quantity']
+        rollup.purchase_cost = row['total_cost']
+
+    DailySalesRollup.objects.bulk_create(buckets.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_customuser'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySalesRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('sales_count', models.IntegerField(default=0)),
+                ('revenue', models.FloatField(default=0)),
+                ('revenue_without_gst', models.FloatField(default=0)),
+                ('purchased_quantity', models.IntegerField(default=0)),
+                ('purchase_cost', models.FloatField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='inventory.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'product'), name='unique_daily_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
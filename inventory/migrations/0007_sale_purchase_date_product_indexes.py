@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_dailysalesrollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailysalesrollup',
+            index=models.Index(fields=['product', 'date'], name='rollup_product_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['date', 'product'], name='purchase_date_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='purchase',
+            index=models.Index(fields=['product', 'date'], name='purchase_product_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['date', 'product'], name='sale_date_product_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['product', 'date'], name='sale_product_date_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_sale_purchase_date_product_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('history_days', models.IntegerField()),
+                ('horizon', models.IntegerField()),
+                ('forecast', models.JSONField()),
+                ('duration', models.FloatField(default=0)),
+            ],
+            options={
+                'get_latest_by': 'created_at',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slope', models.FloatField()),
+                ('intercept', models.FloatField()),
+                ('r2', models.FloatField()),
+                ('predicted_quantity', models.FloatField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.product')),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_forecasts', to='inventory.forecastsnapshot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('snapshot', 'product'), name='unique_product_forecast')],
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+import sqlite3
+
+from django.db import migrations
+
+
+# SQLite keeps the trigram full-text tables in sync with triggers, so bulk_create,
+# queryset.update() and raw writes are indexed as well as model saves. The tables
+# are only created on SQLite 3.34+ (FTS5 trigram tokenizer); other databases
+# fall back to icontains in inventory.search.
+CREATE_SQL = [
+    "CREATE VIRTUAL TABLE inventory_product_search USING fts5(name, tokenize='trigram')",
+    "CREATE VIRTUAL TABLE inventory_category_search USING fts5(name, tokenize='trigram')",
+    """
+    CREATE TRIGGER inventory_product_search_insert AFTER INSERT ON inventory_product BEGIN
+        INSERT INTO inventory_product_search (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_product_search_update AFTER UPDATE OF name ON inventory_product BEGIN
+        UPDATE inventory_product_search SET name = new.name WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_product_search_delete AFTER DELETE ON inventory_product BEGIN
+        DELETE FROM inventory_product_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_category_search_insert AFTER INSERT ON inventory_category BEGIN
+        INSERT INTO inventory_category_search (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_category_search_update AFTER UPDATE OF name ON inventory_category BEGIN
+        UPDATE inventory_category_search SET name = new.name WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER inventory_category_search_delete AFTER DELETE ON inventory_category BEGIN
+        DELETE FROM inventory_category_search WHERE rowid = old.id;
+    END
+    """,
+    "INSERT INTO inventory_product_search (rowid, name) SELECT id, name FROM inventory_product",
+    "INSERT INTO inventory_category_search (rowid, name) SELECT id, name FROM inventory_category",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS inventory_product_search_insert",
+    "DROP TRIGGER IF EXISTS inventory_product_search_update",
+    "DROP TRIGGER IF EXISTS inventory_product_search_delete",
+    "DROP TRIGGER IF EXISTS inventory_category_search_insert",
+    "DROP TRIGGER IF EXISTS inventory_category_search_update",
+    "DROP TRIGGER IF EXISTS inventory_category_search_delete",
+    "DROP TABLE IF EXISTS inventory_product_search",
+    "DROP TABLE IF EXISTS inventory_category_search",
+]
+
+
+def _supported(schema_editor):
+    return schema_editor.connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def create_search_tables(apps, schema_editor):
+    if _supported(schema_editor):
+        for statement in CREATE_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_search_tables(apps, schema_editor):
+    if _supported(schema_editor):
+        for statement in DROP_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+
+
+def open_existing_alerts(apps, schema_editor):
+    Product = apps.get_model('inventory', 'Product')
+    LowStockAlert = apps.get_model('inventory', 'LowStockAlert')
+
+    low = (
+        Product.objects
+        .annotate(threshold=Coalesce('stockthreshold__threshold', Value(10)))
+        .filter(stock_quantity__lt=F('threshold'))
+        .values_list('id', 'stock_quantity', 'threshold')
+    )
+    LowStockAlert.objects.bulk_create(
+        [
+            LowStockAlert(product_id=product_id, stock_quantity=stock, threshold=threshold)
+            for product_id, stock, threshold in low.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0010_product_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_quantity', models.IntegerField()),
+                ('threshold', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='inventory.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['resolved_at', 'created_at'], name='low_stock_alert_open_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('resolved_at__isnull', True)), fields=('product',), name='unique_open_low_stock_alert')],
+            },
+        ),
+        migrations.RunPython(open_existing_alerts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0011_lowstockalert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReorderRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('window_days', models.IntegerField()),
+                ('lead_time_days', models.IntegerField()),
+                ('cover_days', models.IntegerField()),
+                ('duration', models.FloatField(default=0)),
+            ],
+            options={
+                'get_latest_by': 'created_at',
+            },
+        ),
+        migrations.CreateModel(
+            name='ReorderSuggestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock_quantity', models.IntegerField()),
+                ('velocity', models.FloatField()),
+                ('days_of_cover', models.FloatField(null=True)),
+                ('reorder_point', models.IntegerField()),
+                ('reorder_quantity', models.IntegerField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='inventory.product')),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='suggestions', to='inventory.reorderrun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'days_of_cover'], name='reorder_run_cover_idx')],
+                'constraints': [models.UniqueConstraint(fields=('run', 'product'), name='unique_reorder_suggestion')],
+            },
+        ),
+    ]
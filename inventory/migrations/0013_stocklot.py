@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def open_stock_lots(apps, schema_editor):
+    # Existing stock cannot be traced back to purchases, so it becomes one opening lot per product
+    Product = apps.get_model('inventory', 'Product')
+    StockLot = apps.get_model('inventory', 'StockLot')
+
+    StockLot.objects.bulk_create(
+        [
+            StockLot(product_id=product_id, quantity=stock, remaining=stock, expiry_date=expiry_date)
+            for product_id, stock, expiry_date in (
+                Product.objects.filter(stock_quantity__gt=0)
+                .values_list('id', 'stock_quantity', 'expiry_date')
+                .iterator()
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0012_reorderrun'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockLot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField()),
+                ('remaining', models.IntegerField()),
+                ('expiry_date', models.DateField(blank=True, null=True)),
+                ('received_on', models.DateField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lots', to='inventory.product')),
+                ('purchase', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='inventory.purchase')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('remaining__gt', 0)), fields=['product', 'expiry_date', 'id'], name='lot_fefo_idx'), models.Index(condition=models.Q(('remaining__gt', 0)), fields=['expiry_date'], name='lot_expiry_idx')],
+            },
+        ),
+        migrations.RunPython(open_stock_lots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+import sqlite3
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+# Altering a column makes SQLite rebuild inventory_product, which drops the
+# search triggers from 0010; put them back afterwards (the search table keeps
+# its rows, ids do not change).
+PRODUCT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_product_search_insert AFTER INSERT ON inventory_product BEGIN
+        INSERT INTO inventory_product_search (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_product_search_update AFTER UPDATE OF name ON inventory_product BEGIN
+        UPDATE inventory_product_search SET name = new.name WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_product_search_delete AFTER DELETE ON inventory_product BEGIN
+        DELETE FROM inventory_product_search WHERE rowid = old.id;
+    END
+    """,
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0):
+        for statement in PRODUCT_TRIGGERS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0013_stocklot'),
+    ]
+
+    operations = [
+        # Reversing the AlterFields below rebuilds the table too
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AlterField(
+            model_name='product',
+            name='price',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='gst_rate',
+            field=models.DecimalField(decimal_places=2, default=Decimal('18.00'), max_digits=5),
+        ),
+        migrations.AlterField(
+            model_name='purchase',
+            name='price_per_unit',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='dailysalesrollup',
+            name='revenue',
+            field=models.DecimalField(decimal_places=6, default=0, max_digits=18),
+        ),
+        migrations.AlterField(
+            model_name='dailysalesrollup',
+            name='revenue_without_gst',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='dailysalesrollup',
+            name='purchase_cost',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        # Nullable until 0015 has copied the product prices onto existing sales
+        migrations.AddField(
+            model_name='sale',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='gst_rate',
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+from django.db.models import Max, Min, OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def backfill_sale_prices(apps, schema_editor):
+    # Existing sales take the product's current price and rate, one UPDATE per id range
+    Product = apps.get_model('inventory', 'Product')
+    Sale = apps.get_model('inventory', 'Sale')
+
+    bounds = Sale.objects.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return
+    product = Product.objects.filter(pk=OuterRef('product_id'))
+    for start in range(bounds['first'], bounds['last'] + 1, BATCH_SIZE):
+        Sale.objects.filter(id__gte=start, id__lt=start + BATCH_SIZE, unit_price__isnull=True).update(
+            unit_price=Subquery(product.values('price')[:1]),
+            gst_rate=Subquery(product.values('gst_rate')[:1]),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0014_decimal_money'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_sale_prices, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0015_backfill_sale_prices'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sale',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='sale',
+            name='gst_rate',
+            field=models.DecimalField(decimal_places=2, max_digits=5),
+        ),
+    ]
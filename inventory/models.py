@@ -1,4 +1,8 @@
+from decimal import Decimal
 from django.contrib.auth.models import AbstractUser
+from django.db import models
+from django.db.models import ExpressionWrapper, F, Sum, Value
+from django.db.models.functions import Coalesce
 
 # CustomUser Model
 class CustomUser(AbstractUser):
@@ -16,8 +20,6 @@ class CustomUser(AbstractUser):
         return f"{self.username} ({self.get_role_display()})"
 
 
-from django.db import models
-
 # Category Model
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -25,52 +27,323 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+
+# Money columns hold paise exactly; GST-inclusive amounts need 6 places (price 2, rate 2, percent 2)
+MONEY = {'max_digits': 12, 'decimal_places': 2}
+GST_RATE = {'max_digits': 5, 'decimal_places': 2}
+GST_INCLUSIVE = {'max_digits': 18, 'decimal_places': 6}
+CENT = Decimal('0.01')
+REVENUE_PLACES = Decimal('0.000001')
+
+
+def gst_inclusive(amount, gst_rate):
+    """Exact GST-inclusive value of a Decimal amount"""
+    return amount * (100 + gst_rate) / 100
+
+
+# Low stock level for products without a StockThreshold row
+DEFAULT_LOW_STOCK_THRESHOLD = 10
+
+
+class ProductQuerySet(models.QuerySet):
+    def with_threshold(self):
+        """Annotate each product with its StockThreshold, or the default, as ``threshold``"""
+        return self.annotate(
+            threshold=Coalesce('stockthreshold__threshold', Value(DEFAULT_LOW_STOCK_THRESHOLD))
+        )
+
+    def low_stock(self):
+        """Products below their own threshold, in a single joined query"""
+        return self.with_threshold().filter(stock_quantity__lt=F('threshold'))
+
+
 # Product Model
 class Product(models.Model):
     name = models.CharField(max_length=100)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     stock_quantity = models.IntegerField()
-    price = models.FloatField()
-    gst_rate = models.FloatField(default=18.0)  # GST rate (e.g., 18%)
-    expiry_date = models.DateField(null=True, blank=True)  # Optional expiry date for products
+    price = models.DecimalField(**MONEY)
+    gst_rate = models.DecimalField(**GST_RATE, default=Decimal('18.00'))  # GST rate (e.g., 18%)
+    expiry_date = models.DateField(null=True, blank=True)  # Optional expiry date, used for the opening stock lot
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        # Keyset pagination of the dashboard table orders by each sortable column, then id
+        indexes = [
+            models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+            models.Index(fields=['stock_quantity', 'id'], name='product_stock_id_idx'),
+            models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+        ]
 
     def total_price_with_gst(self):
-        return self.price + (self.price * self.gst_rate / 100)  # Calculate price including GST
+        return gst_inclusive(self.price, self.gst_rate)  # Calculate price including GST
+
+    def low_stock_threshold(self):
+        threshold = getattr(self, 'threshold', None)  # Set by ProductQuerySet.with_threshold()
+        if threshold is None:
+            stock_threshold = StockThreshold.objects.filter(product=self).first()
+            threshold = stock_threshold.threshold if stock_threshold else DEFAULT_LOW_STOCK_THRESHOLD
+        return threshold
+
+    def stock_status(self):
+        """'low' below the threshold, 'medium' below twice the threshold, otherwise 'good'"""
+        threshold = self.low_stock_threshold()
+        if self.stock_quantity < threshold:
+            return 'low'
+        if self.stock_quantity < threshold * 2:
+            return 'medium'
+        return 'good'
 
     def __str__(self):
         return self.name
 
+# Revenue of a sale row including GST, mirrors Sale.total_sale_value() in SQL.
+# Multiplying by 0.01 rather than dividing by 100 keeps SQLite from integer-dividing whole-rupee prices.
+SALE_REVENUE = ExpressionWrapper(
+    F('unit_price') * F('quantity_sold') * (Value(100) + F('gst_rate')) * Value(Decimal('0.01')),
+    output_field=models.DecimalField(**GST_INCLUSIVE),
+)
+SALE_REVENUE_WITHOUT_GST = ExpressionWrapper(
+    F('unit_price') * F('quantity_sold'), output_field=models.DecimalField(**MONEY)
+)
+PURCHASE_COST = ExpressionWrapper(F('quantity') * F('price_per_unit'), output_field=models.DecimalField(**MONEY))
+
+
+class RollupQuerySet(models.QuerySet):
+    """QuerySet that keeps DailySalesRollup in step with bulk ``update()`` calls"""
+    rollup_fields = ()
+
+    def update(self, **kwargs):
+        if not self.rollup_fields or not set(kwargs) & set(self.rollup_fields):
+            return super().update(**kwargs)
+
+        from .rollups import refresh_rollups
+
+        before = list(self.values_list('pk', 'date', 'product_id'))
+        rows = super().update(**kwargs)
+        after = self.model.objects.filter(
+            pk__in=[pk for pk, _, _ in before]
+        ).values_list('date', 'product_id')
+        refresh_rollups({(date, product_id) for _, date, product_id in before} | set(after))
+        return rows
+
+
+class SaleQuerySet(RollupQuerySet):
+    rollup_fields = ('product', 'product_id', 'quantity_sold', 'unit_price', 'gst_rate', 'date')
+
+    def with_revenue(self):
+        """Annotate each sale with its GST-inclusive value as ``revenue``"""
+        return self.annotate(revenue=SALE_REVENUE)
+
+    def total_revenue(self):
+        """Total GST-inclusive revenue of the queryset in a single aggregate"""
+        total = self.aggregate(total=Sum(SALE_REVENUE))['total']
+        if total is None:
+            return Decimal(0)
+        # SQLite adds decimals as doubles; round back to the 6 places every term has
+        return total.quantize(REVENUE_PLACES)
+
+
 # Sale Model (Sales transactions for products)
 class Sale(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity_sold = models.IntegerField()
+    unit_price = models.DecimalField(**MONEY)  # Product price when sold, filled in by save()
+    gst_rate = models.DecimalField(**GST_RATE)  # Product GST rate when sold, filled in by save()
     date = models.DateField(auto_now_add=True)  # Automatically set the date when the sale is recorded
 
+    objects = SaleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'product'], name='sale_date_product_idx'),
+            models.Index(fields=['product', 'date'], name='sale_product_date_idx'),
+        ]
+
+    def snapshot_price(self):
+        """Copy the product's current price and GST rate onto the sale, unless already set"""
+        for field, value in (('unit_price', self.product.price), ('gst_rate', self.product.gst_rate)):
+            if getattr(self, field) is None:
+                # The product may still hold the float it was created with
+                setattr(self, field, self._meta.get_field(field).to_python(value).quantize(CENT))
+
+    def save(self, *args, **kwargs):
+        self.snapshot_price()
+        super().save(*args, **kwargs)
+
     def total_sale_value(self):
-        return self.product.total_price_with_gst() * self.quantity_sold  # Total sale value including GST
+        return gst_inclusive(self.unit_price * self.quantity_sold, self.gst_rate)  # Total sale value including GST
 
     def __str__(self):
         return f"Sale of {self.product.name} on {self.date}"
 
+class PurchaseQuerySet(RollupQuerySet):
+    rollup_fields = ('product', 'product_id', 'quantity', 'price_per_unit', 'date')
+
+
 # Purchase Model (Purchases made by the business)
 class Purchase(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.IntegerField()
-    price_per_unit = models.FloatField()  # Price per unit during the purchase
+    price_per_unit = models.DecimalField(**MONEY)  # Price per unit during the purchase
     date = models.DateField(auto_now_add=True)  # Automatically set the date of purchase
 
+    objects = PurchaseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'product'], name='purchase_date_product_idx'),
+            models.Index(fields=['product', 'date'], name='purchase_product_date_idx'),
+        ]
+
     def total_cost(self):
         return self.quantity * self.price_per_unit  # Total cost for the purchased quantity
 
     def __str__(self):
         return f"Purchase of {self.product.name} on {self.date}"
 
+# StockLot Model (Stock received together with one expiry date, consumed first-expiry-first-out)
+class StockLot(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='lots')
+    purchase = models.OneToOneField(Purchase, on_delete=models.CASCADE, null=True, blank=True)  # Null for opening stock
+    quantity = models.IntegerField()  # Units received
+    remaining = models.IntegerField()  # Units not yet sold
+    expiry_date = models.DateField(null=True, blank=True)  # Null for stock that does not expire
+    received_on = models.DateField(auto_now_add=True)
+
+    class Meta:
+        # Partial indexes: sold-out lots drop out, so lookups stay small however long the history
+        indexes = [
+            models.Index(
+                fields=['product', 'expiry_date', 'id'], condition=models.Q(remaining__gt=0), name='lot_fefo_idx'
+            ),
+            models.Index(fields=['expiry_date'], condition=models.Q(remaining__gt=0), name='lot_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} lot: {self.remaining}/{self.quantity} left, expires {self.expiry_date or 'never'}"
+
 # StockThreshold Model (Defines minimum stock level for products)
 class StockThreshold(models.Model):
     product = models.OneToOneField(Product, on_delete=models.CASCADE)
-    threshold = models.IntegerField(default=10)  # Minimum stock level for low stock alert
+    threshold = models.IntegerField(default=DEFAULT_LOW_STOCK_THRESHOLD)  # Minimum stock level for low stock alert
 
     def __str__(self):
         return f"{self.product.name} - Threshold: {self.threshold}"
 
+class LowStockAlertQuerySet(models.QuerySet):
+    def open(self):
+        return self.filter(resolved_at__isnull=True)
+
+
+# LowStockAlert Model (Written when stock falls below the product's threshold, resolved on restock)
+class LowStockAlert(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='low_stock_alerts')
+    stock_quantity = models.IntegerField()  # Stock left when the alert was raised
+    threshold = models.IntegerField()  # Threshold in force when the alert was raised
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)  # Set once stock is back at the threshold
+
+    objects = LowStockAlertQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product'], condition=models.Q(resolved_at__isnull=True), name='unique_open_low_stock_alert'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['resolved_at', 'created_at'], name='low_stock_alert_open_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} low on stock: {self.stock_quantity} < {self.threshold}"
+
+# DailySalesRollup Model (Per-day, per-product totals maintained from Sale and Purchase writes)
+class DailySalesRollup(models.Model):
+    date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='daily_rollups')
+    quantity = models.IntegerField(default=0)  # Units sold
+    sales_count = models.IntegerField(default=0)  # Number of Sale rows
+    revenue = models.DecimalField(**GST_INCLUSIVE, default=0)  # Sales value including GST
+    revenue_without_gst = models.DecimalField(**MONEY, default=0)  # Sales value excluding GST
+    purchased_quantity = models.IntegerField(default=0)  # Units purchased
+    purchase_cost = models.DecimalField(**MONEY, default=0)  # Amount spent on purchases
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='unique_daily_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'date'], name='rollup_product_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} on {self.date}: {self.quantity} sold"
+
+# ForecastSnapshot Model (Forecasts precomputed off the request path by refresh_forecasts)
+class ForecastSnapshot(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    history_days = models.IntegerField()  # Days of history the models were fitted on
+    horizon = models.IntegerField()  # Number of days predicted
+    forecast = models.JSONField()  # SalesAnalytics.get_sales_forecast() bundle
+    duration = models.FloatField(default=0)  # Seconds taken to compute
 
+    class Meta:
+        get_latest_by = 'created_at'
+
+    def __str__(self):
+        return f"Forecast snapshot {self.created_at:%Y-%m-%d %H:%M}"
+
+# ProductForecast Model (Per-product trend fit stored with a snapshot)
+class ProductForecast(models.Model):
+    snapshot = models.ForeignKey(ForecastSnapshot, on_delete=models.CASCADE, related_name='product_forecasts')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    slope = models.FloatField()  # Units per day trend
+    intercept = models.FloatField()
+    r2 = models.FloatField()  # Goodness of fit
+    predicted_quantity = models.FloatField()  # Units expected over the snapshot horizon
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['snapshot', 'product'], name='unique_product_forecast'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name}: {self.predicted_quantity:.1f} units forecast"
+
+# ReorderRun Model (One batch run of the reorder engine over the whole catalogue)
+class ReorderRun(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    window_days = models.IntegerField()  # Days of sales history the velocity is averaged over
+    lead_time_days = models.IntegerField()  # Days between ordering and receiving stock
+    cover_days = models.IntegerField()  # Days of sales a reorder should cover after it arrives
+    duration = models.FloatField(default=0)  # Seconds taken to compute
+
+    class Meta:
+        get_latest_by = 'created_at'
+
+    def __str__(self):
+        return f"Reorder run {self.created_at:%Y-%m-%d %H:%M}"
+
+# ReorderSuggestion Model (Per-product velocity, days of cover and reorder quantity from a run)
+class ReorderSuggestion(models.Model):
+    run = models.ForeignKey(ReorderRun, on_delete=models.CASCADE, related_name='suggestions')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    stock_quantity = models.IntegerField()  # Stock when the run was computed
+    velocity = models.FloatField()  # Average units sold per day over the window
+    days_of_cover = models.FloatField(null=True)  # Days until stock runs out, null when nothing sells
+    reorder_point = models.IntegerField()  # Stock level at which to reorder
+    reorder_quantity = models.IntegerField()  # Units to order now, 0 when above the reorder point
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['run', 'product'], name='unique_reorder_suggestion'),
+        ]
+        indexes = [
+            models.Index(fields=['run', 'days_of_cover'], name='reorder_run_cover_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name}: reorder {self.reorder_quantity}"
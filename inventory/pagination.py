@@ -0,0 +1,95 @@
+"""
+Keyset Pagination Module
+Pages through large querysets by (sort value, id) instead of OFFSET
+"""
+import base64
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+PRODUCT_SORT_FIELDS = {
+    'name': 'name',
+    'category': 'category__name',
+    'stock': 'stock_quantity',
+    'price': 'price',
+}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(value, pk):
+    # Decimal prices travel as strings and are converted back by the field lookup
+    return base64.urlsafe_b64encode(json.dumps([value, pk], default=str).encode()).decode()
+
+
+def decode_cursor(cursor, field=None):
+    """
+    Return the (value, pk) a cursor points after, raising ValueError if it is malformed.
+
+    With the model field being sorted on, the value is converted to its
+    Python type, so a stale or forged cursor cannot reach the query.
+    """
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (TypeError, ValueError, UnicodeError):
+        raise ValueError('Invalid cursor.')
+    if not isinstance(pk, int) or isinstance(pk, bool) or value is None:
+        raise ValueError('Invalid cursor.')
+    if field is not None:
+        try:
+            value = field.to_python(value)
+        except ValidationError:
+            raise ValueError('Invalid cursor.')
+    return value, pk
+
+
+def keyset_page(queryset, sort='name', direction='asc', cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return (items, next_cursor) for one page of queryset.
+
+    Rows are ordered by the sort field with the primary key as tie-breaker,
+    and the cursor holds the last (value, pk) seen, so every page costs one
+    index range scan no matter how deep it is. next_cursor is None on the
+    last page.
+    """
+    if sort not in PRODUCT_SORT_FIELDS:
+        raise ValueError(f"Unknown sort {sort!r}, expected one of: {', '.join(PRODUCT_SORT_FIELDS)}")
+    if direction not in ('asc', 'desc'):
+        raise ValueError("Direction must be 'asc' or 'desc'.")
+    field = PRODUCT_SORT_FIELDS[sort]
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+
+    if direction == 'asc':
+        queryset = queryset.order_by(field, 'pk')
+        after = 'gt'
+    else:
+        queryset = queryset.order_by(f'-{field}', '-pk')
+        after = 'lt'
+
+    if cursor:
+        value, pk = decode_cursor(cursor, _model_field(queryset.model, field))
+        queryset = queryset.filter(
+            Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'pk__{after}': pk})
+        )
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor(_sort_value(last, field), last.pk)
+    return items, next_cursor
+
+
+def _model_field(model, path):
+    *relations, name = path.split('__')
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def _sort_value(obj, field):
+    for part in field.split('__'):
+        obj = getattr(obj, part)
+    return obj
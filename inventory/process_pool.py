@@ -0,0 +1,26 @@
+"""
+Process Pool Module
+Maps a function over batches of work in worker processes that set Django up for themselves
+"""
+from concurrent.futures import ProcessPoolExecutor
+from django.db import connections
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def pool_map(function, *iterables, workers=1):
+    """
+    list(map(function, *iterables)), spread over `workers` processes when workers > 1.
+
+    function must be defined at module level so it can be sent to the
+    workers; results come back in order.
+    """
+    if workers <= 1:
+        return list(map(function, *iterables))
+    # Forked workers must not inherit the parent's open database connection
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(function, *iterables))
@@ -0,0 +1,167 @@
+"""
+Daily Sales Rollup Module
+Maintains the per-day, per-product DailySalesRollup table from Sale and Purchase writes
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from .cache import bump_data_version
+from .models import DailySalesRollup, Purchase, PURCHASE_COST, Sale, SALE_REVENUE, SALE_REVENUE_WITHOUT_GST
+
+
+ROLLUP_FIELDS = (
+    'quantity', 'sales_count', 'revenue', 'revenue_without_gst',
+    'purchased_quantity', 'purchase_cost',
+)
+
+
+def sale_deltas(sale, sign=1):
+    """Rollup increments contributed by a single sale"""
+    return {
+        'quantity': sign * sale.quantity_sold,
+        'sales_count': sign,
+        'revenue': sign * sale.total_sale_value(),
+        'revenue_without_gst': sign * sale.unit_price * sale.quantity_sold,
+    }
+
+
+def purchase_deltas(purchase, sign=1):
+    """Rollup increments contributed by a single purchase"""
+    return {
+        'purchased_quantity': sign * purchase.quantity,
+        'purchase_cost': sign * purchase.total_cost(),
+    }
+
+
+def apply_deltas(date, product_id, deltas):
+    """Add deltas to the (date, product) rollup row, creating the row if needed"""
+    rollups = DailySalesRollup.objects.filter(date=date, product_id=product_id)
+    updates = {field: F(field) + value for field, value in deltas.items()}
+
+    bump_data_version()
+    if rollups.update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            DailySalesRollup.objects.create(date=date, product_id=product_id, **deltas)
+    except IntegrityError:
+        # Another writer created the row between our update and insert
+        rollups.update(**updates)
+
+
+def remove_deltas(date, product_id, deltas):
+    """Apply negative deltas to an existing rollup row and drop it once it is empty"""
+    bump_data_version()
+    rollups = DailySalesRollup.objects.filter(date=date, product_id=product_id)
+    rollups.update(**{field: F(field) + value for field, value in deltas.items()})
+    rollups.filter(sales_count__lte=0, purchased_quantity__lte=0).delete()
+
+
+def record_bulk(sales, purchases):
+    """Apply rows created with bulk_create, which bypasses the post_save signals"""
+    buckets = {}
+    for rows, deltas in ((sales, sale_deltas), (purchases, purchase_deltas)):
+        for row in rows:
+            bucket = buckets.setdefault((row.date, row.product_id), {})
+            for field, value in deltas(row).items():
+                bucket[field] = bucket.get(field, 0) + value
+
+    for (date, product_id), deltas in buckets.items():
+        apply_deltas(date, product_id, deltas)
+
+
+def aggregate_buckets(sales, purchases):
+    """Aggregate Sale and Purchase querysets into rollup rows keyed by (date, product_id)"""
+    buckets = {}
+
+    sale_totals = (
+        sales
+        .values('date', 'product_id')
+        .annotate(
+            total_quantity=Sum('quantity_sold'),
+            total_count=Count('id'),
+            total_revenue=Sum(SALE_REVENUE),
+            total_revenue_without_gst=Sum(SALE_REVENUE_WITHOUT_GST),
+        )
+        .order_by()
+    )
+    for row in sale_totals:
+        bucket = buckets.setdefault((row['date'], row['product_id']), dict.fromkeys(ROLLUP_FIELDS, 0))
+        bucket['quantity'] = row['total_quantity']
+        bucket['sales_count'] = row['total_count']
+        bucket['revenue'] = row['total_revenue']
+        bucket['revenue_without_gst'] = row['total_revenue_without_gst']
+
+    purchase_totals = (
+        purchases
+        .values('date', 'product_id')
+        .annotate(
+            total_quantity=Sum('quantity'),
+            total_cost=Sum(PURCHASE_COST),
+        )
+        .order_by()
+    )
+    for row in purchase_totals:
+        bucket = buckets.setdefault((row['date'], row['product_id']), dict.fromkeys(ROLLUP_FIELDS, 0))
+        bucket['purchased_quantity'] = row['total_quantity']
+        bucket['purchase_cost'] = row['total_cost']
+
+    return buckets
+
+
+def refresh_rollups(keys):
+    """Recompute the given (date, product_id) buckets from the raw Sale and Purchase tables"""
+    keys = set(keys)
+    if not keys:
+        return
+    bump_data_version()
+
+    dates = {date for date, _ in keys}
+    product_ids = {product_id for _, product_id in keys}
+    buckets = aggregate_buckets(
+        Sale.objects.filter(date__in=dates, product_id__in=product_ids),
+        Purchase.objects.filter(date__in=dates, product_id__in=product_ids),
+    )
+
+    with transaction.atomic():
+        stale = [
+            pk for pk, date, product_id in DailySalesRollup.objects
+            .filter(date__in=dates, product_id__in=product_ids)
+            .values_list('pk', 'date', 'product_id')
+            if (date, product_id) in keys
+        ]
+        DailySalesRollup.objects.filter(pk__in=stale).delete()
+        DailySalesRollup.objects.bulk_create([
+            DailySalesRollup(date=date, product_id=product_id, **fields)
+            for (date, product_id), fields in buckets.items()
+            if (date, product_id) in keys
+        ])
+
+
+def rebuild_rollups(start_date=None, end_date=None, batch_size=1000):
+    """Rebuild rollup rows, optionally limited to a date range, and return the number written"""
+    sales = Sale.objects.all()
+    purchases = Purchase.objects.all()
+    rollups = DailySalesRollup.objects.all()
+    if start_date:
+        sales = sales.filter(date__gte=start_date)
+        purchases = purchases.filter(date__gte=start_date)
+        rollups = rollups.filter(date__gte=start_date)
+    if end_date:
+        sales = sales.filter(date__lte=end_date)
+        purchases = purchases.filter(date__lte=end_date)
+        rollups = rollups.filter(date__lte=end_date)
+
+    buckets = aggregate_buckets(sales, purchases)
+
+    bump_data_version()
+    with transaction.atomic():
+        rollups.delete()
+        DailySalesRollup.objects.bulk_create(
+            [
+                DailySalesRollup(date=date, product_id=product_id, **fields)
+                for (date, product_id), fields in buckets.items()
+            ],
+            batch_size=batch_size,
+        )
+
+    return len(buckets)
@@ -2,12 +2,55 @@
 Sales Analytics AI Module
 Provides AI-powered sales trend prediction and improvement suggestions
 """
+import asyncio
 from datetime import datetime, timedelta
-from django.db.models import Sum, Avg, Count
+from django.db.models import Sum, Avg
 from django.db.models.functions import TruncDate
 import numpy as np
 from sklearn.linear_model import LinearRegression
-from .models import Sale, Product
+from .concurrent import in_thread
+from .models import DailySalesRollup, Product
+from .timeseries import sales_series
+
+
+def fit_linear_trends(matrix, horizon=30):
+    """
+    Fit an ordinary least-squares line to every row of a (series x day) matrix at once.
+    
+    Day i of each row is x = i. Returns a dict of arrays: slope, intercept
+    and r2 (one value per row) and predictions of shape (rows, horizon) for
+    the days following the last column, clipped at zero.
+    """
+    y = np.asarray(matrix, dtype=np.float64)
+    if y.ndim != 2 or y.shape[1] < 2:
+        raise ValueError('Need a 2-D matrix with at least two days per series.')
+    
+    days = y.shape[1]
+    x = np.arange(days, dtype=np.float64)
+    x_centered = x - x.mean()
+    sxx = x_centered @ x_centered
+    y_mean = y.mean(axis=1)
+    y_centered = y - y_mean[:, None]
+    
+    slope = (y_centered @ x_centered) / sxx
+    intercept = y_mean - slope * x.mean()
+    
+    # Residual sum of squares from the OLS identity, avoiding a fitted-values matrix
+    ss_tot = np.einsum('ij,ij->i', y_centered, y_centered)
+    ss_res = np.clip(ss_tot - slope ** 2 * sxx, 0, None)
+    # A constant series is fitted exactly, which sklearn scores as 1.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(ss_tot > 0, 1 - ss_res / ss_tot, 1.0)
+    
+    future = np.arange(days, days + horizon, dtype=np.float64)
+    predictions = np.clip(intercept[:, None] + slope[:, None] * future, 0, None)
+    
+    return {
+        'slope': slope,
+        'intercept': intercept,
+        'r2': r2,
+        'predictions': predictions,
+    }
 
 
 class SalesAnalytics:
@@ -15,32 +58,86 @@ class SalesAnalytics:
     
     def __init__(self):
         self.prediction_days = 30  # Predict 30 days ahead
+        self.history_days = 90  # Days of history the trend is fitted on
         
-    def get_sales_data(self, days_back=90):
-        """Fetch sales data for the specified number of days"""
+    def get_sales_data(self, days_back=None):
+        """
+        Fetch daily sales for the specified number of days.
+        
+        Days without sales are included with zero totals, starting from the
+        first sale in the window and running up to today.
+        """
+        if days_back is None:
+            days_back = self.history_days
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days_back)
         
-        # Get daily sales data - simplified approach without TruncDate
-        sales_data = (
-            Sale.objects
-            .filter(date__gte=start_date, date__lte=end_date)
-            .values('date')
-            .annotate(total_quantity=Sum('quantity_sold'))
-            .order_by('date')
-        )
+        series = sales_series(start_date, end_date, trim_leading=True)
         
-        # Rename 'date' to 'sale_date' for consistency
         result = []
-        for item in sales_data:
+        for day, quantity, revenue in zip(series['periods'].tolist(), series['quantity'], series['revenue']):
             result.append({
-                'sale_date': item['date'],
-                'total_quantity': item['total_quantity'],
-                'total_revenue': item['total_quantity']
+                'sale_date': day,
+                'total_quantity': int(quantity),
+                'total_revenue': float(revenue)
             })
         
         return result
     
+    def get_product_sales_matrix(self, days_back=90, id_range=None):
+        """
+        Dense product x day matrix of quantities sold, zero on days without sales.
+        
+        Returns (product_ids, category_ids, matrix) where row i of the matrix
+        belongs to product_ids[i] and the last column is today. Every product
+        gets a row, including those with no sales in the window. Pass an
+        inclusive (first_id, last_id) id_range to build one shard of the catalog.
+        """
+        end_date = datetime.now().date()
+        start_date = end_date - timedelta(days=days_back)
+        
+        products = Product.objects.order_by('id')
+        rollups = DailySalesRollup.objects.filter(date__gte=start_date, date__lte=end_date, quantity__gt=0)
+        if id_range is not None:
+            products = products.filter(id__range=id_range)
+            rollups = rollups.filter(product_id__gte=id_range[0], product_id__lte=id_range[1])
+        
+        products = np.array(list(products.values_list('id', 'category_id')), dtype=np.int64).reshape(-1, 2)
+        product_ids, category_ids = products[:, 0], products[:, 1]
+        matrix = np.zeros((len(product_ids), days_back + 1))
+        
+        rows = list(rollups.values_list('product_id', 'date', 'quantity'))
+        if rows:
+            row_products, row_dates, row_quantities = zip(*rows)
+            positions = np.searchsorted(product_ids, np.array(row_products, dtype=np.int64))
+            offsets = (
+                np.array(row_dates, dtype='datetime64[D]') - np.datetime64(start_date, 'D')
+            ).astype(np.int64)
+            np.add.at(matrix, (positions, offsets), np.array(row_quantities, dtype=np.float64))
+        
+        return product_ids, category_ids, matrix
+    
+    def get_product_forecasts(self, days_back=90, id_range=None):
+        """Per-product trend fits and predictions, see fit_linear_trends"""
+        product_ids, _, matrix = self.get_product_sales_matrix(days_back, id_range)
+        if not len(product_ids):
+            return None
+        forecasts = fit_linear_trends(matrix, self.prediction_days)
+        forecasts['ids'] = product_ids
+        return forecasts
+    
+    def get_category_forecasts(self, days_back=90):
+        """Per-category trend fits and predictions, see fit_linear_trends"""
+        _, category_ids, matrix = self.get_product_sales_matrix(days_back)
+        if not len(category_ids):
+            return None
+        categories, positions = np.unique(category_ids, return_inverse=True)
+        category_matrix = np.zeros((len(categories), matrix.shape[1]))
+        np.add.at(category_matrix, positions, matrix)
+        forecasts = fit_linear_trends(category_matrix, self.prediction_days)
+        forecasts['ids'] = categories
+        return forecasts
+    
     def prepare_data_for_prediction(self, sales_data):
         """Prepare data for machine learning model"""
         if not sales_data:
@@ -64,11 +161,13 @@ class SalesAnalytics:
         """Ensure predictions are non-negative (helper method)"""
         return [max(0, float(p)) for p in predictions]
     
-    def predict_sales_trend(self):
-        """Predict future sales trends using linear regression"""
-        sales_data = self.get_sales_data()
+    def predict_sales_trend(self, sales_data=None):
+        """Predict future sales trends using linear regression, on get_sales_data() unless given"""
+        if sales_data is None:
+            sales_data = self.get_sales_data()
         
-        if not sales_data or len(sales_data) < 2:
+        days_with_sales = sum(1 for item in sales_data if item['total_quantity'] > 0)
+        if days_with_sales < 2:
             return {
                 'has_data': False,
                 'message': 'Insufficient sales data for prediction. Need at least 2 days of sales history.'
@@ -123,11 +222,12 @@ class SalesAnalytics:
     def get_top_selling_products(self, limit=5):
         """Get top selling products"""
         top_products = (
-            Sale.objects
+            DailySalesRollup.objects
+            .filter(quantity__gt=0)
             .values('product__name')
             .annotate(
-                total_sold=Sum('quantity_sold'),
-                times_sold=Count('id')
+                total_sold=Sum('quantity'),
+                times_sold=Sum('sales_count')
             )
             .order_by('-total_sold')[:limit]
         )
@@ -140,7 +240,7 @@ class SalesAnalytics:
         # Get all products with their total sales in a single query
         products_with_sales = (
             Product.objects
-            .annotate(total_sold=Sum('sale__quantity_sold'))
+            .annotate(total_sold=Sum('daily_rollups__quantity'))
             .filter(Q(total_sold__gt=0) | Q(total_sold__isnull=True))
             .order_by('total_sold')
         )
@@ -157,8 +257,13 @@ class SalesAnalytics:
         # Filter out products with 0 sales and return
         return [p for p in underperforming if p['total_sold'] > 0][:limit]
     
-    def generate_suggestions(self, trend_data):
-        """Generate AI-powered suggestions based on trend analysis"""
+    def generate_suggestions(self, trend_data, top_products=None, underperforming=None):
+        """
+        Generate AI-powered suggestions based on trend analysis.
+        
+        Pass already fetched top/underperforming product lists to avoid
+        querying them again; they are fetched when omitted.
+        """
         if not trend_data.get('has_data'):
             return ['Record more sales data to get AI-powered insights and predictions.']
         
@@ -204,7 +309,8 @@ class SalesAnalytics:
             )
         
         # Product-specific suggestions
-        top_products = self.get_top_selling_products(3)
+        if top_products is None:
+            top_products = self.get_top_selling_products(3)
         if top_products:
             top_names = ', '.join([p['product__name'] for p in top_products[:2]])
             suggestions.append(
@@ -212,7 +318,8 @@ class SalesAnalytics:
                 "Ensure adequate stock and consider creating similar products."
             )
         
-        underperforming = self.get_underperforming_products(3)
+        if underperforming is None:
+            underperforming = self.get_underperforming_products(3)
         if underperforming:
             low_names = ', '.join([p['product__name'] for p in underperforming[:2]])
             suggestions.append(
@@ -231,10 +338,37 @@ class SalesAnalytics:
     
     def get_sales_forecast(self):
         """Get comprehensive sales forecast with AI suggestions"""
+        # Fetch each product list once at the largest limit needed and
+        # hand the suggestions their shorter slices
         trend_data = self.predict_sales_trend()
-        suggestions = self.generate_suggestions(trend_data)
         top_products = self.get_top_selling_products()
         underperforming = self.get_underperforming_products()
+        suggestions = self.generate_suggestions(trend_data, top_products[:3], underperforming[:3])
+        
+        return {
+            'trend_data': trend_data,
+            'suggestions': suggestions,
+            'top_products': top_products,
+            'underperforming_products': underperforming
+        }
+    
+    async def aget_sales_forecast(self):
+        """
+        get_sales_forecast() for async views.
+        
+        The daily series, top sellers and underperformers are independent
+        aggregates, so they are queried at the same time, each on its own
+        connection. The regression is CPU-bound and is fitted in the
+        default executor, off the event loop.
+        """
+        sales_data, top_products, underperforming = await asyncio.gather(
+            in_thread(self.get_sales_data),
+            in_thread(self.get_top_selling_products),
+            in_thread(self.get_underperforming_products),
+        )
+        loop = asyncio.get_running_loop()
+        trend_data = await loop.run_in_executor(None, self.predict_sales_trend, sales_data)
+        suggestions = self.generate_suggestions(trend_data, top_products[:3], underperforming[:3])
         
         return {
             'trend_data': trend_data,
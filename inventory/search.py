@@ -0,0 +1,120 @@
+"""
+Product Search Module
+Ranked, typo-tolerant product and category search over SQLite FTS5 trigram indexes
+"""
+import sqlite3
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from .models import Category, Product
+
+
+PRODUCT_TABLE = 'inventory_product_search'
+CATEGORY_TABLE = 'inventory_category_search'
+
+# Trigram indexes cannot match anything shorter than one trigram
+MIN_QUERY_LENGTH = 3
+# Share of the query's trigrams a name needs to count as a typo match
+MIN_SIMILARITY = 0.5
+# Fuzzy candidates fetched from the index before re-ranking by similarity
+FUZZY_CANDIDATES = 200
+
+
+def search_enabled():
+    """Whether the trigram tables exist (created by migration 0010 on SQLite 3.34+)"""
+    return connection.vendor == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34, 0)
+
+
+def trigrams(text):
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def similarity(query, name):
+    """Fraction of the query's trigrams that also occur in name"""
+    wanted = trigrams(query)
+    return len(wanted & trigrams(name)) / len(wanted) if wanted else 0.0
+
+
+def _quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _match(table, expression, limit):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid, name FROM {table} WHERE {table} MATCH %s ORDER BY rank LIMIT %s',
+            [expression, limit],
+        )
+        return cursor.fetchall()
+
+
+def ranked_ids(table, query, limit=20):
+    """
+    Ids of the best matches for query in a search table, best first.
+
+    Names containing the query as a substring come first (prefix matches
+    ahead of the rest, then by BM25 rank). Remaining slots are filled with
+    typo matches: names sharing at least MIN_SIMILARITY of the query's
+    trigrams, ordered by that share.
+    """
+    query = query.strip()
+    if len(query) < MIN_QUERY_LENGTH:
+        return []
+
+    exact = _match(table, _quote(query), limit)
+    prefix = query.lower()
+    exact.sort(key=lambda row: not row[1].lower().startswith(prefix))
+    ids = [row_id for row_id, _ in exact]
+    if len(ids) >= limit:
+        return ids
+
+    seen = set(ids)
+    candidates = _match(table, ' OR '.join(_quote(gram) for gram in trigrams(query)), FUZZY_CANDIDATES)
+    scored = [
+        (score, row_id)
+        for row_id, name in candidates
+        if row_id not in seen and (score := similarity(query, name)) >= MIN_SIMILARITY
+    ]
+    scored.sort(key=lambda item: -item[0])
+    return ids + [row_id for _, row_id in scored[:limit - len(ids)]]
+
+
+def _in_order(queryset, ids):
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def search_products(query, limit=20):
+    """Best matching products for query, with their category loaded"""
+    products = Product.objects.select_related('category')
+    if not search_enabled():
+        return list(products.filter(name__icontains=query.strip()).order_by('name')[:limit])
+    return _in_order(products, ranked_ids(PRODUCT_TABLE, query, limit))
+
+
+def search_categories(query, limit=10):
+    """Best matching categories for query"""
+    if not search_enabled():
+        return list(Category.objects.filter(name__icontains=query.strip()).order_by('name')[:limit])
+    return _in_order(Category.objects.all(), ranked_ids(CATEGORY_TABLE, query, limit))
+
+
+def filter_products(queryset, query):
+    """
+    Restrict a product queryset to names matching query.
+
+    Keeps icontains semantics when anything contains the query, answered
+    from the trigram index instead of a table scan; when nothing does, the
+    closest typo matches are returned instead. Short queries and databases
+    without the index use icontains.
+    """
+    query = query.strip()
+    if len(query) < MIN_QUERY_LENGTH or not search_enabled():
+        return queryset.filter(name__icontains=query)
+
+    exact = queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {PRODUCT_TABLE} WHERE {PRODUCT_TABLE} MATCH %s', [_quote(query)]
+    ))
+    if exact.exists():
+        return exact
+    return queryset.filter(pk__in=ranked_ids(PRODUCT_TABLE, query, FUZZY_CANDIDATES))
@@ -0,0 +1,123 @@
+"""
+Signal handlers keeping derived tables in step with Sale and Purchase writes
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .alerts import sync_low_stock_alerts
+from .cache import bump_data_version
+from .events import publish_on_commit, publish_stats_on_commit, sale_payload
+from .models import ForecastSnapshot, Product, Purchase, Sale, StockLot, StockThreshold
+from .rollups import apply_deltas, purchase_deltas, refresh_rollups, remove_deltas, sale_deltas
+
+
+@receiver(pre_save, sender=Sale)
+@receiver(pre_save, sender=Purchase)
+def remember_rollup_key(sender, instance, **kwargs):
+    """Remember which rollup bucket an edited row belonged to before the save"""
+    if instance._state.adding or instance.pk is None:
+        return
+    instance._previous_rollup_key = (
+        sender.objects.filter(pk=instance.pk).values_list('date', 'product_id').first()
+    )
+
+
+@receiver(post_save, sender=Sale)
+def update_rollup_for_sale(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_deltas(instance.date, instance.product_id, sale_deltas(instance))
+    else:
+        _refresh_edited(instance)
+
+
+@receiver(post_save, sender=Purchase)
+def update_rollup_for_purchase(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_deltas(instance.date, instance.product_id, purchase_deltas(instance))
+    else:
+        _refresh_edited(instance)
+
+
+@receiver(post_delete, sender=Sale)
+def remove_sale_from_rollup(sender, instance, **kwargs):
+    remove_deltas(instance.date, instance.product_id, sale_deltas(instance, sign=-1))
+
+
+@receiver(post_delete, sender=Purchase)
+def remove_purchase_from_rollup(sender, instance, **kwargs):
+    remove_deltas(instance.date, instance.product_id, purchase_deltas(instance, sign=-1))
+
+
+# Registered after the rollup receivers, so the data version is bumped before the totals are read
+@receiver(post_save, sender=Sale)
+def publish_sale(sender, instance, created, raw=False, **kwargs):
+    """Push new sales and the stat card totals to live dashboards once committed"""
+    if raw:
+        return
+    if created:
+        publish_on_commit('sale', lambda: sale_payload(instance))
+    publish_stats_on_commit()
+
+
+@receiver(post_save, sender=Purchase)
+@receiver(post_delete, sender=Sale)
+@receiver(post_delete, sender=Purchase)
+def publish_stats_change(sender, raw=False, **kwargs):
+    if raw:
+        return
+    publish_stats_on_commit()
+
+
+def _refresh_edited(instance):
+    keys = {(instance.date, instance.product_id)}
+    previous = getattr(instance, '_previous_rollup_key', None)
+    if previous:
+        keys.add(previous)
+    refresh_rollups(keys)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_for_product(sender, **kwargs):
+    """Stock and prices feed the cached analytics too"""
+    bump_data_version()
+
+
+@receiver(post_save, sender=ForecastSnapshot)
+@receiver(post_delete, sender=ForecastSnapshot)
+def invalidate_for_forecast(sender, **kwargs):
+    """The analytics page shows the newest snapshot"""
+    bump_data_version()
+
+
+@receiver(post_save, sender=Product)
+def open_initial_lot(sender, instance, created, raw=False, **kwargs):
+    """Stock a product is created with becomes its opening lot, expiring on Product.expiry_date"""
+    if raw or not created or instance.stock_quantity <= 0:
+        return
+    StockLot.objects.create(
+        product=instance,
+        quantity=instance.stock_quantity,
+        remaining=instance.stock_quantity,
+        expiry_date=instance.expiry_date,
+    )
+
+
+@receiver(post_save, sender=Product)
+def sync_alerts_for_product(sender, instance, raw=False, **kwargs):
+    """Stock edited outside sell_product/purchase_product, e.g. in the admin"""
+    if raw:
+        return
+    sync_low_stock_alerts([instance.pk])
+
+
+@receiver(post_save, sender=StockThreshold)
+@receiver(post_delete, sender=StockThreshold)
+def sync_alerts_for_threshold(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_low_stock_alerts([instance.product_id])
+    bump_data_version()
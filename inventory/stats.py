@@ -0,0 +1,21 @@
+"""
+Dashboard Stats Module
+Totals shown on the dashboard stat cards, cached until the next write
+"""
+from decimal import Decimal
+from django.db.models import Sum
+from .cache import cached
+from .models import Purchase, PURCHASE_COST, Sale
+
+
+def dashboard_stats():
+    return {
+        'total_sales': Sale.objects.count(),
+        'total_revenue': Sale.objects.total_revenue(),
+        'total_purchases': Purchase.objects.aggregate(total=Sum(PURCHASE_COST))['total'] or Decimal(0),
+    }
+
+
+def cached_dashboard_stats():
+    """Stat card totals; sales and purchases bump the cache version, so they are never stale"""
+    return cached('dashboard_stats', dashboard_stats)
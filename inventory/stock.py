@@ -0,0 +1,59 @@
+"""
+Stock Movement Module
+Applies sales and purchases to Product.stock_quantity with single-statement updates
+"""
+from django.db import transaction
+from django.db.models import F
+from .alerts import sync_low_stock_alerts
+from .lots import allocate_lots
+from .models import Product, Purchase, Sale, StockLot
+
+
+def clean_price(value):
+    """
+    Decimal price from user input, checked like the price columns: a finite
+    number of at most 12 digits and 2 decimal places. Raises ValidationError.
+    """
+    return Purchase._meta.get_field('price_per_unit').clean(value, None)
+
+
+def sell_product(product, quantity):
+    """
+    Decrement stock and record a Sale in one transaction.
+
+    The stock check and the decrement are a single conditional UPDATE, so
+    concurrent sales of the same product can never oversell. Returns the
+    Sale, or None when there is not enough stock. The units are taken from
+    the product's lots first-expiry-first-out, and a low stock alert is
+    opened in the same transaction if the sale takes the product below its
+    threshold.
+    """
+    with transaction.atomic():
+        updated = (
+            Product.objects
+            .filter(pk=product.pk, stock_quantity__gte=quantity)
+            .update(stock_quantity=F('stock_quantity') - quantity)
+        )
+        if not updated:
+            return None
+        sale = Sale.objects.create(product=product, quantity_sold=quantity)
+        allocate_lots(product.pk, quantity)
+        sync_low_stock_alerts([product.pk])
+        return sale
+
+
+def purchase_product(product, quantity, price_per_unit, expiry_date=None):
+    """
+    Increment stock and record a Purchase in one transaction.
+
+    The units are received as a new lot expiring on expiry_date (None for
+    stock that does not expire), and any low stock alert is resolved.
+    """
+    with transaction.atomic():
+        Product.objects.filter(pk=product.pk).update(stock_quantity=F('stock_quantity') + quantity)
+        purchase = Purchase.objects.create(product=product, quantity=quantity, price_per_unit=price_per_unit)
+        StockLot.objects.create(
+            product=product, purchase=purchase, quantity=quantity, remaining=quantity, expiry_date=expiry_date
+        )
+        sync_low_stock_alerts([product.pk])
+        return purchase
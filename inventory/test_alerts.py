@@ -0,0 +1,77 @@
+"""
+Tests for threshold-aware low stock alerts
+"""
+from django.test import TestCase, Client
+from django.urls import reverse
+from inventory.alerts import cached_low_stock_alerts, sync_low_stock_alerts
+from inventory.models import Category, LowStockAlert, Product, StockThreshold
+from inventory.stock import purchase_product, sell_product
+
+
+class LowStockAlertTestCase(TestCase):
+    """Test cases for opening and resolving alerts on the write path"""
+
+    def setUp(self):
+        """Set up test data"""
+        category = Category.objects.create(name="Test Category")
+        self.pen = Product.objects.create(name="Pen", category=category, stock_quantity=12, price=10.0)
+        self.ink = Product.objects.create(name="Ink", category=category, stock_quantity=40, price=90.0)
+        StockThreshold.objects.create(product=self.ink, threshold=50)
+
+    def test_low_stock_uses_per_product_threshold(self):
+        """Test that the low stock query joins StockThreshold and defaults to 10"""
+        self.assertEqual(list(Product.objects.low_stock()), [self.ink])
+        self.assertEqual(Product.objects.with_threshold().get(pk=self.pen.pk).threshold, 10)
+
+    def test_sale_opens_and_purchase_resolves(self):
+        """Test that crossing the threshold writes an alert and restocking resolves it"""
+        sell_product(self.pen, 2)
+        self.assertFalse(LowStockAlert.objects.open().filter(product=self.pen).exists())
+
+        sell_product(self.pen, 1)
+        alert = LowStockAlert.objects.open().get(product=self.pen)
+        self.assertEqual((alert.stock_quantity, alert.threshold), (9, 10))
+
+        # Further sales while low keep the single open alert
+        sell_product(self.pen, 1)
+        self.assertEqual(LowStockAlert.objects.filter(product=self.pen).count(), 1)
+
+        purchase_product(self.pen, 5, 8.0)
+        self.assertFalse(LowStockAlert.objects.open().filter(product=self.pen).exists())
+        self.assertIsNotNone(LowStockAlert.objects.get(product=self.pen).resolved_at)
+
+    def test_threshold_changes_resync(self):
+        """Test that editing or removing a threshold opens or resolves alerts"""
+        self.assertTrue(LowStockAlert.objects.open().filter(product=self.ink).exists())
+        StockThreshold.objects.get(product=self.ink).delete()
+        self.assertFalse(LowStockAlert.objects.open().filter(product=self.ink).exists())
+
+        StockThreshold.objects.create(product=self.pen, threshold=20)
+        self.assertTrue(LowStockAlert.objects.open().filter(product=self.pen).exists())
+
+    def test_full_sync_catches_bulk_updates(self):
+        """Test that a catalogue-wide sync repairs alerts after writes that skip signals"""
+        Product.objects.filter(pk=self.pen.pk).update(stock_quantity=0)
+        self.assertEqual(sync_low_stock_alerts(), (1, 0))
+        self.assertEqual(sync_low_stock_alerts(), (0, 0))
+
+    def test_alerts_endpoint_is_cached(self):
+        """Test the alerts endpoint and that repeat reads skip the database"""
+        client = Client()
+        response = client.get(reverse('low_stock_alerts_api'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row['name'], row['stock_quantity'], row['threshold']) for row in response.json()['alerts']],
+            [('Ink', 40, 50)],
+        )
+        with self.assertNumQueries(0):
+            cached_low_stock_alerts()
+
+        sell_product(self.pen, 5)
+        self.assertEqual([row['name'] for row in cached_low_stock_alerts()], ['Pen', 'Ink'])
+
+    def test_dashboard_lists_open_alerts(self):
+        """Test that the dashboard panel reads the open alerts"""
+        response = Client().get(reverse('dashboard'))
+        self.assertEqual([alert.product for alert in response.context['low_stock_alerts']], [self.ink])
+        self.assertContains(response, 'stock-low')
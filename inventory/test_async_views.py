@@ -0,0 +1,152 @@
+"""
+Tests for the async analytics and chart data views served through dashboard/asgi.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TransactionTestCase
+from django.utils.timezone import now
+from inventory import views
+from inventory.models import Category, Product, Sale
+from inventory.sales_analytics import SalesAnalytics
+
+
+# The async views query from worker threads with connections of their own,
+# which only see committed rows, so these tests commit their data
+class AsyncViewsTestCase(TransactionTestCase):
+    """Test cases for the async variants against their sync counterparts"""
+
+    def setUp(self):
+        """Set up ten days of rising sales of one product and one sale of another"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        category = Category.objects.create(name="Test Category")
+        self.product1 = Product.objects.create(
+            name="Product 1", category=category, stock_quantity=500, price=500.0, gst_rate=18.0
+        )
+        self.product2 = Product.objects.create(
+            name="Product 2", category=category, stock_quantity=50, price=300.0, gst_rate=18.0
+        )
+        today = datetime.now().date()
+        for i in range(10):
+            sale = Sale.objects.create(product=self.product1, quantity_sold=5 + i)
+            Sale.objects.filter(id=sale.id).update(date=today - timedelta(days=10 - i))
+        Sale.objects.create(product=self.product2, quantity_sold=1)
+
+    async def test_async_forecast_matches_sync(self):
+        """Test that the concurrent queries and executor fit give the same forecast"""
+        analytics = SalesAnalytics()
+        forecast = await analytics.aget_sales_forecast()
+        self.assertEqual(forecast, await sync_to_async(analytics.get_sales_forecast)())
+        self.assertTrue(forecast['trend_data']['has_data'])
+        self.assertEqual(forecast['top_products'][0]['product__name'], "Product 1")
+        self.assertEqual(forecast['underperforming_products'][0]['product__name'], "Product 2")
+
+    async def test_async_analytics_page(self):
+        """Test that the async page renders the forecast and shares the sync page's cache entry"""
+        request = AsyncRequestFactory().get('/sales-analytics-ai/')
+        request.user = AnonymousUser()
+        response = await views.sales_analytics_ai_async(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Product 1")
+
+        name = f'sales_analytics:{now().date().isoformat()}'
+        context = await sync_to_async(views.cached)(name, lambda: self.fail('sync page rebuilt the context'))
+        self.assertEqual(context['top_products'][0]['product__name'], "Product 1")
+
+    async def test_async_chart_data(self):
+        """Test that the async chart API answers like the sync one, 304 and 400 included"""
+        params = {'since': (now().date() - timedelta(days=10)).isoformat()}
+        response = await views.chart_data_api_async(AsyncRequestFactory().get('/api/charts/sales/', params))
+        expected = await sync_to_async(views.chart_data_api)(RequestFactory().get('/api/charts/sales/', params))
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        self.assertEqual(response['ETag'], expected['ETag'])
+        self.assertEqual(json.loads(response.content)['quantity'][:2], [5, 6])
+
+        response = await views.chart_data_api_async(
+            AsyncRequestFactory().get('/api/charts/sales/', params, headers={'If-None-Match': expected['ETag']})
+        )
+        self.assertEqual(response.status_code, 304)
+
+        for bad in ({'since': 'yesterday'}, {'granularity': 'year'}):
+            with self.subTest(params=bad):
+                response = await views.chart_data_api_async(AsyncRequestFactory().get('/api/charts/sales/', bad))
+                self.assertEqual(response.status_code, 400)
+
+
+# Drives dashboard.asgi.application against a migrated scratch database and
+# prints how many connections the requests opened and how many are still open
+ASGI_CONNECTIONS_SCRIPT = """
+import asyncio
+from django.db.backends.signals import connection_created
+import dashboard.asgi
+from django.core.management import call_command
+from django.db import connection
+
+call_command('migrate', verbosity=0)
+connection.close()
+opened = []
+connection_created.connect(lambda sender, connection, **kwargs: opened.append(connection))
+
+async def get(path):
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'root_path': '', 'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    disconnected = asyncio.Event()
+    received = []
+    status = []
+
+    async def receive():
+        if not received:
+            received.append(True)
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await dashboard.asgi.application(scope, receive, send)
+    assert status == [200], status
+
+async def main():
+    for _ in range(5):
+        await get('/')
+
+asyncio.run(main())
+print(len(opened), sum(wrapper.connection is not None for wrapper in opened))
+"""
+
+
+class ASGIConnectionsTestCase(SimpleTestCase):
+    """Test cases for the database connections of requests served through dashboard/asgi.py"""
+
+    def test_requests_leave_no_connections_open(self):
+        """Test that every request's connection is closed once the response is sent"""
+        scratch = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch.cleanup)
+        env = {
+            name: value for name, value in os.environ.items()
+            if name not in ('DJANGO_SETTINGS_MODULE', 'ASYNC_VIEWS', 'DB_CONN_MAX_AGE', 'DB_ENGINE', 'DB_POOL')
+        }
+        env['DB_NAME'] = os.path.join(scratch.name, 'db.sqlite3')
+        completed = subprocess.run(
+            [sys.executable, '-c', ASGI_CONNECTIONS_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=300,
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
+        opened, still_open = map(int, completed.stdout.split())
+        self.assertGreaterEqual(opened, 5)
+        self.assertEqual(still_open, 0)
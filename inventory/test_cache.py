@@ -0,0 +1,152 @@
+"""
+Tests for the versioned cache and the cached pages
+"""
+from pathlib import Path
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, Client
+from django.urls import reverse
+from dashboard.caches import cache_config
+from inventory.cache import bump_data_version, cache_stats, cached, data_version
+from inventory.models import Category, Product, Sale, Purchase
+from inventory.tests import DASHBOARD_QUERIES
+
+
+class VersionedCacheTestCase(TestCase):
+    """Test cases for the versioned cache helpers"""
+
+    def setUp(self):
+        """Start every test from an empty cache"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_cached_counts_hits_and_misses(self):
+        """Test that the builder only runs on a miss"""
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {'value': 42}
+
+        self.assertEqual(cached('answer', build), {'value': 42})
+        self.assertEqual(cached('answer', build), {'value': 42})
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+    def test_bump_invalidates(self):
+        """Test that bumping the data version forces a rebuild"""
+        version = data_version()
+        cached('answer', lambda: 1)
+
+        bump_data_version()
+
+        self.assertGreater(data_version(), version)
+        self.assertEqual(cached('answer', lambda: 2), 2)
+
+    def test_version_survives_eviction(self):
+        """Test that a lost version counter restarts above the old value"""
+        version = data_version()
+        cache.delete('inventory:data_version')
+        self.assertGreater(data_version(), version)
+
+
+class CachedAnalyticsTestCase(TestCase):
+    """Test cases for the cached sales analytics page"""
+
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Product 1", category=category, stock_quantity=100, price=50.0, gst_rate=18.0
+        )
+        for quantity in (3, 5):
+            Sale.objects.create(product=self.product, quantity_sold=quantity)
+
+    def test_new_sale_or_purchase_invalidates(self):
+        """Test that writes make the next view recompute the forecast"""
+        client = Client()
+        url = reverse('sales_analytics_ai')
+        client.get(url)
+
+        Sale.objects.create(product=self.product, quantity_sold=7)
+        client.get(url)
+        Purchase.objects.create(product=self.product, quantity=1, price_per_unit=40.0)
+        client.get(url)
+        self.assertEqual(cache_stats(), {'hits': 0, 'misses': 3, 'hit_rate': 0.0})
+
+    def test_view_uses_cache(self):
+        """Test that the analytics page is served from the cached forecast"""
+        client = Client()
+        url = reverse('sales_analytics_ai')
+        client.get(url)
+        client.get(url)
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1, 'hit_rate': 0.5})
+
+
+class CachedPagesTestCase(TestCase):
+    """Test cases for the cached stat cards and chart data"""
+
+    def setUp(self):
+        """Set up test data and an empty cache"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = Client()
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Product 1", category=category, stock_quantity=100, price=50.0, gst_rate=18.0
+        )
+        Sale.objects.create(product=self.product, quantity_sold=3)
+
+    def test_dashboard_stats_cached_until_write(self):
+        """Test that repeat dashboard views skip the stat card queries until a sale is written"""
+        url = reverse('dashboard')
+        with self.assertNumQueries(DASHBOARD_QUERIES):
+            self.client.get(url)
+        with self.assertNumQueries(DASHBOARD_QUERIES - 3):
+            response = self.client.get(url)
+        self.assertEqual(response.context['total_sales'], 1)
+
+        Sale.objects.create(product=self.product, quantity_sold=2)
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_sales'], 2)
+
+    def test_chart_data_served_from_cache(self):
+        """Test that repeat chart data requests run no queries and a purchase refreshes them"""
+        url = reverse('chart_data_api')
+        self.client.get(url, {'granularity': 'month'})
+        with self.assertNumQueries(0):
+            self.client.get(url, {'granularity': 'month'})
+
+        Purchase.objects.create(product=self.product, quantity=4, price_per_unit=40.0)
+        data = self.client.get(url, {'granularity': 'month'}).json()
+        self.assertEqual(data['purchases'][-1], 160.0)
+
+    def test_cache_stats_api(self):
+        """Test that the metrics endpoint reports the hit rate"""
+        self.client.get(reverse('chart_data_api'))
+        self.client.get(reverse('chart_data_api'))
+
+        data = self.client.get(reverse('cache_stats_api')).json()
+        self.assertEqual((data['hits'], data['misses'], data['hit_rate']), (1, 1, 0.5))
+        self.assertIn('LocMemCache', data['backend'])
+
+
+class CacheConfigTestCase(SimpleTestCase):
+    """Test cases for cache_config()"""
+
+    def test_backends(self):
+        """Test the local-memory default, the file backend and invalid values"""
+        base_dir = Path('/srv/dashboard')
+        self.assertEqual(cache_config(base_dir, {})['BACKEND'], 'django.core.cache.backends.locmem.LocMemCache')
+
+        config = cache_config(base_dir, {'CACHE_BACKEND': 'file', 'CACHE_TIMEOUT': '600'})
+        self.assertEqual(config['BACKEND'], 'django.core.cache.backends.filebased.FileBasedCache')
+        self.assertEqual(config['LOCATION'], str(base_dir / 'var' / 'cache'))
+        self.assertEqual(config['TIMEOUT'], 600)
+
+        for env in ({'CACHE_BACKEND': 'redis'}, {'CACHE_TIMEOUT': 'never'}):
+            with self.subTest(env=env), self.assertRaises(ImproperlyConfigured):
+                cache_config(base_dir, env)
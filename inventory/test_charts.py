@@ -0,0 +1,91 @@
+"""
+Tests for the chart data API
+"""
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from inventory.models import Category, Product, Sale, Purchase
+
+
+class ChartDataApiTestCase(TestCase):
+    """Test cases for chart_data_api"""
+
+    def setUp(self):
+        """Set up sales on 2025-01-30, 2025-02-03 and 2025-02-04 and a purchase on 2025-01-28"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = Client()
+        self.url = reverse('chart_data_api')
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Product 1", category=category, stock_quantity=100, price=100.0, gst_rate=18.0
+        )
+        for day, quantity in ((date(2025, 1, 30), 2), (date(2025, 2, 3), 1), (date(2025, 2, 4), 3)):
+            sale = Sale.objects.create(product=self.product, quantity_sold=quantity)
+            Sale.objects.filter(id=sale.id).update(date=day)
+        purchase = Purchase.objects.create(product=self.product, quantity=10, price_per_unit=60.0)
+        Purchase.objects.filter(id=purchase.id).update(date=date(2025, 1, 28))
+
+    def test_daily_series_from_first_sale(self):
+        """Test that without since the series starts at the first sale and is zero-filled"""
+        data = self.client.get(self.url, {'until': '2025-02-05'}).json()
+        self.assertEqual(data['labels'][0], '2025-01-30')
+        self.assertEqual(data['quantity'], [2, 0, 0, 0, 1, 3, 0])
+        self.assertEqual(data['sales'][-2], 300.0)
+        self.assertEqual(data['sales_with_gst'][0], 236.0)
+        self.assertEqual(data['next_since'], '2025-02-05')
+
+    def test_since_returns_only_new_periods(self):
+        """Test that since limits the series and is moved back to the start of its period"""
+        data = self.client.get(self.url, {'since': '2025-02-04', 'until': '2025-02-05'}).json()
+        self.assertEqual(data['labels'], ['2025-02-04', '2025-02-05'])
+        self.assertEqual(data['quantity'], [3, 0])
+
+        data = self.client.get(self.url, {'granularity': 'month', 'since': '2025-01-15', 'until': '2025-02-28'}).json()
+        self.assertEqual(data['labels'], ['2025-01', '2025-02'])
+        self.assertEqual(data['starts'], ['2025-01-01', '2025-02-01'])
+        self.assertEqual(data['purchases'], [600.0, 0.0])
+        self.assertEqual(data['next_since'], '2025-02-01')
+
+    def test_long_series_downsampled(self):
+        """Test that points caps the series and the peak and the last period are kept"""
+        params = {'since': '2025-01-01', 'until': '2025-03-31'}
+        full = self.client.get(self.url, params).json()
+        self.assertFalse(full['downsampled'])
+        self.assertEqual(len(full['labels']), 90)
+
+        data = self.client.get(self.url, {**params, 'points': 10}).json()
+        self.assertTrue(data['downsampled'])
+        self.assertEqual(len(data['labels']), 10)
+        self.assertEqual((data['labels'][0], data['labels'][-1]), ('2025-01-01', '2025-03-31'))
+        self.assertEqual(data['next_since'], '2025-03-31')
+        self.assertEqual(max(data['quantity']), 3)
+        self.assertIn('2025-01-28', self.client.get(self.url, {**params, 'points': 10, 'by': 'purchases'}).json()['labels'])
+
+    def test_etag_and_not_modified(self):
+        """Test that an unchanged series answers If-None-Match with 304 and a write changes the ETag"""
+        params = {'since': '2025-02-01', 'until': '2025-02-05'}
+        response = self.client.get(self.url, params)
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        self.assertEqual(self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        sale = Sale.objects.create(product=self.product, quantity_sold=1)
+        Sale.objects.filter(id=sale.id).update(date=date(2025, 2, 5))
+        response = self.client.get(self.url, params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['quantity'][-1], 1)
+
+    def test_invalid_parameters(self):
+        """Test that bad granularities, dates and ranges are rejected"""
+        for params in (
+            {'granularity': 'year'},
+            {'since': 'yesterday'},
+            {'until': '2025-02-30'},
+            {'since': '2025-02-05', 'until': '2025-02-01'},
+            {'points': 'many'},
+            {'by': 'profit'},
+        ):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
@@ -0,0 +1,67 @@
+"""
+Tests for the environment-driven database settings
+"""
+from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from dashboard.database import database_config
+
+
+BASE_DIR = Path('/srv/dashboard')
+
+
+class DatabaseConfigTestCase(SimpleTestCase):
+    """Test cases for database_config()"""
+
+    def test_sqlite_defaults(self):
+        """Test that SQLite gets WAL, a busy timeout, immediate transactions and persistent connections"""
+        config = database_config(BASE_DIR, {})
+        self.assertEqual(config['ENGINE'], 'django.db.backends.sqlite3')
+        self.assertEqual(config['NAME'], BASE_DIR / 'db.sqlite3')
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertEqual(config['OPTIONS']['timeout'], 20)
+        self.assertEqual(config['OPTIONS']['transaction_mode'], 'IMMEDIATE')
+        self.assertIn('journal_mode=WAL', config['OPTIONS']['init_command'])
+
+        config = database_config(BASE_DIR, {'DB_SQLITE_WAL': '0', 'DB_BUSY_TIMEOUT': '2.5', 'DB_CONN_MAX_AGE': '0'})
+        self.assertNotIn('init_command', config['OPTIONS'])
+        self.assertEqual(config['OPTIONS']['timeout'], 2.5)
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+
+    def test_postgresql_with_pool(self):
+        """Test that a pool replaces persistent connections"""
+        env = {'DB_ENGINE': 'postgresql', 'DB_NAME': 'shop', 'DB_HOST': 'db', 'DB_PORT': '5432', 'DB_USER': 'app'}
+        config = database_config(BASE_DIR, env)
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((config['NAME'], config['HOST'], config['PORT'], config['USER']), ('shop', 'db', '5432', 'app'))
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+        self.assertNotIn('pool', config['OPTIONS'])
+
+        config = database_config(BASE_DIR, {**env, 'DB_POOL': '10'})
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(config['OPTIONS']['pool'], {'min_size': 2, 'max_size': 10})
+
+    def test_invalid_settings(self):
+        """Test that unknown engines, bad numbers and pools outside PostgreSQL are rejected"""
+        for env in (
+            {'DB_ENGINE': 'oracle'},
+            {'DB_CONN_MAX_AGE': 'forever'},
+            {'DB_POOL': '10'},
+            {'DB_ENGINE': 'mysql', 'DB_POOL': '10'},
+        ):
+            with self.subTest(env=env), self.assertRaises(ImproperlyConfigured):
+                database_config(BASE_DIR, env)
+
+
+class SQLiteConnectionTestCase(TestCase):
+    """Test cases for the options applied to the live connection"""
+
+    def test_busy_timeout(self):
+        """Test that the busy timeout reaches SQLite"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], int(connection.settings_dict['OPTIONS']['timeout'] * 1000))
@@ -0,0 +1,34 @@
+"""
+Tests for LTTB downsampling
+"""
+import numpy as np
+from django.test import SimpleTestCase
+from inventory.downsampling import lttb_indices
+
+
+class LttbTestCase(SimpleTestCase):
+    """Test cases for lttb_indices"""
+
+    def test_short_series_untouched(self):
+        """Test that a series no longer than the threshold is returned whole"""
+        self.assertEqual(lttb_indices([4, 1, 3], 5).tolist(), [0, 1, 2])
+        self.assertEqual(lttb_indices([], 5).tolist(), [])
+
+    def test_keeps_endpoints_and_peaks(self):
+        """Test that the first and last points, a spike and a dip survive downsampling"""
+        values = np.full(10000, 5.0)
+        values[1234] = 500.0
+        values[7777] = -50.0
+
+        indices = lttb_indices(values, 100)
+
+        self.assertEqual(len(indices), 100)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertEqual((indices[0], indices[-1]), (0, 9999))
+        self.assertIn(1234, indices)
+        self.assertIn(7777, indices)
+
+    def test_threshold_too_small(self):
+        """Test that fewer than three points cannot keep both ends and a shape"""
+        with self.assertRaises(ValueError):
+            lttb_indices(range(10), 2)
@@ -0,0 +1,184 @@
+"""
+Tests for the live dashboard events: the in-process broker, the publishers and the event stream
+"""
+import asyncio
+import json
+import threading
+from unittest import mock
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase, Client, AsyncClient
+from django.urls import reverse
+from inventory.alerts import sync_low_stock_alerts
+from inventory.events import Broker, format_event
+from inventory.models import Category, Product, Purchase
+from inventory.stock import purchase_product, sell_product
+
+
+def parse_event(message):
+    """(event, data) of one formatted server-sent event"""
+    fields = dict(line.split(': ', 1) for line in message.strip().splitlines())
+    return fields['event'], json.loads(fields['data'])
+
+
+class BrokerTestCase(SimpleTestCase):
+    """Test cases for the in-process broker"""
+
+    def test_format_event(self):
+        """Test the id, event and JSON data lines"""
+        self.assertEqual(format_event('stats', {'total_sales': 2}, 7), 'id: 7\nevent: stats\ndata: {"total_sales": 2}\n\n')
+
+    async def test_publish_from_another_thread(self):
+        """Test that a write in a worker thread reaches every subscriber on the event loop"""
+        broker = Broker()
+        first, second = broker.subscribe(), broker.subscribe()
+
+        thread = threading.Thread(target=broker.publish, args=('sale', {'id': 1}))
+        thread.start()
+        thread.join()
+
+        for queue in (first, second):
+            message = await asyncio.wait_for(queue.get(), 1)
+            self.assertEqual(parse_event(message), ('sale', {'id': 1}))
+
+        broker.unsubscribe(first)
+        broker.unsubscribe(second)
+        self.assertFalse(broker.has_subscribers())
+        self.assertEqual(broker.publish('sale', {'id': 2}), 0)
+
+    async def test_full_queue_drops_events(self):
+        """Test that a slow subscriber misses events instead of blocking the publisher"""
+        broker = Broker(queue_size=1)
+        queue = broker.subscribe()
+        broker.publish('sale', {'id': 1})
+        broker.publish('sale', {'id': 2})
+        await asyncio.sleep(0)
+
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(parse_event(queue.get_nowait()), ('sale', {'id': 1}))
+
+
+class PublishTestCase(TestCase):
+    """Test cases for the events published by stock writes"""
+
+    def setUp(self):
+        """Set up a product one unit above the default low stock threshold and a listening broker"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Product 1", category=category, stock_quantity=11, price=100.0, gst_rate=18.0
+        )
+        self.broker = Broker()
+        patcher = mock.patch('inventory.events.broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.published = []
+        mock.patch.object(self.broker, 'has_subscribers', return_value=True).start()
+        mock.patch.object(
+            self.broker, 'publish', side_effect=lambda event, data: self.published.append((event, data))
+        ).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_sale_publishes_on_commit(self):
+        """Test that a sale sends itself, the opened alert and the new totals once committed"""
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            sale = sell_product(self.product, 2)
+            self.assertEqual(self.published, [])
+
+        self.assertTrue(callbacks)
+        events = dict(self.published)
+        self.assertEqual(sorted(events), ['low_stock', 'sale', 'stats'])
+        self.assertEqual(events['sale']['id'], sale.id)
+        self.assertEqual(events['sale']['product'], "Product 1")
+        self.assertEqual(events['sale']['date'], sale.date.isoformat())
+        self.assertEqual(str(events['sale']['total']), '236.00')
+        self.assertEqual(events['low_stock'], {
+            'opened': [{'product_id': self.product.id, 'name': "Product 1", 'stock_quantity': 9, 'threshold': 10}],
+            'resolved': [],
+        })
+        self.assertEqual(events['stats']['total_sales'], 1)
+        self.assertEqual(str(events['stats']['total_revenue']), '236.000000')
+
+    def test_purchase_resolves_alert_and_sends_totals_once(self):
+        """Test that a purchase sends the resolved alert and a single stats event"""
+        Product.objects.filter(pk=self.product.pk).update(stock_quantity=9)
+        sync_low_stock_alerts([self.product.pk])
+        self.published.clear()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            purchase_product(self.product, 5, 60)
+            Purchase.objects.create(product=self.product, quantity=1, price_per_unit=60)
+
+        self.assertEqual([event for event, _ in self.published].count('stats'), 1)
+        self.assertEqual(dict(self.published)['low_stock'], {'opened': [], 'resolved': [self.product.id]})
+        self.assertEqual(dict(self.published)['stats']['total_purchases'], 360)
+
+    def test_totals_sent_after_rolled_back_write(self):
+        """Test that a rolled back transaction does not stop the next one sending its totals"""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    sell_product(self.product, 1)
+                    raise IntegrityError
+            except IntegrityError:
+                pass
+        self.assertEqual(self.published, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            sell_product(self.product, 1)
+            sell_product(self.product, 1)
+        self.assertEqual([event for event, _ in self.published].count('stats'), 1)
+
+    def test_nothing_sent_without_subscribers(self):
+        """Test that no totals are computed when nobody listens"""
+        self.broker.has_subscribers.return_value = False
+        with self.captureOnCommitCallbacks(execute=True):
+            sell_product(self.product, 2)
+        self.assertEqual(self.published, [])
+
+
+class LiveEventsViewTestCase(TestCase):
+    """Test cases for the live_events stream"""
+
+    def setUp(self):
+        """Set up one sale and a broker of our own"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.url = reverse('live_events')
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Product 1", category=category, stock_quantity=100, price=100.0, gst_rate=18.0
+        )
+        sell_product(self.product, 1)
+        self.broker = Broker()
+        patcher = mock.patch('inventory.views.broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_stream_sends_totals_then_published_events(self):
+        """Test that the stream opens with the totals and relays what is published"""
+        response = await AsyncClient().get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+        stream = response.streaming_content
+        try:
+            self.assertTrue((await anext(stream)).startswith(b'retry: '))
+            event, stats = parse_event((await anext(stream)).decode())
+            self.assertEqual((event, stats['total_sales']), ('stats', 1))
+
+            self.assertTrue(self.broker.has_subscribers())
+            self.broker.publish('sale', {'id': 2})
+            event, sale = parse_event((await asyncio.wait_for(anext(stream), 1)).decode())
+            self.assertEqual((event, sale), ('sale', {'id': 2}))
+        finally:
+            await stream.aclose()
+
+    def test_wsgi_sends_totals_and_ends(self):
+        """Test that without ASGI the response is the totals alone, for the browser to poll"""
+        response = Client().get(self.url)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        content = response.content.decode()
+        self.assertTrue(content.startswith('retry: '))
+        self.assertEqual(parse_event(content.split('\n\n', 1)[1])[1]['total_sales'], 1)
@@ -0,0 +1,115 @@
+"""
+Tests for precomputed forecast snapshots
+"""
+from datetime import datetime, timedelta
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase, Client
+from django.urls import reverse
+from inventory.forecast_snapshots import refresh_forecasts, shard_ranges
+from inventory.models import Category, ForecastSnapshot, Product, ProductForecast, Sale
+from inventory.test_process_pool import needs_shared_database
+
+
+class ForecastSnapshotTestCase(TestCase):
+    """Test cases for refresh_forecasts and the refresh_forecasts command"""
+
+    def setUp(self):
+        """Set up three products, two of them with a week of sales"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        category = Category.objects.create(name="Test Category")
+        self.products = [
+            Product.objects.create(
+                name=f"Product {p}", category=category, stock_quantity=500, price=20.0, gst_rate=18.0
+            )
+            for p in range(3)
+        ]
+        today = datetime.now().date()
+        for days_ago in range(7):
+            for product in self.products[:2]:
+                sale = Sale.objects.create(product=product, quantity_sold=10 - days_ago)
+                Sale.objects.filter(id=sale.id).update(date=today - timedelta(days=days_ago))
+
+    def test_shard_ranges(self):
+        """Test that ids are split into contiguous inclusive ranges"""
+        self.assertEqual(shard_ranges([1, 2, 5, 9, 10], 2), [(1, 5), (9, 10)])
+        self.assertEqual(shard_ranges([3], 4), [(3, 3)])
+        self.assertEqual(shard_ranges([], 4), [])
+
+    def test_refresh_stores_snapshot_and_product_forecasts(self):
+        """Test that every product gets a forecast, across shards"""
+        snapshot = refresh_forecasts(history_days=30, horizon=14, shards=2)
+
+        self.assertTrue(snapshot.forecast['trend_data']['has_data'])
+        self.assertEqual(len(snapshot.forecast['trend_data']['predictions']), 14)
+        forecasts = {f.product_id: f for f in snapshot.product_forecasts.all()}
+        self.assertEqual(set(forecasts), {p.id for p in self.products})
+        self.assertGreater(forecasts[self.products[0].id].slope, 0)
+        self.assertEqual(forecasts[self.products[2].id].predicted_quantity, 0)
+
+    def test_old_snapshots_are_pruned(self):
+        """Test that only the newest snapshots are kept"""
+        for _ in range(3):
+            latest = refresh_forecasts(keep=2)
+
+        self.assertEqual(ForecastSnapshot.objects.count(), 2)
+        self.assertEqual(ForecastSnapshot.objects.latest().id, latest.id)
+        self.assertEqual(ProductForecast.objects.count(), 2 * len(self.products))
+
+    def test_command(self):
+        """Test a single run of the refresh_forecasts command"""
+        out = StringIO()
+        call_command('refresh_forecasts', '--history-days', '30', stdout=out)
+        self.assertIn('with 3 product forecasts', out.getvalue())
+
+        for keep in ('0', '-1'):
+            with self.subTest(keep=keep), self.assertRaises(CommandError):
+                call_command('refresh_forecasts', '--keep', keep, stdout=StringIO())
+        with self.assertRaises(ValueError):
+            refresh_forecasts(keep=0)
+        self.assertEqual(ForecastSnapshot.objects.count(), 1)
+
+    def test_view_reads_latest_snapshot(self):
+        """Test that the analytics page is served from the snapshot in one query"""
+        snapshot = refresh_forecasts()
+        snapshot.forecast['suggestions'] = ['From the snapshot']
+        snapshot.save()
+
+        with self.assertNumQueries(1):
+            response = Client().get(reverse('sales_analytics_ai'))
+
+        self.assertEqual(response.context['suggestions'], ['From the snapshot'])
+        self.assertContains(response, 'Forecast computed')
+
+
+# Workers query over connections of their own, which only see committed rows
+@needs_shared_database
+class MultiWorkerForecastTestCase(TransactionTestCase):
+    """Test cases for refresh_forecasts across a process pool"""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        category = Category.objects.create(name="Test Category")
+        self.products = [
+            Product.objects.create(name=f"Product {p}", category=category, stock_quantity=500, price=20.0)
+            for p in range(3)
+        ]
+        today = datetime.now().date()
+        for days_ago in range(7):
+            sale = Sale.objects.create(product=self.products[0], quantity_sold=10 - days_ago)
+            Sale.objects.filter(id=sale.id).update(date=today - timedelta(days=days_ago))
+
+    def test_workers_match_single_process(self):
+        """Test that shards fitted in worker processes give the single process forecasts"""
+        fields = ('product_id', 'slope', 'intercept', 'r2', 'predicted_quantity')
+        single = refresh_forecasts(history_days=30, horizon=14, shards=3)
+        pooled = refresh_forecasts(history_days=30, horizon=14, workers=2, shards=3)
+
+        self.assertEqual(
+            list(pooled.product_forecasts.order_by('product_id').values_list(*fields)),
+            list(single.product_forecasts.order_by('product_id').values_list(*fields)),
+        )
+        self.assertEqual(pooled.product_forecasts.count(), len(self.products))
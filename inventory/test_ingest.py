@@ -0,0 +1,143 @@
+"""
+Tests for bulk sale/purchase ingestion
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from inventory.ingest import IngestError, ingest_rows, parse_rows
+from inventory.models import Category, CustomUser, DailySalesRollup, Product, Sale
+
+
+class IngestTestCase(TestCase):
+    """Test cases for ingest_rows and the import_sales command"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.category = Category.objects.create(name="Test Category")
+        self.pen = Product.objects.create(
+            name="Pen", category=self.category, stock_quantity=100, price=10.0, gst_rate=18.0
+        )
+        self.book = Product.objects.create(
+            name="Book", category=self.category, stock_quantity=5, price=200.0, gst_rate=5.0
+        )
+
+    def test_ingest_csv(self):
+        """Test that a CSV batch stores rows, stock and rollups"""
+        lines = [
+            'type,product_id,quantity,price_per_unit',
+            f'sale,{self.pen.id},3,',
+            f'sale,{self.pen.id},2,',
+            f'purchase,{self.book.id},10,150',
+            f'sale,{self.book.id},12,',
+        ]
+        result = ingest_rows(parse_rows(lines, 'csv'))
+
+        self.assertEqual(result, {'sales': 3, 'purchases': 1})
+        self.pen.refresh_from_db()
+        self.book.refresh_from_db()
+        self.assertEqual(self.pen.stock_quantity, 95)
+        self.assertEqual(self.book.stock_quantity, 3)
+        self.assertEqual(DailySalesRollup.objects.get(product=self.pen).quantity, 5)
+        self.assertEqual(DailySalesRollup.objects.get(product=self.book).purchased_quantity, 10)
+
+    def test_ingest_jsonl(self):
+        """Test that JSON lines default to sales"""
+        lines = [
+            json.dumps({'product_id': self.pen.id, 'quantity': 4}),
+            '',
+            json.dumps({'type': 'purchase', 'product_id': self.pen.id, 'quantity': 1, 'price_per_unit': 8}),
+        ]
+        result = ingest_rows(parse_rows(lines, 'jsonl'))
+
+        self.assertEqual(result, {'sales': 1, 'purchases': 1})
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock_quantity, 97)
+
+    def test_invalid_rows_reject_whole_batch(self):
+        """Test that any invalid row leaves the database untouched"""
+        lines = [
+            json.dumps({'product_id': self.pen.id, 'quantity': 1}),
+            json.dumps({'product_id': 9999, 'quantity': 1}),
+            json.dumps({'product_id': self.pen.id, 'quantity': 0}),
+            '{not json',
+            json.dumps({'type': 'purchase', 'product_id': self.pen.id, 'quantity': 1, 'price_per_unit': 1e30}),
+            json.dumps({'type': 'purchase', 'product_id': self.pen.id, 'quantity': 1, 'price_per_unit': 'abc'}),
+        ]
+        with self.assertRaises(IngestError) as ctx:
+            ingest_rows(parse_rows(lines, 'jsonl'))
+
+        self.assertEqual(len(ctx.exception.errors), 5)
+        self.assertEqual(sum('price_per_unit' in error for error in ctx.exception.errors), 2)
+        self.assertFalse(Sale.objects.exists())
+
+    def test_insufficient_stock_rolls_back(self):
+        """Test that overselling any product rolls back every stock change"""
+        lines = [
+            json.dumps({'product_id': self.pen.id, 'quantity': 10}),
+            json.dumps({'product_id': self.book.id, 'quantity': 6}),
+        ]
+        with self.assertRaises(IngestError):
+            ingest_rows(parse_rows(lines, 'jsonl'))
+
+        self.pen.refresh_from_db()
+        self.assertEqual(self.pen.stock_quantity, 100)
+        self.assertFalse(Sale.objects.exists())
+
+    def test_query_count_independent_of_batch_size(self):
+        """Test that queries grow with products touched, not rows"""
+        lines = [json.dumps({'product_id': self.pen.id, 'quantity': 1}) for _ in range(50)]
+        # product lookup, stock update, sale insert, lot allocation, rollup upsert, alert check and savepoints
+        with self.assertNumQueries(13):
+            ingest_rows(parse_rows(lines, 'jsonl'))
+        self.assertEqual(Sale.objects.count(), 50)
+
+    def test_import_sales_command(self):
+        """Test the import_sales management command"""
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write(f'type,product_id,quantity,price_per_unit\nsale,{self.pen.id},2,\n')
+        self.addCleanup(os.unlink, handle.name)
+
+        out = StringIO()
+        call_command('import_sales', handle.name, stdout=out)
+        self.assertIn('Imported 1 sales and 0 purchases', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('import_sales', handle.name, '--format', 'jsonl', stdout=out)
+
+
+class IngestViewTestCase(TestCase):
+    """Test cases for the bulk ingestion endpoint"""
+
+    def setUp(self):
+        """Set up test client and data"""
+        self.client = Client()
+        self.url = reverse('ingest_sales')
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Pen", category=category, stock_quantity=10, price=10.0, gst_rate=18.0
+        )
+        self.user = CustomUser.objects.create_user('cashier', password='secret', role='sales')
+
+    def test_requires_authentication(self):
+        """Test that anonymous requests are refused"""
+        response = self.client.post(self.url, 'product_id,quantity\n1,1\n', content_type='text/csv')
+        self.assertEqual(response.status_code, 403)
+
+    def test_ingest_endpoint(self):
+        """Test CSV ingestion and error reporting over HTTP"""
+        self.client.force_login(self.user)
+
+        body = f'product_id,quantity\n{self.product.id},3\n'
+        response = self.client.post(self.url, body, content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['sales'], 1)
+
+        body = json.dumps({'product_id': self.product.id, 'quantity': 50})
+        response = self.client.post(self.url, body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Insufficient stock', response.json()['errors'][0])
@@ -0,0 +1,85 @@
+"""
+Tests for bulk invoice runs
+"""
+import os
+import shutil
+import tempfile
+import zipfile
+from io import StringIO
+from pathlib import Path
+from django.core.management import CommandError, call_command
+from django.test import TestCase, TransactionTestCase
+from inventory.invoice_runs import chunked, render_sale_invoices
+from inventory.models import Category, Product, Sale
+from inventory.test_process_pool import needs_shared_database
+
+
+class RenderInvoicesTestCase(TestCase):
+    """Test cases for render_sale_invoices and the render_invoices command"""
+
+    def setUp(self):
+        """Set up five sales and a scratch output directory"""
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+        category = Category.objects.create(name="Test Category")
+        self.pen = Product.objects.create(name="Pen", category=category, stock_quantity=100, price=10.0)
+        self.sales = [Sale.objects.create(product=self.pen, quantity_sold=q) for q in range(1, 6)]
+
+    def test_chunked(self):
+        """Test that ids are split into fixed-size chunks"""
+        self.assertEqual(list(chunked(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_resumes_after_interruption(self):
+        """Test that existing invoices are skipped unless forced"""
+        render_sale_invoices(Sale.objects.filter(id__in=[s.id for s in self.sales[:2]]), self.output)
+        (self.output / 'INV-999999.pdf.tmp').write_bytes(b'partial')
+
+        stats = render_sale_invoices(Sale.objects.all(), self.output, chunk_size=2)
+        self.assertEqual((stats['rendered'], stats['skipped']), (3, 2))
+        self.assertEqual(len(list(self.output.glob('INV-*.pdf'))), 5)
+
+        stats = render_sale_invoices(Sale.objects.all(), self.output, force=True)
+        self.assertEqual((stats['rendered'], stats['skipped']), (5, 0))
+
+    def test_chunk_loads_sales_in_one_query(self):
+        """Test that a chunk costs one query however many sales it holds"""
+        with self.assertNumQueries(2):
+            render_sale_invoices(Sale.objects.all(), self.output, chunk_size=10)
+
+    def test_command_archive(self):
+        """Test the command's archive output and throughput report"""
+        archive = self.output / 'month.zip'
+        out = StringIO()
+        call_command('render_invoices', '--archive', str(archive), '--product', str(self.pen.id), stdout=out)
+
+        self.assertIn('invoices/s', out.getvalue())
+        self.assertIn('worker', out.getvalue())
+        self.assertEqual(len(zipfile.ZipFile(archive).namelist()), 5)
+        self.assertFalse((self.output / 'month.zip.parts').exists())
+
+        for start in ('soon', '2024-02-30'):
+            with self.subTest(start=start), self.assertRaises(CommandError):
+                call_command('render_invoices', '--output', str(self.output), '--start', start, stdout=out)
+
+
+# Workers query over connections of their own, which only see committed rows
+@needs_shared_database
+class MultiWorkerRenderTestCase(TransactionTestCase):
+    """Test cases for render_sale_invoices across a process pool"""
+
+    def setUp(self):
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+        category = Category.objects.create(name="Test Category")
+        pen = Product.objects.create(name="Pen", category=category, stock_quantity=100, price=10.0)
+        for q in range(1, 6):
+            Sale.objects.create(product=pen, quantity_sold=q)
+
+    def test_workers_render_every_chunk(self):
+        """Test that chunks rendered in worker processes cover every sale"""
+        stats = render_sale_invoices(Sale.objects.all(), self.output, workers=2, chunk_size=2)
+
+        self.assertEqual(stats['rendered'], 5)
+        self.assertEqual(sum(rendered for rendered, _ in stats['workers'].values()), 5)
+        self.assertNotIn(os.getpid(), stats['workers'])
+        self.assertEqual(len(list(self.output.glob('INV-*.pdf'))), 5)
@@ -0,0 +1,111 @@
+"""
+Tests for cached and bulk invoice generation
+"""
+import io
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from inventory.invoices import invoice_file, sale_invoice_data
+from inventory.models import Category, Product, Sale
+
+
+class InvoiceTestCase(TestCase):
+    """Test cases for invoice contents, the disk cache and the invoice views"""
+
+    def setUp(self):
+        """Set up two products with different GST rates, three sales and a scratch cache directory"""
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        settings_override = override_settings(INVOICE_CACHE_DIR=cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        category = Category.objects.create(name="Test Category")
+        self.pen = Product.objects.create(name="Pen", category=category, stock_quantity=100, price=10.0, gst_rate=18.0)
+        self.book = Product.objects.create(name="Book", category=category, stock_quantity=100, price=200.0, gst_rate=5.0)
+        self.sales = [
+            Sale.objects.create(product=self.pen, quantity_sold=3),
+            Sale.objects.create(product=self.book, quantity_sold=1),
+            Sale.objects.create(product=self.pen, quantity_sold=2),
+        ]
+
+    def test_line_items_and_gst_breakdown(self):
+        """Test totals and the per-rate CGST/SGST split"""
+        data = sale_invoice_data(self.sales)
+        self.assertEqual(len(data['lines']), 3)
+        self.assertEqual(data['subtotal'], 250.0)
+        self.assertEqual(data['gst_total'], 19.0)
+        self.assertEqual(data['total'], 269.0)
+        self.assertEqual(
+            [(rate['rate'], rate['taxable'], rate['cgst']) for rate in data['gst_breakdown']],
+            [(5.0, 200.0, 5.0), (18.0, 50.0, 4.5)],
+        )
+
+    def test_cache_is_keyed_by_content(self):
+        """Test that unchanged invoices reuse the file and changed sales render a new one"""
+        path, digest = invoice_file(sale_invoice_data(self.sales[:1]))
+        self.assertTrue(path.read_bytes().startswith(b'%PDF'))
+        self.assertEqual(invoice_file(sale_invoice_data(self.sales[:1])), (path, digest))
+
+        # Repricing the product leaves the price recorded on the sale alone
+        self.pen.price = 12.0
+        self.pen.save()
+        self.sales[0].refresh_from_db()
+        self.assertEqual(invoice_file(sale_invoice_data(self.sales[:1]))[1], digest)
+
+        self.sales[0].quantity_sold += 1
+        self.sales[0].save()
+        self.assertNotEqual(invoice_file(sale_invoice_data(self.sales[:1]))[1], digest)
+
+    def test_sale_invoice_conditional_requests(self):
+        """Test ETag/Last-Modified headers and 304 responses"""
+        url = reverse('sale_invoice', args=[self.sales[0].id])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        etag = response['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        since = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(since.status_code, 304)
+        self.assertEqual(self.client.get(reverse('sale_invoice', args=[9999])).status_code, 404)
+
+    def test_generate_invoice_missing_product(self):
+        """Test that the product invoice returns 404 instead of a server error"""
+        self.assertEqual(self.client.get(reverse('generate_invoice', args=[9999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('generate_invoice', args=[self.pen.id])).status_code, 200)
+
+    def test_batch_invoice(self):
+        """Test one invoice for several sales and parameter validation"""
+        ids = ','.join(str(sale.id) for sale in self.sales)
+        response = self.client.get(reverse('batch_invoice'), {'sales': ids})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'INV-{self.sales[0].id:06d}-3', response['Content-Disposition'])
+
+        self.assertEqual(self.client.get(reverse('batch_invoice'), {'sales': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('batch_invoice')).status_code, 400)
+        self.assertEqual(self.client.get(reverse('batch_invoice'), {'sales': '9999'}).status_code, 404)
+
+    def test_bulk_zip_and_pdf(self):
+        """Test the streamed ZIP of per-sale invoices and the combined PDF"""
+        response = self.client.get(reverse('bulk_invoices'), {'product': self.pen.id})
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(
+            archive.namelist(),
+            [f'INV-{self.sales[0].id:06d}.pdf', f'INV-{self.sales[2].id:06d}.pdf'],
+        )
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b'%PDF'))
+
+        response = self.client.get(reverse('bulk_invoices'), {'product': self.pen.id, 'format': 'pdf'})
+        self.assertEqual(b''.join(response.streaming_content).count(b'/Type /Page\n'), 2)
+        self.assertEqual(self.client.get(reverse('bulk_invoices'), {'format': 'tar'}).status_code, 400)
+
+        with mock.patch('inventory.views.MAX_PDF_INVOICES', 1):
+            response = self.client.get(reverse('bulk_invoices'), {'product': self.pen.id, 'format': 'pdf'})
+            self.assertEqual(response.status_code, 400)
+            response = self.client.get(reverse('bulk_invoices'), {'product': self.pen.id})
+            self.assertEqual(response.status_code, 200)
@@ -0,0 +1,83 @@
+"""
+Tests for lot tracking and FEFO allocation
+"""
+from datetime import datetime, timedelta
+from django.test import TestCase, Client
+from django.urls import reverse
+from inventory.lots import allocate_lots, expiring_lots
+from inventory.models import Category, Product, StockLot
+from inventory.stock import purchase_product, sell_product
+
+
+class StockLotTestCase(TestCase):
+    """Test cases for receiving, allocating and reporting lots"""
+
+    def setUp(self):
+        """Set up a product with undated opening stock and two dated purchases"""
+        self.today = datetime.now().date()
+        category = Category.objects.create(name="Dairy")
+        self.milk = Product.objects.create(name="Milk", category=category, stock_quantity=5, price=30.0)
+        purchase_product(self.milk, 10, 20.0, expiry_date=self.today + timedelta(days=20))
+        purchase_product(self.milk, 4, 20.0, expiry_date=self.today + timedelta(days=3))
+
+    def _remaining(self):
+        return list(self.milk.lots.order_by('id').values_list('remaining', flat=True))
+
+    def test_purchases_and_opening_stock_become_lots(self):
+        """Test that opening stock and each purchase get their own lot"""
+        self.assertEqual(self._remaining(), [5, 10, 4])
+        self.assertEqual(StockLot.objects.filter(purchase__isnull=False).count(), 2)
+
+    def test_sales_consume_earliest_expiry_first(self):
+        """Test FEFO order: dated lots by expiry, undated lots last"""
+        sell_product(self.milk, 6)
+        self.assertEqual(self._remaining(), [5, 8, 0])
+
+        sell_product(self.milk, 10)
+        self.assertEqual(self._remaining(), [3, 0, 0])
+
+    def test_allocation_queries_do_not_grow_with_lot_history(self):
+        """Test that sold-out lots do not slow down allocation"""
+        for _ in range(30):
+            purchase_product(self.milk, 1, 20.0, expiry_date=self.today + timedelta(days=1))
+            sell_product(self.milk, 1)
+        soonest = self.milk.lots.order_by('id')[2]
+        # dated lot lookup + update
+        with self.assertNumQueries(2):
+            self.assertEqual(allocate_lots(self.milk.id, 2), [(soonest.id, 2)])
+
+        plan = (
+            StockLot.objects.filter(product=self.milk, remaining__gt=0, expiry_date__isnull=False)
+            .order_by('expiry_date', 'id').explain()
+        )
+        self.assertIn('lot_fefo_idx', plan)
+
+    def test_untracked_stock_is_reported_as_shortfall(self):
+        """Test that allocation stops when lots run out"""
+        Product.objects.filter(pk=self.milk.pk).update(stock_quantity=100)
+        self.assertEqual(sum(units for _, units in allocate_lots(self.milk.id, 50)), 19)
+
+    def test_expiring_lots(self):
+        """Test the expiring report window and that it scans the expiry index"""
+        self.assertEqual([lot.remaining for lot in expiring_lots(7, self.today)], [4])
+        self.assertEqual([lot.remaining for lot in expiring_lots(30, self.today)], [4, 10])
+
+        sell_product(self.milk, 4)
+        self.assertEqual(list(expiring_lots(7, self.today)), [])
+        self.assertIn('lot_expiry_idx', expiring_lots(7, self.today).explain())
+
+    def test_record_purchase_with_expiry_and_dashboard_panel(self):
+        """Test the purchase form's expiry date and the dashboard's expiring panel"""
+        client = Client()
+        expiry = self.today + timedelta(days=1)
+        client.post(reverse('record_sale'), {
+            'record_purchase': '1', 'product_id': self.milk.id, 'quantity': 2,
+            'price_per_unit': 18, 'expiry_date': expiry.isoformat(),
+        })
+        self.assertEqual(StockLot.objects.latest('id').expiry_date, expiry)
+
+        response = client.get(reverse('dashboard'), {'expiring_days': 2})
+        self.assertEqual([lot.remaining for lot in response.context['expiring_lots']], [2])
+
+        response = client.get(reverse('dashboard'), {'expiring_days': 99999999999})
+        self.assertEqual(response.context['expiring_days'], 3650)
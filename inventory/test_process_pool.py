@@ -0,0 +1,35 @@
+"""
+Tests for the process pool helper
+"""
+import multiprocessing
+import os
+import unittest
+from django.db import connection
+from django.test import SimpleTestCase
+from inventory.process_pool import pool_map
+
+# A forked worker keeps the test runner's in-memory SQLite database; any other
+# start method opens a new, empty one
+needs_shared_database = unittest.skipIf(
+    connection.vendor == 'sqlite' and not connection.settings_dict['TEST']['NAME']
+    and multiprocessing.get_start_method() != 'fork',
+    'workers cannot see an in-memory test database without fork',
+)
+
+
+def worker_pid(value, offset):
+    return os.getpid(), value + offset
+
+
+class PoolMapTestCase(SimpleTestCase):
+    """Test cases for pool_map"""
+
+    def test_single_worker_runs_in_process(self):
+        """Test that one worker maps in the calling process"""
+        self.assertEqual(pool_map(worker_pid, [1, 2], [10, 10]), [(os.getpid(), 11), (os.getpid(), 12)])
+
+    def test_workers_run_in_other_processes(self):
+        """Test that several workers map in child processes and keep the order"""
+        results = pool_map(worker_pid, range(6), [10] * 6, workers=2)
+        self.assertEqual([value for _, value in results], list(range(10, 16)))
+        self.assertNotIn(os.getpid(), {pid for pid, _ in results})
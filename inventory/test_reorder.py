@@ -0,0 +1,95 @@
+"""
+Tests for the reorder engine
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+from io import StringIO
+from django.core.management import CommandError, call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from inventory.models import Category, Product, ReorderRun, ReorderSuggestion, Sale, StockThreshold
+from inventory.reorder import compute_reorder, refresh_reorder
+
+
+class ReorderTestCase(TestCase):
+    """Test cases for compute_reorder, refresh_reorder and the reorder pages"""
+
+    def setUp(self):
+        """Set up a fast seller, a slow seller and a product that never sells"""
+        category = Category.objects.create(name="Test Category")
+        self.fast = Product.objects.create(name="Fast", category=category, stock_quantity=50, price=10.0)
+        self.slow = Product.objects.create(name="Slow", category=category, stock_quantity=500, price=10.0)
+        self.idle = Product.objects.create(name="Idle", category=category, stock_quantity=5, price=10.0)
+        StockThreshold.objects.create(product=self.idle, threshold=8)
+
+        today = datetime.now().date()
+        for days_ago in range(10):
+            for product, quantity in ((self.fast, 10), (self.slow, 1)):
+                sale = Sale.objects.create(product=product, quantity_sold=quantity)
+                Sale.objects.filter(id=sale.id).update(date=today - timedelta(days=days_ago))
+
+    def _by_product(self, result):
+        keys = ('stock', 'velocity', 'days_of_cover', 'reorder_point', 'reorder_quantity')
+        return {
+            product_id: dict(zip(keys, values))
+            for product_id, *values in zip(result['ids'].tolist(), *(result[key].tolist() for key in keys))
+        }
+
+    def test_velocity_cover_and_quantity(self):
+        """Test the reorder figures for steady demand"""
+        result = self._by_product(compute_reorder(window_days=10, lead_time_days=7, cover_days=30))
+
+        fast = result[self.fast.id]
+        self.assertAlmostEqual(fast['velocity'], 10.0)
+        self.assertAlmostEqual(fast['days_of_cover'], 5.0)
+        # Steady demand needs no safety stock: 7 days of lead time at 10/day
+        self.assertEqual(fast['reorder_point'], 70)
+        self.assertEqual(fast['reorder_quantity'], 10 * 37 - 50)
+
+        slow = result[self.slow.id]
+        self.assertAlmostEqual(slow['days_of_cover'], 500.0)
+        self.assertEqual(slow['reorder_quantity'], 0)
+
+    def test_idle_product_uses_threshold(self):
+        """Test that products without sales fall back to their low stock threshold"""
+        idle = self._by_product(compute_reorder(window_days=10))[self.idle.id]
+        self.assertEqual(idle['velocity'], 0)
+        self.assertTrue(idle['days_of_cover'] != idle['days_of_cover'])  # NaN
+        self.assertEqual(idle['reorder_point'], 8)
+        self.assertEqual(idle['reorder_quantity'], 3)
+
+    def test_refresh_stores_one_row_per_product(self):
+        """Test that a run covers the catalogue in a fixed number of queries"""
+        with self.assertNumQueries(8):
+            run = refresh_reorder(window_days=10, keep=1)
+        self.assertEqual(run.suggestions.count(), 3)
+        self.assertIsNone(run.suggestions.get(product=self.idle).days_of_cover)
+
+        refresh_reorder(window_days=10, keep=1)
+        self.assertEqual(ReorderRun.objects.count(), 1)
+        self.assertEqual(ReorderSuggestion.objects.count(), 3)
+
+    def test_keep_must_leave_the_new_run(self):
+        """Test that keeping fewer than one run is refused before anything is written"""
+        for keep in ('0', '-1'):
+            with self.subTest(keep=keep), self.assertRaises(CommandError):
+                call_command('refresh_reorder', '--keep', keep, stdout=StringIO())
+        with self.assertRaises(ValueError):
+            refresh_reorder(keep=0)
+        self.assertFalse(ReorderRun.objects.exists())
+
+    def test_reorder_page_and_csv(self):
+        """Test that the page lists the most urgent products first and the CSV has them all"""
+        client = Client()
+        self.assertContains(client.get(reverse('reorder')), 'refresh_reorder')
+
+        call_command('refresh_reorder', '--window', '10', stdout=StringIO())
+        response = client.get(reverse('reorder'))
+        self.assertEqual([s.product for s in response.context['suggestions']], [self.fast, self.idle])
+
+        response = client.get(reverse('export_reorder'))
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][1], 'Product')
+        self.assertEqual([row[1] for row in rows[1:]], ['Fast', 'Idle'])
+        self.assertEqual(rows[2][4], '')
@@ -0,0 +1,101 @@
+"""
+Tests for the DailySalesRollup maintenance
+"""
+from io import StringIO
+from datetime import datetime, timedelta
+from django.core.management import call_command
+from django.test import TestCase
+from inventory.models import Category, Product, Sale, Purchase, DailySalesRollup
+from inventory.rollups import rebuild_rollups
+
+
+class DailySalesRollupTestCase(TestCase):
+    """Test cases for incremental rollup maintenance"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Product 1",
+            category=self.category,
+            stock_quantity=100,
+            price=200.0,
+            gst_rate=18.0
+        )
+        self.today = datetime.now().date()
+
+    def _rollup_values(self):
+        return list(
+            DailySalesRollup.objects
+            .order_by('date', 'product_id')
+            .values('date', 'product_id', 'quantity', 'sales_count', 'revenue',
+                    'revenue_without_gst', 'purchased_quantity', 'purchase_cost')
+        )
+
+    def test_sale_creates_and_increments_rollup(self):
+        """Test that sales accumulate into a single row per day and product"""
+        Sale.objects.create(product=self.product, quantity_sold=2)
+        Sale.objects.create(product=self.product, quantity_sold=3)
+
+        rollup = DailySalesRollup.objects.get(date=self.today, product=self.product)
+        self.assertEqual(rollup.quantity, 5)
+        self.assertEqual(rollup.sales_count, 2)
+        self.assertAlmostEqual(rollup.revenue, 5 * 236.0)
+        self.assertAlmostEqual(rollup.revenue_without_gst, 5 * 200.0)
+
+    def test_purchase_updates_rollup(self):
+        """Test that purchases are recorded alongside sales"""
+        Purchase.objects.create(product=self.product, quantity=10, price_per_unit=150.0)
+
+        rollup = DailySalesRollup.objects.get(date=self.today, product=self.product)
+        self.assertEqual(rollup.quantity, 0)
+        self.assertEqual(rollup.purchased_quantity, 10)
+        self.assertAlmostEqual(rollup.purchase_cost, 1500.0)
+
+    def test_delete_removes_contribution(self):
+        """Test that deleting the last sale of a day drops the rollup row"""
+        first = Sale.objects.create(product=self.product, quantity_sold=2)
+        second = Sale.objects.create(product=self.product, quantity_sold=3)
+
+        first.delete()
+        self.assertEqual(DailySalesRollup.objects.get(date=self.today).quantity, 3)
+
+        second.delete()
+        self.assertFalse(DailySalesRollup.objects.exists())
+
+    def test_queryset_update_moves_sale_between_days(self):
+        """Test that backdating sales with update() keeps the rollup consistent"""
+        sale = Sale.objects.create(product=self.product, quantity_sold=4)
+        yesterday = self.today - timedelta(days=1)
+
+        Sale.objects.filter(id=sale.id).update(date=yesterday)
+
+        self.assertFalse(DailySalesRollup.objects.filter(date=self.today).exists())
+        self.assertEqual(DailySalesRollup.objects.get(date=yesterday).quantity, 4)
+
+    def test_rebuild_matches_incremental_rollup(self):
+        """Test that a full rebuild reproduces the incrementally maintained rows"""
+        for i in range(5):
+            sale = Sale.objects.create(product=self.product, quantity_sold=i + 1)
+            Sale.objects.filter(id=sale.id).update(date=self.today - timedelta(days=i % 3))
+        Purchase.objects.create(product=self.product, quantity=7, price_per_unit=120.0)
+        incremental = self._rollup_values()
+
+        self.assertEqual(rebuild_rollups(), len(incremental))
+        rebuilt = self._rollup_values()
+
+        self.assertEqual(len(rebuilt), len(incremental))
+        for expected, actual in zip(incremental, rebuilt):
+            for field, value in expected.items():
+                self.assertAlmostEqual(actual[field], value)
+
+    def test_rebuild_command(self):
+        """Test the rebuild_sales_rollup management command"""
+        Sale.objects.create(product=self.product, quantity_sold=2)
+        DailySalesRollup.objects.all().delete()
+
+        out = StringIO()
+        call_command('rebuild_sales_rollup', stdout=out)
+
+        self.assertIn('Rebuilt 1 daily rollup rows', out.getvalue())
+        self.assertEqual(DailySalesRollup.objects.get(date=self.today).quantity, 2)
@@ -1,11 +1,15 @@
 """
 Tests for Sales Analytics AI functionality
 """
+import time
+import numpy as np
+from sklearn.linear_model import LinearRegression
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from datetime import datetime, timedelta
 from inventory.models import Category, Product, Sale
-from inventory.sales_analytics import SalesAnalytics
+from inventory.sales_analytics import SalesAnalytics, fit_linear_trends
 
 
 class SalesAnalyticsTestCase(TestCase):
@@ -232,3 +236,114 @@ class SalesAnalyticsURLTestCase(TestCase):
         """Test that the sales analytics URL resolves correctly"""
         url = reverse('sales_analytics_ai')
         self.assertEqual(url, '/sales-analytics-ai/')
+
+
+class SalesAnalyticsQueryCountTestCase(TestCase):
+    """Test that the forecast pipeline runs a small fixed number of queries"""
+
+    # daily series, top sellers, underperformers
+    FORECAST_QUERIES = 3
+
+    def setUp(self):
+        """Set up test data with several products and days of sales"""
+        cache.clear()
+        self.addCleanup(cache.clear)
+        category = Category.objects.create(name="Test Category")
+        for p in range(6):
+            product = Product.objects.create(
+                name=f"Product {p}",
+                category=category,
+                stock_quantity=100,
+                price=100.0 + p,
+                gst_rate=18.0
+            )
+            for i in range(8):
+                sale = Sale.objects.create(product=product, quantity_sold=1 + (i * p) % 5)
+                Sale.objects.filter(id=sale.id).update(date=datetime.now().date() - timedelta(days=i))
+
+    def test_get_sales_forecast_query_count(self):
+        """Test that each dataset is fetched exactly once"""
+        with self.assertNumQueries(self.FORECAST_QUERIES):
+            forecast = SalesAnalytics().get_sales_forecast()
+
+        self.assertEqual(len(forecast['top_products']), 5)
+        self.assertTrue(forecast['trend_data']['has_data'])
+
+    def test_forecast_page_query_count(self):
+        """Test that the whole analytics page stays within the same fixed budget"""
+        # plus the lookup for a precomputed snapshot
+        with self.assertNumQueries(self.FORECAST_QUERIES + 1):
+            response = Client().get(reverse('sales_analytics_ai'))
+        self.assertEqual(response.status_code, 200)
+
+
+class VectorizedForecastTestCase(TestCase):
+    """Test cases for the batched per-product forecasting engine"""
+
+    def setUp(self):
+        """Set up products in two categories, one without sales"""
+        self.analytics = SalesAnalytics()
+        self.food = Category.objects.create(name="Food")
+        self.tools = Category.objects.create(name="Tools")
+        self.rising = Product.objects.create(
+            name="Rising", category=self.food, stock_quantity=500, price=10.0, gst_rate=5.0
+        )
+        self.flat = Product.objects.create(
+            name="Flat", category=self.tools, stock_quantity=500, price=10.0, gst_rate=5.0
+        )
+        self.unsold = Product.objects.create(
+            name="Unsold", category=self.tools, stock_quantity=500, price=10.0, gst_rate=5.0
+        )
+        today = datetime.now().date()
+        for days_ago in range(10):
+            for product, quantity in ((self.rising, 20 - days_ago), (self.flat, 4)):
+                sale = Sale.objects.create(product=product, quantity_sold=quantity)
+                Sale.objects.filter(id=sale.id).update(date=today - timedelta(days=days_ago))
+
+    def test_fit_matches_sklearn(self):
+        """Test that the closed-form fits agree with LinearRegression row by row"""
+        rng = np.random.default_rng(0)
+        matrix = rng.poisson(5, size=(20, 60)).astype(float)
+        matrix[3] = 0
+        fits = fit_linear_trends(matrix, horizon=7)
+
+        x = np.arange(60).reshape(-1, 1)
+        for row in (0, 3, 19):
+            model = LinearRegression().fit(x, matrix[row])
+            self.assertAlmostEqual(fits['slope'][row], model.coef_[0])
+            self.assertAlmostEqual(fits['intercept'][row], model.intercept_)
+            self.assertAlmostEqual(fits['r2'][row], model.score(x, matrix[row]))
+            expected = np.clip(model.predict(np.arange(60, 67).reshape(-1, 1)), 0, None)
+            np.testing.assert_allclose(fits['predictions'][row], expected, atol=1e-9)
+
+    def test_product_matrix_fills_gaps(self):
+        """Test that every product gets a full row with zeros for days without sales"""
+        product_ids, category_ids, matrix = self.analytics.get_product_sales_matrix(days_back=30)
+
+        self.assertEqual(list(product_ids), [self.rising.id, self.flat.id, self.unsold.id])
+        self.assertEqual(matrix.shape, (3, 31))
+        self.assertEqual(matrix[0, -1], 20)
+        self.assertEqual(matrix[0, :21].sum(), 0)
+        self.assertEqual(matrix[2].sum(), 0)
+
+    def test_product_and_category_forecasts(self):
+        """Test per-product and per-category forecasts from the database"""
+        products = self.analytics.get_product_forecasts(days_back=30)
+        self.assertEqual(products['predictions'].shape, (3, 30))
+        self.assertGreater(products['slope'][0], 0)
+        self.assertEqual(products['slope'][2], 0)
+
+        categories = self.analytics.get_category_forecasts(days_back=30)
+        self.assertEqual(list(categories['ids']), [self.food.id, self.tools.id])
+        np.testing.assert_allclose(categories['slope'], products['slope'][:2])
+
+    def test_large_batch_is_fast(self):
+        """Test that 10k products x 365 days are fitted well under a second"""
+        matrix = np.random.default_rng(1).poisson(3, size=(10000, 365)).astype(float)
+
+        started = time.perf_counter()
+        fits = fit_linear_trends(matrix)
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(fits['predictions'].shape, (10000, 30))
+        self.assertLess(elapsed, 1.0)
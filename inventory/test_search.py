@@ -0,0 +1,74 @@
+"""
+Tests for the trigram product search
+"""
+from django.test import TestCase, Client
+from django.urls import reverse
+from inventory.models import Category, Product
+from inventory.search import filter_products, search_categories, search_enabled, search_products
+
+
+class ProductSearchTestCase(TestCase):
+    """Test cases for ranked and typo-tolerant search"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.dairy = Category.objects.create(name="Dairy")
+        self.bakery = Category.objects.create(name="Bakery")
+        names = ["Chocolate Milk", "Milk Chocolate Bar", "Dark Chocolate", "Bread", "Buttermilk"]
+        self.products = {
+            name: Product.objects.create(
+                name=name, category=self.dairy if 'ilk' in name else self.bakery, stock_quantity=10, price=50.0
+            )
+            for name in names
+        }
+
+    def _names(self, products):
+        return [product.name for product in products]
+
+    def test_substring_matches_rank_prefix_first(self):
+        """Test that names starting with the query come before other substring matches"""
+        names = self._names(search_products("milk"))
+        self.assertEqual(set(names), {"Chocolate Milk", "Milk Chocolate Bar", "Buttermilk"})
+        self.assertEqual(names[0], "Milk Chocolate Bar")
+
+    def test_typo_tolerance(self):
+        """Test that misspelled queries still find the product"""
+        self.assertIn("Dark Chocolate", self._names(search_products("chocolade")))
+        self.assertEqual(self._names(search_products("xyzzy")), [])
+        self.assertEqual(self._names(search_categories("bakeri")), ["Bakery"])
+
+    def test_index_follows_writes(self):
+        """Test that saves, queryset updates and deletes are reflected in the index"""
+        product = self.products["Bread"]
+        product.name = "Sourdough Loaf"
+        product.save()
+        self.assertEqual(self._names(search_products("sourdough")), ["Sourdough Loaf"])
+
+        Product.objects.filter(pk=product.pk).update(name="Rye Loaf")
+        self.assertEqual(self._names(search_products("loaf")), ["Rye Loaf"])
+
+        product.delete()
+        self.assertEqual(search_products("loaf"), [])
+
+        Product.objects.bulk_create([Product(name="Oat Biscuit", category=self.bakery, stock_quantity=1, price=5.0)])
+        self.assertEqual(self._names(search_products("biscuit")), ["Oat Biscuit"])
+
+    def test_filter_products(self):
+        """Test that filtering keeps icontains results and falls back to typo matches"""
+        products = Product.objects.all()
+        for query in ("choc", "MILK", "Br"):
+            self.assertQuerySetEqual(
+                filter_products(products, query).order_by('pk'),
+                products.filter(name__icontains=query).order_by('pk'),
+            )
+        self.assertIn(self.products["Buttermilk"], filter_products(products, "buttermlk"))
+
+    def test_search_api(self):
+        """Test the JSON search endpoint"""
+        response = Client().get(reverse('search_api'), {'q': 'dairy'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['categories'], [{'id': self.dairy.id, 'name': 'Dairy'}])
+
+    def test_search_is_indexed(self):
+        """Test that the search backend is available on the test database"""
+        self.assertTrue(search_enabled())
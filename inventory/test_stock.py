@@ -0,0 +1,138 @@
+"""
+Tests for atomic stock movements
+"""
+import threading
+import time
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase, Client
+from django.urls import reverse
+from inventory.models import Category, Product, Sale, Purchase
+from inventory.stock import purchase_product, sell_product
+
+
+class StockMovementTestCase(TestCase):
+    """Test cases for sell_product and purchase_product"""
+
+    def setUp(self):
+        """Set up test data"""
+        self.client = Client()
+        self.category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Product 1",
+            category=self.category,
+            stock_quantity=5,
+            price=100.0,
+            gst_rate=18.0
+        )
+
+    def test_sell_product_decrements_stock(self):
+        """Test that a sale decrements stock and records the Sale"""
+        sale = sell_product(self.product, 3)
+
+        self.assertIsNotNone(sale)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 2)
+        self.assertEqual(Sale.objects.get().quantity_sold, 3)
+
+    def test_sell_product_refuses_oversell(self):
+        """Test that selling more than the stock leaves everything untouched"""
+        self.assertIsNone(sell_product(self.product, 6))
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 5)
+        self.assertFalse(Sale.objects.exists())
+
+    def test_sell_product_uses_stale_instance_safely(self):
+        """Test that the stock check uses the database value, not the in-memory one"""
+        stale = Product.objects.get(pk=self.product.pk)
+        sell_product(self.product, 4)
+
+        self.assertIsNone(sell_product(stale, 4))
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 1)
+
+    def test_purchase_product_increments_stock(self):
+        """Test that a purchase increments stock and records the Purchase"""
+        purchase_product(self.product, 10, 80.0)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 15)
+        self.assertEqual(Purchase.objects.get().quantity, 10)
+
+    def test_record_sale_view(self):
+        """Test the record_sale form for sales, purchases and invalid input"""
+        url = reverse('record_sale')
+
+        self.client.post(url, {'record_sale': '1', 'product_id': self.product.id, 'quantity': 2})
+        self.client.post(url, {'record_sale': '1', 'product_id': self.product.id, 'quantity': 10})
+        self.client.post(url, {'record_sale': '1', 'product_id': self.product.id, 'quantity': -3})
+        self.client.post(url, {
+            'record_purchase': '1', 'product_id': self.product.id, 'quantity': 4, 'price_per_unit': 75
+        })
+        # Prices that do not fit the column (12 digits, 2 decimal places) are refused
+        for price in ('1e30', '12.345', 'nan'):
+            self.client.post(url, {
+                'record_purchase': '1', 'product_id': self.product.id, 'quantity': 4, 'price_per_unit': price
+            })
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_quantity, 7)
+        self.assertEqual(Sale.objects.count(), 1)
+        self.assertEqual(Purchase.objects.count(), 1)
+
+
+class ConcurrentSaleStressTestCase(TransactionTestCase):
+    """Stress test selling one product from many threads at once"""
+
+    THREADS = 8
+    ATTEMPTS_PER_THREAD = 25
+    INITIAL_STOCK = 100
+
+    def setUp(self):
+        """Set up test data"""
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Contended Product",
+            category=category,
+            stock_quantity=self.INITIAL_STOCK,
+            price=10.0,
+            gst_rate=18.0
+        )
+
+    def _sell_repeatedly(self, barrier, results):
+        sold = 0
+        try:
+            barrier.wait()
+            for _ in range(self.ATTEMPTS_PER_THREAD):
+                while True:
+                    try:
+                        if sell_product(self.product, 1):
+                            sold += 1
+                        break
+                    except OperationalError:
+                        # SQLite reports lock contention instead of waiting; retry
+                        time.sleep(0.001)
+        finally:
+            results.append(sold)
+            connection.close()
+
+    def test_concurrent_sales_never_oversell(self):
+        """Test that demand above the stock sells exactly the stock"""
+        barrier = threading.Barrier(self.THREADS)
+        results = []
+        threads = [
+            threading.Thread(target=self._sell_repeatedly, args=(barrier, results))
+            for _ in range(self.THREADS)
+        ]
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.product.refresh_from_db()
+        sold = sum(results)
+        self.assertEqual(len(results), self.THREADS)
+        self.assertEqual(sold, self.INITIAL_STOCK)
+        self.assertEqual(self.product.stock_quantity, 0)
+        self.assertEqual(Sale.objects.count(), self.INITIAL_STOCK)
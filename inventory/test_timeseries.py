@@ -0,0 +1,91 @@
+"""
+Tests for the gap-filled sales time series
+"""
+from datetime import date, timedelta
+from django.test import TestCase
+from inventory.models import Category, Product, Sale, Purchase
+from inventory.sales_analytics import SalesAnalytics
+from inventory.timeseries import period_labels, sales_series
+
+
+class SalesSeriesTestCase(TestCase):
+    """Test cases for sales_series"""
+
+    def setUp(self):
+        """Set up sales on 2025-01-30, 2025-02-03 and 2025-02-04"""
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Product 1", category=category, stock_quantity=100, price=100.0, gst_rate=18.0
+        )
+        for day, quantity in ((date(2025, 1, 30), 2), (date(2025, 2, 3), 1), (date(2025, 2, 4), 3)):
+            sale = Sale.objects.create(product=self.product, quantity_sold=quantity)
+            Sale.objects.filter(id=sale.id).update(date=day)
+        purchase = Purchase.objects.create(product=self.product, quantity=10, price_per_unit=60.0)
+        Purchase.objects.filter(id=purchase.id).update(date=date(2025, 1, 28))
+
+    def test_daily_series_is_contiguous(self):
+        """Test that days without sales are filled with zeros in a single query"""
+        with self.assertNumQueries(1):
+            series = sales_series(date(2025, 1, 29), date(2025, 2, 5))
+
+        self.assertEqual(period_labels(series)[0], '2025-01-29')
+        self.assertEqual(len(series['periods']), 8)
+        self.assertEqual(series['quantity'].tolist(), [0, 2, 0, 0, 0, 1, 3, 0])
+        self.assertAlmostEqual(series['revenue'][1], 2 * 118.0)
+        self.assertAlmostEqual(series['revenue_without_gst'][6], 3 * 100.0)
+
+    def test_default_start_and_trim(self):
+        """Test that the series starts at the first record, or first sale when trimmed"""
+        series = sales_series(end_date=date(2025, 2, 4))
+        self.assertEqual(period_labels(series)[0], '2025-01-28')
+        self.assertEqual(series['purchase_cost'][0], 600.0)
+
+        trimmed = sales_series(end_date=date(2025, 2, 4), trim_leading=True)
+        self.assertEqual(period_labels(trimmed)[0], '2025-01-30')
+        self.assertEqual(trimmed['quantity'].sum(), 6)
+
+    def test_weekly_and_monthly_series(self):
+        """Test week (Monday start) and month granularity"""
+        weekly = sales_series(date(2025, 1, 27), date(2025, 2, 10), granularity='week')
+        self.assertEqual(period_labels(weekly, 'week'), ['2025-01-27', '2025-02-03', '2025-02-10'])
+        self.assertEqual(weekly['quantity'].tolist(), [2, 4, 0])
+
+        monthly = sales_series(date(2024, 12, 15), date(2025, 2, 28), granularity='month')
+        self.assertEqual(period_labels(monthly, 'month'), ['2024-12', '2025-01', '2025-02'])
+        self.assertEqual(monthly['quantity'].tolist(), [0, 2, 4])
+        self.assertEqual(monthly['purchase_cost'].tolist(), [0, 600.0, 0])
+
+    def test_invalid_granularity(self):
+        """Test that unknown granularities are rejected"""
+        with self.assertRaises(ValueError):
+            sales_series(granularity='year')
+
+
+class GapFilledSalesDataTestCase(TestCase):
+    """Test cases for SalesAnalytics.get_sales_data on sparse history"""
+
+    def setUp(self):
+        """Set up sales four and two days ago"""
+        category = Category.objects.create(name="Test Category")
+        product = Product.objects.create(
+            name="Product 1", category=category, stock_quantity=100, price=50.0, gst_rate=10.0
+        )
+        today = date.today()
+        for days_ago, quantity in ((4, 3), (2, 5)):
+            sale = Sale.objects.create(product=product, quantity_sold=quantity)
+            Sale.objects.filter(id=sale.id).update(date=today - timedelta(days=days_ago))
+
+    def test_zero_days_and_real_revenue(self):
+        """Test that zero-sales days are present and revenue includes GST"""
+        sales_data = SalesAnalytics().get_sales_data(days_back=30)
+
+        self.assertEqual([item['total_quantity'] for item in sales_data], [3, 0, 5, 0, 0])
+        self.assertEqual(sales_data[-1]['sale_date'], date.today())
+        self.assertAlmostEqual(sales_data[0]['total_revenue'], 3 * 55.0)
+
+    def test_trend_uses_contiguous_days(self):
+        """Test that the trend model sees one point per day"""
+        trend = SalesAnalytics().predict_sales_trend()
+
+        self.assertTrue(trend['has_data'])
+        self.assertEqual(trend['historical_sales'], [3.0, 0.0, 5.0, 0.0, 0.0])
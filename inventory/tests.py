@@ -1,3 +1,235 @@
-from django.test import TestCase
+import csv
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.test import TestCase, Client
+from django.urls import reverse
+from inventory.models import Category, Product, Sale, Purchase
+from inventory.pagination import encode_cursor
 
-# Create your tests here.
+
+# None of these queries depend on the number of sales or products
+DASHBOARD_QUERIES = 6
+
+
+class DashboardViewTestCase(TestCase):
+    """Test cases for the dashboard view"""
+
+    def setUp(self):
+        """Set up test client and data"""
+        self.client = Client()
+        self.url = reverse('dashboard')
+
+        self.category = Category.objects.create(name="Test Category")
+        self.product1 = Product.objects.create(
+            name="Product 1",
+            category=self.category,
+            stock_quantity=100,
+            price=499.99,
+            gst_rate=18.0
+        )
+        self.product2 = Product.objects.create(
+            name="Product 2",
+            category=self.category,
+            stock_quantity=5,
+            price=120.5,
+            gst_rate=5.0
+        )
+        Purchase.objects.create(product=self.product1, quantity=10, price_per_unit=400.0)
+
+    def _create_sales(self, count):
+        for i in range(count):
+            Sale.objects.create(
+                product=self.product1 if i % 2 else self.product2,
+                quantity_sold=1 + i % 7
+            )
+
+    def test_total_revenue_matches_model_methods(self):
+        """Test that the SQL revenue aggregate agrees with Sale.total_sale_value()"""
+        self._create_sales(25)
+        expected = sum(sale.total_sale_value() for sale in Sale.objects.all())
+
+        self.assertEqual(Sale.objects.total_revenue(), expected)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['total_revenue'], expected)
+
+    def test_total_revenue_without_sales(self):
+        """Test that revenue is zero when nothing has been sold"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_revenue'], 0)
+
+    def test_query_count_independent_of_sales(self):
+        """Test that the dashboard query count does not grow with the number of sales"""
+        self._create_sales(1)
+        with self.assertNumQueries(DASHBOARD_QUERIES):
+            self.client.get(self.url)
+
+        self._create_sales(200)
+        with self.assertNumQueries(DASHBOARD_QUERIES):
+            self.client.get(self.url)
+
+    def test_query_count_independent_of_products(self):
+        """Test that more products do not add per-row category queries"""
+        for i in range(30):
+            category = Category.objects.create(name=f"Category {i}")
+            Product.objects.create(name=f"Extra {i}", category=category, stock_quantity=50, price=10.0)
+        with self.assertNumQueries(DASHBOARD_QUERIES):
+            self.client.get(self.url)
+
+
+class SalePriceTestCase(TestCase):
+    """Test cases for the price and GST rate recorded on each sale"""
+
+    def setUp(self):
+        """Set up a product priced in paise"""
+        category = Category.objects.create(name="Test Category")
+        self.product = Product.objects.create(
+            name="Eraser", category=category, stock_quantity=1000, price=Decimal('0.10'), gst_rate=Decimal('18.00')
+        )
+
+    def test_sale_keeps_price_after_repricing(self):
+        """Test that repricing a product does not change past sales"""
+        sale = Sale.objects.create(product=self.product, quantity_sold=3)
+        self.product.price = Decimal('0.25')
+        self.product.gst_rate = Decimal('5.00')
+        self.product.save()
+
+        sale.refresh_from_db()
+        self.assertEqual((sale.unit_price, sale.gst_rate), (Decimal('0.10'), Decimal('18.00')))
+        self.assertEqual(sale.total_sale_value(), Decimal('0.354'))
+        self.assertEqual(Sale.objects.total_revenue(), Decimal('0.354'))
+
+    def test_revenue_sum_is_exact(self):
+        """Test that summing many small amounts in SQL gives the exact total"""
+        Sale.objects.bulk_create([
+            Sale(product=self.product, quantity_sold=1, unit_price=Decimal('0.10'), gst_rate=Decimal('18.00'))
+            for _ in range(1000)
+        ])
+        self.assertEqual(Sale.objects.total_revenue(), Decimal('118'))
+
+
+class ProductTableTestCase(TestCase):
+    """Test cases for the paginated product table and its JSON API"""
+
+    def setUp(self):
+        """Set up test client and data"""
+        self.client = Client()
+        self.url = reverse('product_list_api')
+        category = Category.objects.create(name="Test Category")
+        # Repeated prices so paging has to break ties on id
+        self.products = [
+            Product.objects.create(
+                name=f"Product {i:02d}", category=category, stock_quantity=i, price=float(i % 4)
+            )
+            for i in range(25)
+        ]
+
+    def _collect(self, **params):
+        ids, cursor = [], None
+        while True:
+            query = dict(params, limit=7)
+            if cursor:
+                query['cursor'] = cursor
+            page = self.client.get(self.url, query).json()
+            ids += [row['id'] for row in page['results']]
+            cursor = page['next_cursor']
+            if not cursor:
+                return ids
+
+    def test_pages_cover_every_product_once(self):
+        """Test that walking the cursors returns each product exactly once in order"""
+        ids = self._collect(sort='price', dir='desc')
+        expected = sorted(self.products, key=lambda p: (p.price, p.id), reverse=True)
+        self.assertEqual(ids, [p.id for p in expected])
+
+        ids = self._collect(sort='name', query='Product 1')
+        self.assertEqual(len(ids), 10)
+
+    def test_invalid_parameters(self):
+        """Test that bad sorts and cursors are rejected by the API and ignored by the page"""
+        self.assertEqual(self.client.get(self.url, {'sort': 'gst_rate'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'not-a-cursor'}).status_code, 400)
+        # Well-formed cursors whose value does not fit the sort column
+        for sort, value in (('price', 'abc'), ('price', [1]), ('stock', 'many')):
+            with self.subTest(sort=sort, value=value):
+                response = self.client.get(self.url, {'sort': sort, 'cursor': encode_cursor(value, 1)})
+                self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('dashboard'), {'sort': 'price', 'cursor': encode_cursor('abc', 1)})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse('dashboard'), {'sort': 'gst_rate', 'cursor': 'x'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['sort'], 'name')
+        self.assertEqual(len(response.context['products']), 25)
+
+
+class ExportSalesViewTestCase(TestCase):
+    """Test cases for the streaming CSV export"""
+
+    def setUp(self):
+        """Set up test client and data"""
+        self.client = Client()
+        self.url = reverse('export_sales')
+
+        self.food = Category.objects.create(name="Food")
+        self.tools = Category.objects.create(name="Tools")
+        self.bread = Product.objects.create(
+            name="Bread", category=self.food, stock_quantity=50, price=40.0, gst_rate=5.0
+        )
+        self.hammer = Product.objects.create(
+            name="Hammer", category=self.tools, stock_quantity=20, price=250.0, gst_rate=18.0
+        )
+        today = datetime.now().date()
+        for days_ago, product, quantity in ((10, self.bread, 3), (5, self.hammer, 1), (0, self.bread, 2)):
+            sale = Sale.objects.create(product=product, quantity_sold=quantity)
+            Sale.objects.filter(id=sale.id).update(date=today - timedelta(days=days_ago))
+        self.today = today
+
+    def _rows(self, response):
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_export_streams_all_sales(self):
+        """Test that every sale is exported with its GST-inclusive value"""
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = self._rows(response)
+        self.assertEqual(rows[0], ['Product', 'Quantity Sold', 'Total Price', 'Date'])
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][0], 'Bread')
+        self.assertAlmostEqual(float(rows[1][2]), 3 * 42.0)
+        self.assertAlmostEqual(float(rows[2][2]), 295.0)
+
+    def test_export_filters(self):
+        """Test date range, product and category filters"""
+        start = (self.today - timedelta(days=6)).isoformat()
+        rows = self._rows(self.client.get(self.url, {'start': start}))
+        self.assertEqual([row[0] for row in rows[1:]], ['Hammer', 'Bread'])
+
+        rows = self._rows(self.client.get(self.url, {'end': start}))
+        self.assertEqual([row[0] for row in rows[1:]], ['Bread'])
+
+        rows = self._rows(self.client.get(self.url, {'product': self.hammer.id}))
+        self.assertEqual([row[0] for row in rows[1:]], ['Hammer'])
+
+        rows = self._rows(self.client.get(self.url, {'category': self.food.id}))
+        self.assertEqual([row[0] for row in rows[1:]], ['Bread', 'Bread'])
+
+    def test_export_rejects_invalid_filters(self):
+        """Test that malformed filters return 400"""
+        self.assertEqual(self.client.get(self.url, {'start': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'product': 'abc'}).status_code, 400)
+
+    def test_export_query_count_independent_of_sales(self):
+        """Test that the export runs a single query regardless of the number of sales"""
+        for _ in range(50):
+            Sale.objects.create(product=self.hammer, quantity_sold=1)
+
+        response = self.client.get(self.url)
+        with self.assertNumQueries(1):
+            rows = self._rows(response)
+        self.assertEqual(len(rows), 54)
@@ -0,0 +1,96 @@
+"""
+Sales Time Series Module
+Contiguous, gap-filled sales and purchase series built from the daily rollup
+"""
+from datetime import datetime
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+import numpy as np
+from .models import DailySalesRollup
+
+
+# Period truncation and the numpy unit that steps one period
+GRANULARITIES = {
+    'day': (F('date'), 'D', 1),
+    'week': (TruncWeek('date'), 'D', 7),
+    'month': (TruncMonth('date'), 'M', 1),
+}
+
+LABEL_FORMATS = {'day': '%Y-%m-%d', 'week': '%Y-%m-%d', 'month': '%Y-%m'}
+
+SERIES_FIELDS = ('quantity', 'revenue', 'revenue_without_gst', 'purchase_cost')
+
+
+def _period_start(day, granularity):
+    day = np.datetime64(day, 'D')
+    if granularity == 'week':
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday like TruncWeek
+        return day - ((day.astype(np.int64) + 3) % 7)
+    if granularity == 'month':
+        return day.astype('datetime64[M]')
+    return day
+
+
+def sales_series(start_date=None, end_date=None, granularity='day', trim_leading=False):
+    """
+    Sales and purchase totals per period between start_date and end_date, zero-filled.
+
+    Computed from one aggregate query over DailySalesRollup. Returns a dict
+    with ``periods`` (numpy datetime64 period starts, contiguous) and one
+    float array per field in SERIES_FIELDS: units sold, revenue with GST,
+    revenue without GST and purchase cost. start_date defaults to the first
+    recorded day, end_date to today. With trim_leading, periods before the
+    first sale are dropped.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}, expected one of: {', '.join(GRANULARITIES)}")
+    period_expression, unit, step = GRANULARITIES[granularity]
+    end_date = end_date or datetime.now().date()
+
+    rollups = DailySalesRollup.objects.filter(date__lte=end_date)
+    if start_date:
+        rollups = rollups.filter(date__gte=start_date)
+    rows = list(
+        rollups
+        .annotate(period=period_expression)
+        .values('period')
+        .annotate(**{f'total_{field}': Sum(field) for field in SERIES_FIELDS})
+        .order_by('period')
+    )
+
+    if start_date:
+        first = _period_start(start_date, granularity)
+    elif rows:
+        first = _period_start(rows[0]['period'], granularity)
+    else:
+        first = _period_start(end_date, granularity)
+    last = _period_start(end_date, granularity)
+
+    periods = np.arange(first, last + step, step, dtype=f'datetime64[{unit}]')
+    series = {'periods': periods}
+    for field in SERIES_FIELDS:
+        series[field] = np.zeros(len(periods))
+
+    if rows:
+        starts = np.array([_period_start(row['period'], granularity) for row in rows])
+        positions = ((starts - first).astype(np.int64) // step)
+        for field in SERIES_FIELDS:
+            series[field][positions] = [row[f'total_{field}'] or 0 for row in rows]
+
+    if trim_leading:
+        sold = np.flatnonzero(series['quantity'])
+        keep = slice(sold[0], None) if len(sold) else slice(0, 0)
+        series = {key: values[keep] for key, values in series.items()}
+
+    return series
+
+
+def period_start(day, granularity='day'):
+    """First day of the period containing day"""
+    return _period_start(day, granularity).astype('datetime64[D]').astype(datetime)
+
+
+def period_labels(series, granularity='day'):
+    """Chart labels for the periods of a series"""
+    label_format = LABEL_FORMATS[granularity]
+    return [period.astype(datetime).strftime(label_format) for period in series['periods'].astype('datetime64[D]')]
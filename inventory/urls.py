@@ -1,22 +1,59 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under dashboard/asgi.py these run their independent queries concurrently
+if settings.ASYNC_VIEWS:
+    chart_data_view, sales_analytics_view = views.chart_data_api_async, views.sales_analytics_ai_async
+else:
+    chart_data_view, sales_analytics_view = views.chart_data_api, views.sales_analytics_ai
+
 urlpatterns = [
     # Dashboard route
     path('', views.dashboard, name='dashboard'),
 
+    # JSON pages of the dashboard product table
+    path('api/products/', views.product_list_api, name='product_list_api'),
+
+    # Open low stock alerts
+    path('api/alerts/low-stock/', views.low_stock_alerts_api, name='low_stock_alerts_api'),
+
+    # Server-sent events for live dashboard updates
+    path('api/events/', views.live_events, name='live_events'),
+
+    # Versioned cache hit rate
+    path('api/cache/stats/', views.cache_stats_api, name='cache_stats_api'),
+
+    # Ranked product and category search
+    path('api/search/', views.search_api, name='search_api'),
+
     # Route for recording sales and purchases
     path('record-sale/', views.record_sale, name='record_sale'),
 
+    # Route for bulk ingestion of sales and purchases
+    path('api/ingest/', views.ingest_sales, name='ingest_sales'),
+
     # Route for generating sales graph
     path('sales-graph/', views.sales_graph, name='sales_graph'),
 
+    # Sales and purchase series for the charts
+    path('api/charts/sales/', chart_data_view, name='chart_data_api'),
+
     # Route for exporting sales data to CSV
     path('export-sales/', views.export_sales, name='export_sales'),
 
+    # Routes for reorder suggestions
+    path('reorder/', views.reorder, name='reorder'),
+    path('reorder/export/', views.export_reorder, name='export_reorder'),
+
     # Route for generating product invoice
     path('generate-invoice/<int:product_id>/', views.generate_invoice, name='generate_invoice'),
+
+    # Routes for sale invoices: one sale, one invoice for a batch, or many invoices at once
+    path('invoices/sale/<int:sale_id>/', views.sale_invoice, name='sale_invoice'),
+    path('invoices/batch/', views.batch_invoice, name='batch_invoice'),
+    path('invoices/bulk/', views.bulk_invoices, name='bulk_invoices'),
     
     # Route for AI-powered sales analytics
-    path('sales-analytics-ai/', views.sales_analytics_ai, name='sales_analytics_ai'),
+    path('sales-analytics-ai/', sales_analytics_view, name='sales_analytics_ai'),
 ]
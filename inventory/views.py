@@ -1,46 +1,169 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
+from django.conf import settings
 from django.contrib import messages
-from django.http import HttpResponse
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.dateparse import parse_date
 from django.utils.timezone import now
-from django.db.models import Sum, F
-from django.db.models.functions import TruncMonth
-from .models import Product, Sale, Purchase
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.views.decorators.http import require_POST
+from .models import CENT, ForecastSnapshot, Product, Sale, ReorderRun, ReorderSuggestion
+from .alerts import cached_low_stock_alerts, open_alerts
+from .cache import acached, cache_stats, cached, data_version
+from .charts import MAX_CHART_POINTS, cached_chart_data
+from .concurrent import in_thread
+from .decorators import role_required
+from .events import KEEPALIVE_SECONDS, RETRY_MILLISECONDS, broker, format_event
+from .ingest import IngestError, ingest_rows, parse_rows
+from .invoices import invoice_file, product_invoice_data, sale_invoice_data, stream_zip, write_invoices
+from .lots import expiring_lots
+from .pagination import DEFAULT_PAGE_SIZE, keyset_page
 from .sales_analytics import SalesAnalytics
+from .search import filter_products, search_categories, search_products
+from .stats import cached_dashboard_stats
+from .stock import clean_price, purchase_product, sell_product
+import asyncio
 import csv
+import itertools
 import json
-from reportlab.pdfgen import canvas
+import tempfile
+import time
+
+
+# Most urgent suggestions shown on the reorder page; the CSV export has them all
+REORDER_PAGE_ROWS = 200
+
+# Line items allowed on one batch invoice; larger selections go through bulk_invoices
+MAX_BATCH_INVOICE_LINES = 500
+
+# Invoices allowed in one combined PDF, which is built in memory; larger selections use the ZIP stream
+MAX_PDF_INVOICES = 1000
+
+# Default look-ahead and size of the dashboard's expiring stock panel
+EXPIRING_DAYS = 30
+EXPIRING_PANEL_ROWS = 20
+# Longest look-ahead accepted from the URL (about ten years)
+MAX_EXPIRING_DAYS = 3650
+
+
+def _product_table_params(request):
+    """Search, sort, direction and cursor of the dashboard product table"""
+    return {
+        'query': request.GET.get('query', ''),
+        'sort': request.GET.get('sort', 'name'),
+        'direction': request.GET.get('dir', 'asc'),
+        'cursor': request.GET.get('cursor') or None,
+    }
+
+
+def _product_table_page(params, page_size=DEFAULT_PAGE_SIZE):
+    products = Product.objects.select_related('category').with_threshold()
+    if params['query']:
+        products = filter_products(products, params['query'])
+    return keyset_page(products, params['sort'], params['direction'], params['cursor'], page_size)
 
 
 # Dashboard View
 def dashboard(request):
-    query = request.GET.get('query', '')
-    if query:
-        products = Product.objects.filter(name__icontains=query)
-    else:
-        products = Product.objects.all()
+    params = _product_table_params(request)
+    try:
+        page, next_cursor = _product_table_page(params)
+    except ValueError:
+        # Bad sort or stale cursor in the URL: show the first page by name
+        params.update(sort='name', direction='asc', cursor=None)
+        page, next_cursor = _product_table_page(params)
+
+    # Open low stock alerts, maintained on the stock write path
+    low_stock_alerts = open_alerts()
+    if params['query']:
+        low_stock_alerts = low_stock_alerts.filter(product__in=filter_products(Product.objects.all(), params['query']))
+
+    # Lots expiring soon, from one range scan over the expiry index
+    try:
+        expiring_days = min(max(int(request.GET.get('expiring_days', EXPIRING_DAYS)), 0), MAX_EXPIRING_DAYS)
+    except ValueError:
+        expiring_days = EXPIRING_DAYS
+    today = now().date()
+    expiring = expiring_lots(expiring_days, today)[:EXPIRING_PANEL_ROWS]
+
+    return render(request, 'inventory/dashboard.html', {
+        # Stat cards only change on writes, which bump the cache version
+        **cached_dashboard_stats(),
+        'products': page,
+        'next_cursor': next_cursor,
+        'sort': params['sort'],
+        'direction': params['direction'],
+        'sort_columns': [('name', 'Product'), ('category', 'Category'), ('stock', 'Stock'), ('price', 'Price (₹)')],
+        'low_stock_alerts': low_stock_alerts,
+        'expiring_lots': expiring,
+        'expiring_days': expiring_days,
+        'today': today,
+    })
 
-    total_sales = Sale.objects.count()
-    total_revenue = sum(sale.total_sale_value() for sale in Sale.objects.all())
-    total_purchases = Purchase.objects.aggregate(
-        total_amount=Sum(F('quantity') * F('price_per_unit'))
-    )['total_amount'] or 0
 
-    # Low stock products (threshold: 10 units)
-    low_stock_products = products.filter(stock_quantity__lt=10)
+# Product Table JSON API
+def product_list_api(request):
+    """One keyset page of the product table: ?query=&sort=&dir=&cursor=&limit="""
+    params = _product_table_params(request)
+    try:
+        page, next_cursor = _product_table_page(params, request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    return JsonResponse({
+        'results': [
+            {
+                'id': product.id,
+                'name': product.name,
+                'category': product.category.name,
+                'stock_quantity': product.stock_quantity,
+                'price': product.price,
+                'threshold': product.threshold,
+                'invoice_url': reverse('generate_invoice', args=[product.id]),
+            }
+            for product in page
+        ],
+        'next_cursor': next_cursor,
+    })
 
-    # Sales graph data
-    sales_data = Sale.objects.values('date').annotate(total_sales=Sum('quantity_sold')).order_by('date')
-    dates = [sale['date'].strftime('%Y-%m-%d') for sale in sales_data]
-    quantities = [sale['total_sales'] for sale in sales_data]
 
-    return render(request, 'inventory/dashboard.html', {
-        'products': products,
-        'total_sales': total_sales,
-        'total_revenue': total_revenue,
-        'total_purchases': total_purchases,
-        'low_stock_products': low_stock_products,
-        'dates': json.dumps(dates),
-        'quantities': json.dumps(quantities),
+# Low Stock Alerts JSON API
+def low_stock_alerts_api(request):
+    """Open low stock alerts, served from the cache between stock changes"""
+    return JsonResponse({'alerts': cached_low_stock_alerts()})
+
+
+# Cache Metrics JSON API
+def cache_stats_api(request):
+    """Hit/miss counters and hit rate of the versioned cache, with the backend in use"""
+    return JsonResponse({
+        **cache_stats(),
+        'backend': settings.CACHES['default']['BACKEND'],
+        'data_version': data_version(),
+    })
+
+
+# Product Search JSON API
+def search_api(request):
+    """Ranked, typo-tolerant product and category matches for ?q="""
+    query = request.GET.get('q', '')
+    return JsonResponse({
+        'products': [
+            {
+                'id': product.id,
+                'name': product.name,
+                'category': product.category.name,
+                'stock_quantity': product.stock_quantity,
+                'price': product.price,
+            }
+            for product in search_products(query)
+        ],
+        'categories': [{'id': category.id, 'name': category.name} for category in search_categories(query)],
     })
 
 
@@ -52,17 +175,17 @@ def record_sale(request):
 
         try:
             quantity = int(quantity)
-        except ValueError:
+        except (TypeError, ValueError):
             messages.error(request, "Invalid quantity entered.")
             return redirect('record_sale')
 
-        product = get_object_or_404(Product, id=product_id)
+        if quantity <= 0:
+            messages.error(request, "Quantity must be greater than zero.")
+            return redirect('record_sale')
 
-        if product.stock_quantity >= quantity:
-            product.stock_quantity -= quantity
-            product.save()
+        product = get_object_or_404(Product, id=product_id)
 
-            Sale.objects.create(product=product, quantity_sold=quantity)
+        if sell_product(product, quantity):
             messages.success(request, f"Sale of {quantity} {product.name}(s) recorded successfully!")
         else:
             messages.error(request, f"Insufficient stock for {product.name}.")
@@ -73,20 +196,31 @@ def record_sale(request):
         product_id = request.POST.get('product_id')
         quantity = request.POST.get('quantity')
         price_per_unit = request.POST.get('price_per_unit')
+        expiry_date = request.POST.get('expiry_date') or None
 
         try:
             quantity = int(quantity)
-            price_per_unit = float(price_per_unit)
-        except ValueError:
+            price_per_unit = clean_price(price_per_unit)
+        except (TypeError, ValueError, ValidationError):
             messages.error(request, "Invalid quantity or price entered.")
             return redirect('record_sale')
 
-        product = get_object_or_404(Product, id=product_id)
+        if expiry_date:
+            try:
+                expiry_date = parse_date(expiry_date)
+            except ValueError:
+                expiry_date = None
+            if expiry_date is None:
+                messages.error(request, "Invalid expiry date entered.")
+                return redirect('record_sale')
 
-        product.stock_quantity += quantity
-        product.save()
+        if quantity <= 0 or price_per_unit < 0:
+            messages.error(request, "Invalid quantity or price entered.")
+            return redirect('record_sale')
 
-        Purchase.objects.create(product=product, quantity=quantity, price_per_unit=price_per_unit)
+        product = get_object_or_404(Product, id=product_id)
+
+        purchase_product(product, quantity, price_per_unit, expiry_date)
         messages.success(request, f"Purchase of {quantity} {product.name}(s) recorded successfully!")
 
         return redirect('record_sale')
@@ -96,93 +230,373 @@ def record_sale(request):
         return render(request, 'inventory/record_sale.html', {'products': products})
 
 
+# Bulk Sale/Purchase Ingestion API
+@require_POST
+@role_required('admin', 'manager', 'sales')
+def ingest_sales(request):
+    """Ingest a POS batch posted as CSV (text/csv) or JSON lines (application/x-ndjson)"""
+    content_type = request.content_type or ''
+    fmt = 'csv' if 'csv' in content_type else 'jsonl'
+
+    try:
+        lines = request.body.decode('utf-8').splitlines()
+    except UnicodeDecodeError:
+        return JsonResponse({'errors': ['Request body must be UTF-8 encoded.']}, status=400)
+
+    started = time.perf_counter()
+    try:
+        result = ingest_rows(parse_rows(lines, fmt))
+    except IngestError as exc:
+        return JsonResponse({'errors': exc.errors}, status=400)
+    elapsed = time.perf_counter() - started
+
+    rows = result['sales'] + result['purchases']
+    result['rows_per_second'] = round(rows / elapsed, 1) if elapsed else None
+    return JsonResponse(result, status=201)
+
+
+# Live Dashboard Events
+async def live_events(request):
+    """
+    Server-sent events for the dashboard.
+
+    ``stats`` carries the stat card totals (sent on connect and after every
+    write), ``sale`` each new sale and ``low_stock`` the alerts opened and
+    resolved. Served through dashboard/asgi.py the stream stays open; a
+    WSGI worker cannot hold it, so there the response ends after the totals
+    and the browser reconnects after RETRY_MILLISECONDS, i.e. it polls.
+    """
+    if not isinstance(request, ASGIRequest):
+        stats = await sync_to_async(cached_dashboard_stats)()
+        response = HttpResponse(f'retry: {RETRY_MILLISECONDS}\n\n' + format_event('stats', stats))
+    else:
+        response = StreamingHttpResponse(_event_stream())
+    response['Content-Type'] = 'text/event-stream'
+    response['Cache-Control'] = 'no-cache'
+    # Stop proxies such as nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+async def _event_stream():
+    # Subscribe before reading the totals so no write falls between the two
+    queue = broker.subscribe()
+    try:
+        yield f'retry: {RETRY_MILLISECONDS}\n\n'
+        yield format_event('stats', await sync_to_async(cached_dashboard_stats)())
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ': keepalive\n\n'
+    finally:
+        broker.unsubscribe(queue)
+
+
 # Sales Graph View
 def sales_graph(request):
-    # Fetch sales data grouped by date
-    sales_data = Sale.objects.values('date').annotate(total_sales=Sum('quantity_sold')).order_by('date')
-    dates = [sale['date'].strftime('%Y-%m-%d') for sale in sales_data]
-    quantities = [sale['total_sales'] for sale in sales_data]
-
-    # Fetch monthly total sales
-    monthly_sales = (
-        Sale.objects.annotate(month=TruncMonth('date'))
-        .values('month')
-        .annotate(total_sales=Sum(F('quantity_sold') * F('product__price')))
-        .order_by('month')
+    # The charts load their data from chart_data_api
+    return render(request, 'inventory/sales_graph.html')
+
+
+# Chart Data JSON API
+def chart_data_api(request):
+    """
+    Sales and purchase series for the charts: ?granularity=day|week|month&since=&until=
+
+    Long series are downsampled to ?points= (at most MAX_CHART_POINTS)
+    periods, picked by LTTB on the ?by= series. Answers If-None-Match with
+    304 when the series has not changed, so a chart polling for new points
+    downloads nothing until there is a write.
+    """
+    try:
+        data, etag = cached_chart_data(*_chart_data_args(request))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return _chart_data_response(request, data, etag)
+
+
+async def chart_data_api_async(request):
+    """chart_data_api for dashboard/asgi.py: the query and the downsampling run off the event loop"""
+    try:
+        data, etag = await in_thread(cached_chart_data, *_chart_data_args(request))
+    except ValueError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+    return _chart_data_response(request, data, etag)
+
+
+def _chart_data_args(request):
+    """cached_chart_data() arguments from the query string; raises ValueError for bad dates"""
+    dates = {}
+    for param in ('since', 'until'):
+        value = request.GET.get(param)
+        try:
+            dates[param] = parse_date(value) if value else None
+        except ValueError:
+            dates[param] = None
+        if value and dates[param] is None:
+            raise ValueError(f'Invalid {param} date, expected YYYY-MM-DD.')
+    until = dates['until'] or now().date()
+    if dates['since'] and dates['since'] > until:
+        raise ValueError('since must not be after until.')
+    return (
+        request.GET.get('granularity', 'day'), dates['since'], until,
+        request.GET.get('points', MAX_CHART_POINTS), request.GET.get('by', 'quantity'),
     )
 
-    # Fetch monthly total purchases
-    monthly_purchases = (
-        Purchase.objects.annotate(month=TruncMonth('date'))
-        .values('month')
-        .annotate(total_purchases=Sum(F('quantity') * F('price_per_unit')))
-        .order_by('month')
-    )
 
-    # Prepare data for monthly sales and purchases graphs
-    sales_months = [entry['month'].strftime('%Y-%m') for entry in monthly_sales]
-    sales_totals = [entry['total_sales'] for entry in monthly_sales]
+def _chart_data_response(request, data, etag):
+    etag = f'"{etag}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return response
 
-    purchase_months = [entry['month'].strftime('%Y-%m') for entry in monthly_purchases]
-    purchase_totals = [entry['total_purchases'] for entry in monthly_purchases]
+    response = JsonResponse(data)
+    response['ETag'] = etag
+    # Let browsers keep the series but revalidate it on every use
+    response['Cache-Control'] = 'no-cache'
+    return response
 
-    context = {
-        'dates': json.dumps(dates),
-        'quantities': json.dumps(quantities),
-        'sales_months': json.dumps(sales_months),
-        'sales_totals': json.dumps(sales_totals),
-        'purchase_months': json.dumps(purchase_months),
-        'purchase_totals': json.dumps(purchase_totals),
-    }
-    return render(request, 'inventory/sales_graph.html', context)
+
+# Pseudo-buffer for csv.writer: returns each row instead of storing it
+class Echo:
+    def write(self, value):
+        return value
 
 
 # Export Sales to CSV
 def export_sales(request):
-    response = HttpResponse(content_type='text/csv')
+    """Stream sales as CSV, optionally filtered by ?start=, ?end=, ?product= and ?category="""
+    sales = Sale.objects.with_revenue().order_by('date', 'id')
+
+    for param, lookup in (('start', 'date__gte'), ('end', 'date__lte')):
+        value = request.GET.get(param)
+        if value:
+            try:
+                day = parse_date(value)
+            except ValueError:
+                day = None
+            if day is None:
+                return HttpResponseBadRequest(f'Invalid {param} date, expected YYYY-MM-DD.')
+            sales = sales.filter(**{lookup: day})
+
+    for param, lookup in (('product', 'product_id'), ('category', 'product__category_id')):
+        value = request.GET.get(param)
+        if value:
+            if not value.isdigit():
+                return HttpResponseBadRequest(f'Invalid {param} id.')
+            sales = sales.filter(**{lookup: int(value)})
+
+    rows = (
+        (name, quantity, revenue.quantize(CENT), date)
+        for name, quantity, revenue, date in sales.values_list('product__name', 'quantity_sold', 'revenue', 'date')
+        .iterator(chunk_size=2000)
+    )
+
+    writer = csv.writer(Echo())
+    header = ['Product', 'Quantity Sold', 'Total Price', 'Date']
+    response = StreamingHttpResponse(
+        itertools.chain([writer.writerow(header)], (writer.writerow(row) for row in rows)),
+        content_type='text/csv',
+    )
     response['Content-Disposition'] = 'attachment; filename="sales_data.csv"'
+    return response
 
-    writer = csv.writer(response)
-    writer.writerow(['Product', 'Quantity Sold', 'Total Price', 'Date'])
 
-    sales = Sale.objects.all()
-    for sale in sales:
-        writer.writerow([
-            sale.product.name,
-            sale.quantity_sold,
-            sale.total_sale_value(),
-            sale.date
-        ])
+def _latest_reorder_suggestions():
+    run = ReorderRun.objects.order_by('-created_at', '-id').first()
+    if run is None:
+        return None, ReorderSuggestion.objects.none()
+    suggestions = (
+        run.suggestions.filter(reorder_quantity__gt=0)
+        .select_related('product')
+        .order_by(F('days_of_cover').asc(nulls_last=True), 'product__name')
+    )
+    return run, suggestions
 
+
+# Reorder Suggestions View
+def reorder(request):
+    """Products at or below their reorder point in the latest `manage.py refresh_reorder` run"""
+    run, suggestions = _latest_reorder_suggestions()
+    return render(request, 'inventory/reorder.html', {
+        'run': run,
+        'suggestions': suggestions[:REORDER_PAGE_ROWS],
+        'total': suggestions.count(),
+    })
+
+
+# Export Reorder Suggestions to CSV
+def export_reorder(request):
+    """Stream every reorder suggestion of the latest run as CSV"""
+    _, suggestions = _latest_reorder_suggestions()
+    rows = suggestions.values_list(
+        'product_id', 'product__name', 'stock_quantity', 'velocity', 'days_of_cover',
+        'reorder_point', 'reorder_quantity',
+    ).iterator(chunk_size=2000)
+
+    writer = csv.writer(Echo())
+    header = ['Product ID', 'Product', 'Stock', 'Units/Day', 'Days of Cover', 'Reorder Point', 'Reorder Quantity']
+    response = StreamingHttpResponse(
+        itertools.chain(
+            [writer.writerow(header)],
+            (
+                writer.writerow((pid, name, stock, round(velocity, 3), '' if days is None else round(days, 1), point, qty))
+                for pid, name, stock, velocity, days, point, qty in rows
+            ),
+        ),
+        content_type='text/csv',
+    )
+    response['Content-Disposition'] = 'attachment; filename="reorder.csv"'
     return response
 
 
-# Generate Invoice (PDF Export)
-def generate_invoice(request, product_id):
-    product = Product.objects.get(id=product_id)
+def _serve_invoice(request, data, filename):
+    """Serve a cached invoice PDF with ETag/Last-Modified, answering conditional requests with 304"""
+    path, digest = invoice_file(data)
+    etag = f'"{digest}"'
+    last_modified = int(path.stat().st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    response = FileResponse(open(path, 'rb'), content_type='application/pdf', as_attachment=True, filename=filename)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
 
-    # Create PDF response
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename="{product.name}_invoice.pdf"'
 
-    # Generate PDF
-    p = canvas.Canvas(response)
-    p.drawString(100, 800, f"Invoice for {product.name}")
-    p.drawString(100, 780, f"Price: ₹{product.price}")
-    p.drawString(100, 760, f"GST Rate: {product.gst_rate}%")
-    p.drawString(100, 740, f"Total Price with GST: ₹{product.total_price_with_gst():.2f}")
-    p.drawString(100, 720, "Thank you for your purchase!")
-    p.save()
+def _sales_from_request(request):
+    """Sales selected by ?sales=1,2,3 or ?start=/?end=/?product=, or an error message"""
+    sales = Sale.objects.select_related('product').order_by('id')
+    ids = request.GET.get('sales')
+    if ids:
+        try:
+            ids = [int(value) for value in ids.split(',')]
+        except ValueError:
+            return None, 'Invalid sales, expected comma-separated ids.'
+        return sales.filter(id__in=ids), None
+
+    for param, lookup in (('start', 'date__gte'), ('end', 'date__lte')):
+        value = request.GET.get(param)
+        if value:
+            try:
+                day = parse_date(value)
+            except ValueError:
+                day = None
+            if day is None:
+                return None, f'Invalid {param} date, expected YYYY-MM-DD.'
+            sales = sales.filter(**{lookup: day})
+    product = request.GET.get('product')
+    if product:
+        if not product.isdigit():
+            return None, 'Invalid product id.'
+        sales = sales.filter(product_id=int(product))
+    if not any(request.GET.get(param) for param in ('start', 'end', 'product')):
+        return None, 'Select sales with ?sales=, ?start=, ?end= or ?product=.'
+    return sales, None
+
 
+# Generate Invoice (PDF Export)
+def generate_invoice(request, product_id):
+    """Pro forma invoice for one unit of a product"""
+    product = get_object_or_404(Product, id=product_id)
+    data = product_invoice_data(product, now().date())
+    return _serve_invoice(request, data, f'{product.name}_invoice.pdf')
+
+
+# Invoice for one sale
+def sale_invoice(request, sale_id):
+    sale = get_object_or_404(Sale.objects.select_related('product'), id=sale_id)
+    data = sale_invoice_data([sale])
+    return _serve_invoice(request, data, f"{data['number']}.pdf")
+
+
+# One invoice covering a batch of sales
+def batch_invoice(request):
+    """Single invoice with one line item per sale in ?sales=1,2,3"""
+    sales, error = _sales_from_request(request)
+    if error:
+        return HttpResponseBadRequest(error)
+    sales = list(sales[:MAX_BATCH_INVOICE_LINES + 1])
+    if not sales:
+        raise Http404('No matching sales.')
+    if len(sales) > MAX_BATCH_INVOICE_LINES:
+        return HttpResponseBadRequest(f'At most {MAX_BATCH_INVOICE_LINES} sales fit on one invoice.')
+    data = sale_invoice_data(sales)
+    return _serve_invoice(request, data, f"{data['number']}.pdf")
+
+
+# Many invoices, one per sale, as a ZIP stream or a single PDF
+def bulk_invoices(request):
+    """One invoice per selected sale, as ?format=zip (default, streamed) or ?format=pdf (one document, capped)"""
+    sales, error = _sales_from_request(request)
+    if error:
+        return HttpResponseBadRequest(error)
+    fmt = request.GET.get('format', 'zip')
+    if fmt not in ('zip', 'pdf'):
+        return HttpResponseBadRequest("Invalid format, expected 'zip' or 'pdf'.")
+
+    if fmt == 'pdf' and sales[MAX_PDF_INVOICES:MAX_PDF_INVOICES + 1].exists():
+        return HttpResponseBadRequest(
+            f'At most {MAX_PDF_INVOICES} invoices fit in one PDF; use format=zip for larger selections.'
+        )
+
+    invoices = (sale_invoice_data([sale]) for sale in sales.iterator(chunk_size=500))
+    if fmt == 'pdf':
+        # ReportLab keeps every page in memory until save (about 5 MB per 1000 pages), hence the cap;
+        # the finished document goes to a temporary file rather than a second copy in memory
+        document = tempfile.TemporaryFile()
+        write_invoices(invoices, document)
+        document.seek(0)
+        return FileResponse(document, content_type='application/pdf', as_attachment=True, filename='invoices.pdf')
+
+    entries = ((f"{data['number']}.pdf", invoice_file(data)[0]) for data in invoices)
+    response = StreamingHttpResponse(stream_zip(entries), content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="invoices.zip"'
     return response
 
 
 # Sales Analytics AI View
 def sales_analytics_ai(request):
     """AI-powered sales analytics with trend prediction and suggestions"""
-    analytics = SalesAnalytics()
-    forecast_data = analytics.get_sales_forecast()
-    
+    # Cached until the next write or new forecast snapshot, and at most for the day
+    name = f'sales_analytics:{now().date().isoformat()}'
+    return render(request, 'inventory/sales_analytics.html', cached(name, _sales_analytics_context))
+
+
+async def sales_analytics_ai_async(request):
+    """sales_analytics_ai for dashboard/asgi.py, computing a missing forecast with concurrent queries"""
+    name = f'sales_analytics:{now().date().isoformat()}'
+    context = await acached(name, _asales_analytics_context)
+    # Context processors may still query, e.g. for request.user
+    return await sync_to_async(render)(request, 'inventory/sales_analytics.html', context)
+
+
+def _latest_snapshot():
+    # Prefer the snapshot precomputed by `manage.py refresh_forecasts`
+    return ForecastSnapshot.objects.order_by('-created_at', '-id').first()
+
+
+def _sales_analytics_context():
+    snapshot = _latest_snapshot()
+    if snapshot is not None:
+        forecast_data = snapshot.forecast
+    else:
+        forecast_data = SalesAnalytics().get_sales_forecast()
+    return _analytics_context(forecast_data, snapshot)
+
+
+async def _asales_analytics_context():
+    snapshot = await in_thread(_latest_snapshot)
+    if snapshot is not None:
+        forecast_data = snapshot.forecast
+    else:
+        forecast_data = await SalesAnalytics().aget_sales_forecast()
+    return _analytics_context(forecast_data, snapshot)
+
+
+def _analytics_context(forecast_data, snapshot):
     trend_data = forecast_data['trend_data']
     suggestions = forecast_data['suggestions']
     top_products = forecast_data['top_products']
@@ -192,16 +606,15 @@ def sales_analytics_ai(request):
     predictions_json = json.dumps(trend_data.get('predictions', []))
     historical_json = json.dumps(trend_data.get('historical_sales', []))
     
-    context = {
+    return {
         'trend_data': trend_data,
         'suggestions': suggestions,
         'top_products': top_products,
         'underperforming_products': underperforming,
         'predictions_json': predictions_json,
         'historical_json': historical_json,
+        'snapshot': snapshot,
     }
-    
-    return render(request, 'inventory/sales_analytics.html', context)
 
 
 # Authentication Views
@@ -23,6 +23,28 @@ class SimpleChart {
         this.draw();
     }
     
+    // Replace the chart's labels and values and redraw it
+    setData(labels, values) {
+        this.data.labels = labels;
+        this.data.datasets[0].data = values;
+        this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+        this.draw();
+    }
+    
+    // Add a point at the end, or replace the last one when it has the same label
+    appendPoint(label, value) {
+        const labels = this.data.labels;
+        const values = this.data.datasets[0].data;
+        if (labels.length && labels[labels.length - 1] === label) {
+            values[values.length - 1] = value;
+        } else {
+            labels.push(label);
+            values.push(value);
+        }
+        this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+        this.draw();
+    }
+    
     draw() {
         if (this.type === 'line') {
             this.drawLineChart();
@@ -46,7 +68,7 @@ class SimpleChart {
         }
         
         // Calculate scales
-        const maxValue = Math.max(...dataValues);
+        const maxValue = dataValues.reduce((max, value) => Math.max(max, value), -Infinity);
         const minValue = 0;
         const valueRange = maxValue - minValue || 1;
         
@@ -169,7 +191,7 @@ class SimpleChart {
         }
         
         // Calculate scales
-        const maxValue = Math.max(...dataValues);
+        const maxValue = dataValues.reduce((max, value) => Math.max(max, value), -Infinity);
         const minValue = 0;
         const valueRange = maxValue - minValue || 1;
         
@@ -257,5 +279,67 @@ class SimpleChart {
     }
 }
 
+/**
+ * Chart series from the chart data API, kept in localStorage between page loads.
+ * Pass the chart's width in pixels as points to get no more points than it can show.
+ * After the first load only the periods since the last one stored are fetched;
+ * the stored copy is refetched in full once a day to pick up edited history.
+ */
+class ChartData {
+    constructor(url, granularity, points) {
+        this.url = url;
+        this.granularity = granularity || 'day';
+        // Long histories are downsampled on the server to about one point per pixel
+        this.points = points || 1000;
+        this.storageKey = `chart-data:${url}:${this.granularity}:${this.points}`;
+    }
+    
+    stored() {
+        try {
+            const data = JSON.parse(localStorage.getItem(this.storageKey));
+            const today = new Date().toISOString().slice(0, 10);
+            return data && data.fetched === today ? data : null;
+        } catch (error) {
+            return null;
+        }
+    }
+    
+    async load() {
+        const stored = this.stored();
+        const params = new URLSearchParams({ granularity: this.granularity, points: this.points });
+        if (stored && stored.next_since) {
+            params.set('since', stored.next_since);
+        }
+        const response = await fetch(`${this.url}?${params}`);
+        if (!response.ok) {
+            throw new Error(`Chart data request failed: ${response.status}`);
+        }
+        const fresh = await response.json();
+        const data = stored ? ChartData.merge(stored, fresh) : fresh;
+        data.fetched = new Date().toISOString().slice(0, 10);
+        try {
+            localStorage.setItem(this.storageKey, JSON.stringify(data));
+        } catch (error) {
+            // Storage full or disabled: the next load fetches everything again
+        }
+        return data;
+    }
+    
+    // Stored points before the fresh ones, then the fresh ones (which replace any overlap)
+    static merge(stored, fresh) {
+        if (!fresh.since) {
+            return stored;
+        }
+        const keep = stored.labels.findIndex((label, index) => stored.starts[index] >= fresh.since);
+        const cut = keep === -1 ? stored.labels.length : keep;
+        const merged = { ...fresh, since: stored.since };
+        ['labels', 'starts', 'quantity', 'sales', 'sales_with_gst', 'purchases'].forEach((field) => {
+            merged[field] = stored[field].slice(0, cut).concat(fresh[field]);
+        });
+        return merged;
+    }
+}
+
 // Make it available globally
 window.SimpleChart = SimpleChart;
+window.ChartData = ChartData;